@@ -0,0 +1,137 @@
+"""
+Avaliação vetorizada de populações inteiras com NumPy.
+Reproduz a semântica de apply_item_effects (e do EffectEngine) sobre uma matriz
+de índices de itens, aplicando uma coluna (uma mistura) de cada vez.
+O NumPy é opcional: sem ele, HAS_NUMPY é False e o otimizador usa a avaliação escalar.
+Ele só é importado quando o primeiro avaliador é criado, para não pesar no início do programa.
+"""
+
+import importlib.util
+from typing import Sequence, Tuple
+
+# Importações dos módulos locais
+from effect_engine import EffectEngine, get_engine, MAX_EFFECTS, MULTIPLIER_SCALE, _CHUNK_BITS
+
+np = None  # Módulo numpy, carregado por _load_numpy no primeiro uso
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None  # NumPy é uma dependência opcional
+
+def _load_numpy():
+    """Importa o NumPy na primeira avaliação em lote."""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+class BatchEvaluator:
+    """
+    Avaliador em lote construído a partir de um EffectEngine.
+
+    Cada item é convertido em vetores NumPy:
+    - o bit do seu efeito principal;
+    - as máscaras de origem e destino de cada regra, completadas com zeros até o
+      maior número de regras de um item (uma regra com origem 0 nunca é aplicada).
+
+    A soma dos multiplicadores usa as mesmas tabelas por bloco de _CHUNK_BITS bits
+    do EffectSumTable, consultadas com indexação vetorizada.
+    """
+
+    def __init__(self, engine: EffectEngine):
+        if not HAS_NUMPY:
+            raise ImportError("A avaliação em lote requer o NumPy (pip install numpy)")
+        _load_numpy()
+        self.engine = engine
+
+        num_rules = max((len(rules) for rules in engine.item_rules), default=0)
+        num_items = len(engine.item_names)
+        self._effect_bits = np.array(engine.item_effect_bits, dtype=np.uint64)
+        self._old_bits = np.zeros((num_items, num_rules), dtype=np.uint64)
+        self._new_bits = np.zeros((num_items, num_rules), dtype=np.uint64)
+        for item, rules in enumerate(engine.item_rules):
+            for slot, (old_bit, new_bit) in enumerate(rules):
+                self._old_bits[item, slot] = old_bit
+                self._new_bits[item, slot] = new_bit
+        self._costs = np.array(engine.item_costs, dtype=np.float64)
+
+        # Tabelas de soma por bloco, como no EffectSumTable
+        self._chunk_tables = []
+        units = engine.effect_units
+        for offset in range(0, len(units), _CHUNK_BITS):
+            chunk_units = units[offset:offset + _CHUNK_BITS]
+            table = np.zeros(1 << len(chunk_units), dtype=np.int64)
+            for value in range(1, len(table)):
+                low_bit = value & -value
+                table[value] = table[value ^ low_bit] + chunk_units[low_bit.bit_length() - 1]
+            self._chunk_tables.append(table)
+
+        # Contagem de bits por byte, usada quando np.bitwise_count não existe (NumPy < 2.0)
+        self._byte_counts = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+    def _bit_count(self, states):
+        """Conta os efeitos ativos de cada estado."""
+        if hasattr(np, "bitwise_count"):
+            return np.bitwise_count(states)
+        return self._byte_counts[states.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+    def multiplier_units(self, states):
+        """Retorna a soma dos multiplicadores de cada estado, em centésimos."""
+        chunk_mask = np.uint64((1 << _CHUNK_BITS) - 1)
+        total = np.zeros(states.shape, dtype=np.int64)
+        for i, table in enumerate(self._chunk_tables):
+            total += table[(states >> np.uint64(i * _CHUNK_BITS)) & chunk_mask]
+        return total
+
+    def apply_items(self, combinations, state: int = 0):
+        """
+        Aplica cada linha de uma matriz (pop, combo_size) de índices de itens
+        a partir do mesmo estado inicial e retorna os estados finais (uint64).
+        """
+        combinations = np.asarray(combinations, dtype=np.intp)
+        states = np.full(combinations.shape[0], state, dtype=np.uint64)
+        zero = np.uint64(0)
+        for column in range(combinations.shape[1]):
+            column_items = combinations[:, column]
+
+            # Adiciona o efeito principal, exceto se o limite foi atingido e ele ainda não está presente
+            effect_bits = self._effect_bits[column_items]
+            blocked = (self._bit_count(states) >= MAX_EFFECTS) & ((states & effect_bits) == zero)
+            states = np.where(blocked, states, states | effect_bits)
+
+            # As regras ativas são coletadas antes de qualquer substituição
+            old_bits = self._old_bits[column_items]
+            new_bits = self._new_bits[column_items]
+            active = (states[:, None] & old_bits) != zero
+            for slot in range(old_bits.shape[1]):
+                states = np.where(active[:, slot], (states & ~old_bits[:, slot]) | new_bits[:, slot], states)
+        return states
+
+    def evaluate(self, combinations, state: int = 0) -> Tuple[Sequence[int], Sequence[float], Sequence[float]]:
+        """
+        Avalia uma população inteira em uma única chamada.
+
+        Args:
+            combinations: Matriz (pop, combo_size) de índices de itens, ou lista de listas
+            state: Máscara de bits dos efeitos iniciais
+
+        Returns:
+            Tupla de listas contendo: (estados finais, multiplicadores, custos totais),
+            na mesma ordem das linhas
+        """
+        combinations = np.asarray(combinations, dtype=np.intp)
+        if combinations.shape[0] == 0:
+            return [], [], []
+        states = self.apply_items(combinations, state)
+        multipliers = 1.0 + self.multiplier_units(states) / MULTIPLIER_SCALE
+        costs = self._costs[combinations].sum(axis=1)
+        return states.tolist(), multipliers.tolist(), costs.tolist()
+
+_default_evaluator = None
+
+def get_batch_evaluator(engine: EffectEngine = None) -> BatchEvaluator:
+    """Retorna o avaliador em lote do motor padrão (criado uma única vez); requer NumPy."""
+    global _default_evaluator
+    if engine is not None:
+        return BatchEvaluator(engine)
+    if _default_evaluator is None:
+        _default_evaluator = BatchEvaluator(get_engine())
+    return _default_evaluator
@@ -0,0 +1,390 @@
+"""
+Benchmark do otimizador: velocidade e qualidade do algoritmo genético.
+Roda um cenário com semente fixa para cada matéria-prima de RAW_MATERIALS e cada
+tamanho de BENCHMARK_COMBO_SIZES e mede avaliações por segundo, tempo até atingir o
+lucro ótimo, lucro final em relação ao ótimo (do índice pré-calculado ou da busca
+exata) e pico de memória. Cada cenário roda em um processo novo, para que caches e
+memória de uma execução não afetem a seguinte.
+
+Uso:
+    python benchmark.py                                # grava benchmark_results.json
+    python benchmark.py --output baseline.json         # guarda uma linha de base
+    python benchmark.py --baseline baseline.json       # compara e aponta regressões
+
+Com --baseline, o código de saída é 1 se alguma métrica piorar além da tolerância
+de REGRESSION_TOLERANCES. A parada antecipada fica desligada: cada cenário usa o tempo
+todo, para que os resultados sejam comparáveis entre execuções. Cada cenário roda de
+novo com a parada antecipada ligada e o prazo EARLY_STOP_TIME_LIMIT_SECONDS, e o código
+de saída também é 1 se alguma dessas execuções chegar ao prazo sem parar sozinha ou
+terminar com lucro menor que o da execução com o tempo todo.
+
+Um micro-benchmark mede ainda o motor de efeitos contra a implementação de referência
+(evaluate_combination), por receita: com o cache de transições vazio, já preenchido e
+em lotes do tamanho de uma população. O código de saída também é 1 se, com o cache
+preenchido (o caso do algoritmo genético depois das primeiras gerações), o motor não for
+ao menos ENGINE_MIN_WARM_SPEEDUP vezes mais rápido que a referência.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+# Importações dos módulos locais
+from profiling import SearchStats
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+from result_cache import tables_fingerprint
+from utils import configure_logging
+
+BENCHMARK_FILE = "benchmark_results.json"  # Arquivo de saída padrão
+BENCHMARK_VERSION = 1  # Versão do formato do arquivo de resultados
+BENCHMARK_COMBO_SIZES = (4, 6, 8)  # Tamanhos de combinação de cada matéria-prima
+BENCHMARK_SEED = 1234  # Semente base; cada cenário deriva a sua do nome e do tamanho
+BENCHMARK_TIME_LIMIT_SECONDS = 5  # Tempo de cada cenário
+EARLY_STOP_TIME_LIMIT_SECONDS = 120  # Prazo das execuções com parada antecipada, que precisam parar antes dele
+ENGINE_BENCHMARK_RECIPES = 20000  # Receitas aleatórias do micro-benchmark do motor de efeitos
+ENGINE_BENCHMARK_COMBO_SIZE = 8  # Tamanho dessas receitas
+ENGINE_BENCHMARK_BATCH_SIZE = 500  # Tamanho de cada lote (uma população típica do algoritmo genético)
+ENGINE_BENCHMARK_REPEATS = 3  # Repetições de cada medida; vale a mais rápida
+ENGINE_MIN_WARM_SPEEDUP = 5.0  # Aceleração mínima do motor com o cache de transições preenchido
+
+# Métrica: (maior é melhor, piora relativa tolerada antes de acusar regressão)
+REGRESSION_TOLERANCES = {
+    "evaluations_per_second": (True, 0.10),
+    "profit_ratio": (True, 0.005),
+    "time_to_target_seconds": (False, 0.25),
+    "peak_memory_mb": (False, 0.20),
+}
+TIME_TO_TARGET_SLACK_SECONDS = 0.1  # Diferença absoluta de tempo ignorada (ruído de medição)
+
+def scenario_seed(raw_material: str, combo_size: int, seed: int = BENCHMARK_SEED) -> int:
+    """Semente de um cenário, estável entre execuções e independente da ordem dos cenários."""
+    return zlib.crc32(f"{raw_material}:{combo_size}".encode("utf-8")) ^ seed
+
+def _peak_memory_mb() -> Optional[float]:
+    """Pico de memória residente do processo em MB (None onde o módulo resource não existe)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def known_optimum(raw_material: str, combo_size: int) -> float:
+    """Lucro ótimo de um cenário: do índice pré-calculado ou, se não houver, da busca exata."""
+    from recipe_index import lookup
+    indexed = lookup(raw_material, combo_size)
+    if indexed is not None:
+        return indexed[4]
+
+    from optimizer import solve_exact
+    result = solve_exact(
+        initial_effects=get_raw_material_initial_effects(raw_material),
+        combo_size=combo_size,
+        base_value=RAW_MATERIALS[raw_material]["value"],
+        reuse_search_state=False
+    )
+    return result[4]
+
+def run_scenario(raw_material: str, combo_size: int, seed: int, time_limit_seconds: float,
+                 optimum_profit: float, early_stopping: bool = False) -> Dict[str, Any]:
+    """
+    Executa um cenário do algoritmo genético (no processo atual) e mede seus resultados.
+
+    Args:
+        raw_material: Nome da matéria-prima
+        combo_size: Tamanho da combinação
+        seed: Semente do gerador aleatório
+        time_limit_seconds: Limite de tempo da busca
+        optimum_profit: Lucro ótimo conhecido, usado como lucro alvo
+        early_stopping: Se True, a busca pode parar antes do limite de tempo
+
+    Returns:
+        Dicionário com as métricas do cenário
+    """
+    from optimizer import find_best_combination
+
+    stats = SearchStats()
+    start_time = time.perf_counter()
+    combination, _, _, cost, profit, _ = find_best_combination(
+        initial_effects=get_raw_material_initial_effects(raw_material),
+        time_limit_seconds=time_limit_seconds,
+        combo_size=combo_size,
+        base_value=RAW_MATERIALS[raw_material]["value"],
+        reuse_search_state=False,
+        search_stats=stats,
+        seed=seed,
+        early_stopping=early_stopping
+    )
+    elapsed = time.perf_counter() - start_time
+
+    # Primeiro instante em que o melhor lucro atingiu o ótimo (com tolerância de arredondamento)
+    time_to_target = next((seconds for seconds, improvement in stats.improvements
+                           if improvement >= optimum_profit - 1e-6), None)
+    return {
+        "id": f"{raw_material}:{combo_size}",
+        "raw_material": raw_material,
+        "combo_size": combo_size,
+        "seed": seed,
+        "combination": combination,
+        "cost": cost,
+        "profit": round(profit, 2),
+        "optimum_profit": round(optimum_profit, 2),
+        "profit_ratio": round(profit / optimum_profit, 6) if optimum_profit > 0 else None,
+        "time_to_target_seconds": None if time_to_target is None else round(time_to_target, 3),
+        "evaluations": stats.evaluations,
+        "generations": stats.generations,
+        "evaluations_per_second": round(stats.evaluations_per_second),
+        "elapsed_seconds": round(elapsed, 3),
+        "stop_reason": stats.stop_reason,
+        "peak_memory_mb": None if _peak_memory_mb() is None else round(_peak_memory_mb(), 1),
+        "hyperparameters": stats.hyperparameters,
+    }
+
+def _best_time(function, repeats: int = ENGINE_BENCHMARK_REPEATS) -> float:
+    """Menor tempo, em segundos, de repeats chamadas de function."""
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def run_engine_benchmark(num_recipes: int = ENGINE_BENCHMARK_RECIPES,
+                         combo_size: int = ENGINE_BENCHMARK_COMBO_SIZE,
+                         seed: int = BENCHMARK_SEED) -> Dict[str, Any]:
+    """
+    Mede a avaliação de receitas aleatórias pelo motor de efeitos e pela referência.
+
+    Caminhos medidos: evaluate_combination (referência, sobre nomes e dicionários),
+    EffectEngine.evaluate_indices com um motor novo ("cold", preenchendo o cache de
+    transições) e com o mesmo motor em seguida ("warm"), e BatchEvaluator em lotes de
+    ENGINE_BENCHMARK_BATCH_SIZE receitas (só com o NumPy).
+
+    Returns:
+        Dicionário com microssegundos por receita e aceleração sobre a referência de cada caminho
+    """
+    from batch_evaluator import HAS_NUMPY, BatchEvaluator
+    from effect_engine import EffectEngine
+    from optimizer import evaluate_combination
+
+    rng = random.Random(seed)
+    raw_material = next(iter(RAW_MATERIALS))
+    initial_effects = get_raw_material_initial_effects(raw_material)
+    engine = EffectEngine()
+    recipes = [[rng.choice(engine.item_names) for _ in range(combo_size)] for _ in range(num_recipes)]
+    indices = [engine.encode_items(recipe) for recipe in recipes]
+    initial_state = engine.encode_effects(initial_effects)
+
+    def reference():
+        for recipe in recipes:
+            evaluate_combination(recipe, initial_effects)
+
+    def scalar(evaluated_engine):
+        for recipe in indices:
+            evaluated_engine.evaluate_indices(recipe, initial_state)
+
+    seconds = {"reference": _best_time(reference)}
+    # Cada medida fria usa um motor novo, com o cache de transições vazio
+    seconds["engine_cold"] = _best_time(lambda: scalar(EffectEngine()))
+    scalar(engine)
+    seconds["engine_warm"] = _best_time(lambda: scalar(engine))
+    if HAS_NUMPY:
+        evaluator = BatchEvaluator(engine)
+        batches = [indices[i:i + ENGINE_BENCHMARK_BATCH_SIZE]
+                   for i in range(0, num_recipes, ENGINE_BENCHMARK_BATCH_SIZE)]
+        seconds["batch"] = _best_time(lambda: [evaluator.evaluate(batch, initial_state) for batch in batches])
+
+    return {
+        "raw_material": raw_material,
+        "recipes": num_recipes,
+        "combo_size": combo_size,
+        "batch_size": ENGINE_BENCHMARK_BATCH_SIZE,
+        "microseconds_per_recipe": {path: round(value / num_recipes * 1e6, 3) for path, value in seconds.items()},
+        "speedup": {path: round(seconds["reference"] / value, 2) for path, value in seconds.items()
+                    if path != "reference"},
+    }
+
+def run_benchmark(raw_materials: List[str] = None, combo_sizes=BENCHMARK_COMBO_SIZES,
+                  seed: int = BENCHMARK_SEED,
+                  time_limit_seconds: float = BENCHMARK_TIME_LIMIT_SECONDS) -> Dict[str, Any]:
+    """
+    Executa todos os cenários, um de cada vez, cada um em um processo novo.
+
+    Returns:
+        Dicionário com o ambiente, a configuração e a lista de cenários
+    """
+    raw_materials = raw_materials or list(RAW_MATERIALS.keys())
+    from batch_evaluator import HAS_NUMPY
+
+    scenarios = []
+    # Os processos novos não herdam a configuração do log; sem ela, só avisos aparecem
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for raw_material in raw_materials:
+            for combo_size in combo_sizes:
+                optimum_profit = known_optimum(raw_material, combo_size)
+                result = pool.apply(run_scenario, (raw_material, combo_size, scenario_seed(raw_material, combo_size, seed),
+                                                   time_limit_seconds, optimum_profit))
+                scenarios.append(result)
+                time_to_target = result["time_to_target_seconds"]
+                print(f"{result['id']:<24} lucro ${result['profit']:.2f}/${result['optimum_profit']:.2f} "
+                      f"({result['profit_ratio']:.2%}), "
+                      f"alvo {'não atingido' if time_to_target is None else f'em {time_to_target:.2f}s'}, "
+                      f"{result['evaluations_per_second']:,} avaliações/s, "
+                      f"{result['peak_memory_mb'] or '-'} MB")
+                
+                # A mesma busca com parada antecipada: quanto tempo leva para desistir
+                early = pool.apply(run_scenario, (raw_material, combo_size, scenario_seed(raw_material, combo_size, seed),
+                                                  EARLY_STOP_TIME_LIMIT_SECONDS, optimum_profit, True))
+                result["early_stop"] = {key: early[key] for key in
+                                        ("elapsed_seconds", "stop_reason", "generations", "profit_ratio")}
+                print(f"{'':<24} parada antecipada ({early['stop_reason']}) em {early['elapsed_seconds']:.2f}s, "
+                      f"lucro {early['profit_ratio']:.2%} do ótimo")
+
+    engine = run_engine_benchmark(seed=seed)
+    timings = ", ".join(f"{path} {value:.2f} µs" for path, value in engine["microseconds_per_recipe"].items())
+    speedups = ", ".join(f"{path} {value:.1f}x" for path, value in engine["speedup"].items())
+    print(f"Motor de efeitos, por receita de {engine['combo_size']} itens: {timings}; aceleração: {speedups}")
+
+    return {
+        "version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fingerprint": tables_fingerprint(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": HAS_NUMPY,
+        },
+        "config": {
+            "combo_sizes": list(combo_sizes),
+            "seed": seed,
+            "time_limit_seconds": time_limit_seconds,
+        },
+        "scenarios": scenarios,
+        "engine": engine,
+    }
+
+def check_early_stopping(results: Dict[str, Any]) -> List[str]:
+    """
+    Verifica se as execuções com parada antecipada pararam antes de
+    EARLY_STOP_TIME_LIMIT_SECONDS sem perder lucro em relação à execução com o tempo todo
+    do mesmo cenário.
+
+    Returns:
+        Lista de mensagens, uma por cenário que demorou demais para parar ou parou cedo demais
+    """
+    failures = []
+    for scenario in results["scenarios"]:
+        early = scenario.get("early_stop")
+        if not early:
+            continue
+        if early["stop_reason"] == "time_limit":
+            failures.append(f"{scenario['id']}: a parada antecipada não parou a busca em "
+                            f"{EARLY_STOP_TIME_LIMIT_SECONDS}s")
+        if early["profit_ratio"] < scenario["profit_ratio"]:
+            failures.append(f"{scenario['id']}: parada antecipada ({early['stop_reason']}) com lucro "
+                            f"{early['profit_ratio']:.2%} do ótimo, abaixo dos {scenario['profit_ratio']:.2%} "
+                            f"da execução com o tempo todo")
+    return failures
+
+def check_engine_speedup(results: Dict[str, Any]) -> List[str]:
+    """
+    Verifica se o motor com o cache de transições preenchido atinge ENGINE_MIN_WARM_SPEEDUP.
+
+    Returns:
+        Lista com uma mensagem se a aceleração ficou abaixo do mínimo, ou vazia
+    """
+    speedup = results.get("engine", {}).get("speedup", {}).get("engine_warm")
+    if speedup is not None and speedup < ENGINE_MIN_WARM_SPEEDUP:
+        return [f"motor de efeitos só {speedup}x mais rápido que a referência com o cache preenchido "
+                f"(mínimo {ENGINE_MIN_WARM_SPEEDUP}x)"]
+    return []
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Compara os cenários com os de uma linha de base.
+
+    Returns:
+        Lista de mensagens, uma por métrica que piorou além da tolerância
+    """
+    if current.get("fingerprint") != baseline.get("fingerprint"):
+        print("Aviso: a linha de base foi gerada com outras tabelas de itens ou efeitos.")
+    if current.get("config") != baseline.get("config"):
+        print("Aviso: a linha de base foi gerada com outra configuração de benchmark.")
+
+    baseline_scenarios = {scenario["id"]: scenario for scenario in baseline.get("scenarios", [])}
+    regressions = []
+    for scenario in current["scenarios"]:
+        reference = baseline_scenarios.get(scenario["id"])
+        if reference is None:
+            continue
+        for metric, (higher_is_better, tolerance) in REGRESSION_TOLERANCES.items():
+            value, reference_value = scenario.get(metric), reference.get(metric)
+            if metric == "time_to_target_seconds":
+                # Não atingir o alvo é pior que qualquer tempo
+                if reference_value is not None and value is None:
+                    regressions.append(f"{scenario['id']}: {metric} não atingido (base {reference_value}s)")
+                if value is None or reference_value is None:
+                    continue
+                if value - reference_value <= TIME_TO_TARGET_SLACK_SECONDS:
+                    continue
+            if value is None or reference_value is None:
+                continue
+            if higher_is_better:
+                worse = value < reference_value * (1 - tolerance)
+            else:
+                worse = value > reference_value * (1 + tolerance)
+            if worse:
+                regressions.append(f"{scenario['id']}: {metric} {value} (base {reference_value})")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ponto de entrada do benchmark; retorna o código de saída."""
+    parser = argparse.ArgumentParser(prog="python benchmark.py",
+                                     description="Benchmark the genetic optimizer on fixed-seed scenarios.")
+    parser.add_argument("--output", default=BENCHMARK_FILE, help=f"results file (default: {BENCHMARK_FILE})")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a saved results file")
+    parser.add_argument("--time-limit", type=float, default=BENCHMARK_TIME_LIMIT_SECONDS,
+                        help=f"time budget per scenario in seconds (default: {BENCHMARK_TIME_LIMIT_SECONDS})")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help=f"base seed (default: {BENCHMARK_SEED})")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_COMBO_SIZES),
+                        help="combo sizes (default: 4 6 8)")
+    parser.add_argument("--raw-material", action="append", choices=list(RAW_MATERIALS.keys()),
+                        help="run only this raw material (repeatable)")
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = run_benchmark(args.raw_material, args.sizes, args.seed, args.time_limit)
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.output}")
+
+    failures = check_early_stopping(results) + check_engine_speedup(results)
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    if baseline is None:
+        return 1 if failures else 0
+    regressions = compare_results(results, baseline)
+    for regression in regressions:
+        print(f"REGRESSÃO: {regression}")
+    if not regressions:
+        print("Nenhuma regressão em relação à linha de base.")
+    return 1 if regressions or failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
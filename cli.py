@@ -0,0 +1,269 @@
+"""
+Interface de linha de comando do Schedule 1 Calculator, sem interface gráfica.
+Resolve uma consulta ou um arquivo de consultas (JSONL ou CSV) e imprime cada
+resultado como uma linha JSON assim que a consulta termina. As consultas de um
+lote rodam em paralelo em um pool de processos.
+
+Este módulo não importa tkinter nem PIL, então funciona em servidores e scripts:
+    python -m cli --raw-material "OG Kush" --combo-size 8 --ban Cuke --ban Donut
+    python -m cli --batch consultas.jsonl --workers 4
+
+Cada consulta tem os campos raw_material, combo_size, banned_items, time_limit_seconds,
+mode, seed (opcional) e early_stopping (padrão true); no CSV, os itens banidos vêm
+separados por ";". Os resultados de buscas trazem os parâmetros efetivos em
+"hyperparameters", incluindo a semente usada, o motivo da parada do algoritmo genético
+em "stop_reason" e, com --stats, as estatísticas da busca (SearchStats) em "stats".
+
+A saída padrão só recebe as linhas JSON; o log do otimizador vai para a saída de erro,
+no nível de --log-level (padrão WARNING).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+# Importações dos módulos locais
+from items import items
+from profiling import SearchStats
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+from utils import configure_logging
+
+DEFAULT_TIME_LIMIT_SECONDS = 30  # Tempo padrão de cada consulta (o mesmo de optimize)
+BANNED_ITEMS_SEPARATOR = ";"  # Separador dos itens banidos nas colunas do CSV
+
+def normalize_query(raw_query: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valida uma consulta e preenche os valores padrão.
+
+    Raises:
+        ValueError: Se a matéria-prima for desconhecida ou algum campo for inválido
+    """
+    raw_material = raw_query.get("raw_material")
+    if raw_material not in RAW_MATERIALS:
+        raise ValueError(f"Unknown raw material: {raw_material!r}")
+
+    banned_items = raw_query.get("banned_items") or []
+    if isinstance(banned_items, str):
+        banned_items = [item.strip() for item in banned_items.split(BANNED_ITEMS_SEPARATOR) if item.strip()]
+
+    unknown = [item for item in banned_items if item not in items]
+    if unknown:
+        raise ValueError(f"Unknown items: {', '.join(unknown)}")
+
+    combo_size = int(raw_query.get("combo_size") or 8)
+    if combo_size < 1:
+        raise ValueError(f"Invalid combo size: {combo_size}")
+
+    seed = raw_query.get("seed")
+    seed = None if seed in (None, "") else int(seed)
+
+    # No CSV os valores chegam como texto
+    early_stopping = raw_query.get("early_stopping")
+    if early_stopping in (None, ""):
+        early_stopping = True
+    elif isinstance(early_stopping, str):
+        early_stopping = early_stopping.strip().lower() not in ("0", "false", "no")
+
+    return {
+        "raw_material": raw_material,
+        "combo_size": combo_size,
+        "banned_items": sorted(set(banned_items)),
+        "time_limit_seconds": float(raw_query.get("time_limit_seconds") or DEFAULT_TIME_LIMIT_SECONDS),
+        "mode": raw_query.get("mode") or "auto",
+        "seed": seed,
+        "early_stopping": bool(early_stopping),
+    }
+
+def solve_query(query: Dict[str, Any], use_result_cache: bool = True, collect_stats: bool = False) -> Dict[str, Any]:
+    """
+    Resolve uma consulta normalizada e retorna o resultado como dicionário serializável.
+    Com collect_stats, o tempo de cada fase da busca também é medido e incluído em "stats".
+    """
+    start_time = time.time()
+    base_value = RAW_MATERIALS[query["raw_material"]]["value"]
+    search_stats = SearchStats(timings=collect_stats)
+    result = None
+    source = "search"
+    if query["mode"] in ("auto", "exact"):
+        # A receita pré-calculada continua ótima se não usar nenhum item banido
+        from recipe_index import lookup
+        indexed = lookup(query["raw_material"], query["combo_size"])
+        if indexed is not None and not set(query["banned_items"]) & set(indexed[0]):
+            result, source = indexed, "index"
+    if result is None:
+        from optimizer import optimize
+        result = optimize(
+            initial_effects=get_raw_material_initial_effects(query["raw_material"]),
+            time_limit_seconds=query["time_limit_seconds"],
+            combo_size=query["combo_size"],
+            banned_items=query["banned_items"],
+            base_value=base_value,
+            verbose=False,
+            mode=query["mode"],
+            use_result_cache=use_result_cache,
+            seed=query["seed"],
+            search_stats=search_stats,
+            early_stopping=query["early_stopping"]
+        )
+
+    combination, multiplier, effects, cost, profit, recipes = result
+    output = {
+        "query": query,
+        "combination": list(combination),
+        "multiplier": round(multiplier, 4),
+        "effects": effects,
+        "cost": cost,
+        "sell_price": round(base_value * multiplier, 2),
+        "profit": round(profit, 2),
+        "source": source,
+        "elapsed_seconds": round(time.time() - start_time, 3),
+    }
+    if source == "search":
+        output["hyperparameters"] = search_stats.hyperparameters
+        if search_stats.stop_reason:
+            output["stop_reason"] = search_stats.stop_reason
+        if collect_stats:
+            output["stats"] = search_stats.to_dict()
+    if recipes:
+        # Modos "pareto" e "lengths": lista de receitas
+        output["recipes"] = [
+            {"combination": list(recipe[0]), "multiplier": round(recipe[1], 4), "cost": recipe[3],
+             "sell_price": round(base_value * recipe[1], 2), "profit": round(recipe[4], 2)}
+            for recipe in recipes
+        ]
+    return output
+
+def _solve_line(index: int, raw_query: Dict[str, Any], use_result_cache: bool,
+                collect_stats: bool = False) -> Dict[str, Any]:
+    """Resolve uma consulta do lote; erros viram uma linha com o campo "error"."""
+    try:
+        output = solve_query(normalize_query(raw_query), use_result_cache, collect_stats)
+    except (ValueError, TypeError) as e:
+        output = {"query": raw_query, "error": str(e)}
+    output["index"] = index
+    return output
+
+def read_queries(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê as consultas de um arquivo JSONL (uma consulta por linha) ou CSV (com cabeçalho).
+    O formato é escolhido pela extensão; "-" lê JSONL da entrada padrão.
+    """
+    if path != "-" and path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as csv_file:
+            for row in csv.DictReader(csv_file):
+                yield {key: value for key, value in row.items() if value not in (None, "")}
+        return
+
+    query_file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in query_file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        if query_file is not sys.stdin:
+            query_file.close()
+
+def emit(output: Dict[str, Any]):
+    """Imprime um resultado como uma linha JSON, imediatamente."""
+    sys.stdout.write(json.dumps(output, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+def run_batch(queries: List[Dict[str, Any]], workers: Optional[int] = None, use_result_cache: bool = True,
+              collect_stats: bool = False, log_level: str = "WARNING", log_json: bool = False) -> int:
+    """
+    Resolve um lote de consultas em um pool de processos, emitindo cada resultado ao terminar.
+    Cada linha traz o campo "index" com a posição da consulta no lote. O log de cada
+    processo vai para a saída de erro, com o nível log_level.
+
+    Returns:
+        Número de consultas com erro
+    """
+    workers = workers or os.cpu_count() or 1
+    errors = 0
+    if workers <= 1 or len(queries) <= 1:
+        for index, raw_query in enumerate(queries):
+            output = _solve_line(index, raw_query, use_result_cache, collect_stats)
+            errors += "error" in output
+            emit(output)
+        return errors
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(queries)), initializer=configure_logging,
+                             initargs=(log_level, sys.stderr, log_json)) as pool:
+        futures = [pool.submit(_solve_line, index, raw_query, use_result_cache, collect_stats)
+                   for index, raw_query in enumerate(queries)]
+        for future in as_completed(futures):
+            output = future.result()
+            errors += "error" in output
+            emit(output)
+    return errors
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o analisador de argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Find the best mixing recipes without the GUI. Results are printed as JSON lines."
+    )
+    parser.add_argument("--raw-material", help="raw material of a single query (e.g. \"OG Kush\")")
+    parser.add_argument("--combo-size", type=int, default=8, help="number of items in the recipe (default: 8)")
+    parser.add_argument("--ban", action="append", default=[], metavar="ITEM",
+                        help="item that cannot be used (repeatable)")
+    parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT_SECONDS,
+                        help=f"hard deadline per query in seconds (default: {DEFAULT_TIME_LIMIT_SECONDS})")
+    parser.add_argument("--mode", default="auto",
+                        choices=["auto", "exact", "beam", "genetic", "bnb", "pareto", "lengths"],
+                        help="search mode (default: auto)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed of the genetic algorithm; a seeded run that stops before the time limit "
+                             "is reproducible")
+    parser.add_argument("--no-early-stopping", action="store_true",
+                        help="run the genetic algorithm until the time limit even after it converges")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="JSONL or CSV file of queries ('-' reads JSONL from stdin)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for batch queries (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the result cache")
+    parser.add_argument("--stats", action="store_true",
+                        help="time every search phase and include the search statistics in each result")
+    parser.add_argument("--log-level", default="WARNING", type=str.upper,
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="level of the search log written to stderr (default: WARNING)")
+    parser.add_argument("--log-json", action="store_true", help="write the search log as JSON lines")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ponto de entrada da linha de comando; retorna o código de saída."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level, sys.stderr, args.log_json)
+
+    if args.batch:
+        try:
+            queries = list(read_queries(args.batch))
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read {args.batch}: {e}")
+        errors = run_batch(queries, args.workers, not args.no_cache, args.stats, args.log_level, args.log_json)
+        return 1 if errors else 0
+
+    if not args.raw_material:
+        parser.error("either --raw-material or --batch is required")
+    query = {
+        "raw_material": args.raw_material,
+        "combo_size": args.combo_size,
+        "banned_items": args.ban,
+        "time_limit_seconds": args.time_limit,
+        "mode": args.mode,
+        "seed": args.seed,
+        "early_stopping": not args.no_early_stopping,
+    }
+    output = _solve_line(0, query, not args.no_cache, args.stats)
+    emit(output)
+    return 1 if "error" in output else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,523 @@
+"""
+Motor compilado de efeitos baseado em máscaras de bits.
+Converte as regras de items.py em máscaras inteiras e tabelas de consulta,
+permitindo avaliar receitas usando apenas operações com inteiros.
+"""
+
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Importações dos módulos locais
+from effects import effect_multipliers
+from items import items, item_prices
+
+MAX_EFFECTS = 8  # Limite máximo de efeitos simultâneos (igual a apply_item_effects)
+MULTIPLIER_SCALE = 100  # Multiplicadores são armazenados em centésimos inteiros
+DEFAULT_MAX_STATES = 200000  # Limite padrão de estados no cache de transições
+EVICTION_KEEP_RATIO = 0.75  # Fração dos estados mais recentes mantida em cada despejo
+STAMP_SAMPLE_PERIOD = 8  # Uma avaliação em cada STAMP_SAMPLE_PERIOD marca o uso dos estados intermediários
+DEFAULT_FITNESS_CACHE_SIZE = 100000  # Limite padrão de receitas na memória de avaliações do GA
+_CHUNK_BITS = 12  # Tamanho de cada bloco das tabelas de soma de multiplicadores
+
+class EffectSumTable:
+    """
+    Soma de um valor inteiro por efeito sobre os bits ativos de um estado.
+    Usa uma tabela de consulta por bloco de _CHUNK_BITS bits.
+    """
+
+    def __init__(self, values: Sequence[int]):
+        self._chunk_mask = (1 << _CHUNK_BITS) - 1
+        self._tables: List[List[int]] = []
+        for offset in range(0, len(values), _CHUNK_BITS):
+            chunk_values = values[offset:offset + _CHUNK_BITS]
+            table = [0] * (1 << len(chunk_values))
+            for value in range(1, len(table)):
+                low_bit = value & -value
+                table[value] = table[value ^ low_bit] + chunk_values[low_bit.bit_length() - 1]
+            self._tables.append(table)
+
+    def __call__(self, state: int) -> int:
+        total = 0
+        for table in self._tables:
+            total += table[state & self._chunk_mask]
+            state >>= _CHUNK_BITS
+        return total
+
+class EffectEngine:
+    """
+    Versão compilada de apply_item_effects.
+
+    Cada efeito ocupa um bit de um inteiro e cada item é compilado em:
+    - o bit do seu efeito principal;
+    - a máscara dos efeitos relevantes (efeito principal + efeitos afetados pelas regras);
+    - uma tabela que, para cada subconjunto dos efeitos relevantes (e para o caso
+      de limite de 8 efeitos atingido), guarda as máscaras de bits a manter e a ligar.
+      As entradas são calculadas na primeira vez em que são usadas.
+
+    Sobre essas tabelas o motor mantém um TransitionCache, preenchido sob demanda.
+    A avaliação de uma receita percorre apenas esse cache, usando inteiros; a
+    conversão para dicionário de efeitos só é feita para a resposta final
+    (decode_effects).
+
+    Os valores dos efeitos iniciais são sempre os de effect_multipliers.
+    """
+
+    def __init__(self, items_table: Dict[str, dict] = None,
+                 multipliers: Dict[str, float] = None,
+                 prices: Dict[str, float] = None,
+                 max_states: int = DEFAULT_MAX_STATES):
+        items_table = items if items_table is None else items_table
+        multipliers = effect_multipliers if multipliers is None else multipliers
+        prices = item_prices if prices is None else prices
+
+        # Efeitos: nome <-> bit
+        self.effect_values: Dict[str, float] = dict(multipliers)
+        self.effect_names: List[str] = list(multipliers.keys())
+        self.effect_bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(self.effect_names)}
+        self.effect_units: List[int] = [round(multipliers[name] * MULTIPLIER_SCALE) for name in self.effect_names]
+        self._cap_flag = 1 << len(self.effect_names)  # Bit extra usado nas chaves quando o limite foi atingido
+
+        # Itens: nome <-> índice
+        self.item_names: List[str] = list(items_table.keys())
+        self.item_index: Dict[str, int] = {name: i for i, name in enumerate(self.item_names)}
+        self.item_effect_bits: List[int] = []
+        self.item_rules: List[Tuple[Tuple[int, int], ...]] = []
+        self.item_costs: List[float] = []
+        self._item_masks: List[int] = []
+        self._item_tables: List[Dict[int, Tuple[int, int]]] = []
+        self._item_touched: List[int] = []
+        self._item_gains: List[Dict[int, int]] = []
+
+        for name in self.item_names:
+            item = items_table[name]
+            effect_bit = self.effect_bits[item["effect"]]
+            # Regras sobre o próprio efeito do item nunca são aplicadas
+            rules = tuple(
+                (self.effect_bits[old], self.effect_bits[new])
+                for old, new in item["rules"].items()
+                if old != item["effect"]
+            )
+            relevant_mask = effect_bit
+            touched_mask = effect_bit
+            for old_bit, new_bit in rules:
+                relevant_mask |= old_bit
+                touched_mask |= old_bit | new_bit
+            self.item_effect_bits.append(effect_bit)
+            self.item_rules.append(rules)
+            self.item_costs.append(prices.get(name, 0))
+            self._item_masks.append(relevant_mask)
+            self._item_tables.append({})
+            self._item_touched.append(touched_mask)
+            self._item_gains.append({})
+
+        # Soma dos multiplicadores de um estado por tabelas de consulta
+        self._unit_sum = EffectSumTable(self.effect_units)
+
+        # Cache de transições (estado, item) -> próximo estado
+        self.transitions = TransitionCache(self, max_states)
+
+    def _compile_entry(self, item: int, key: int) -> Tuple[int, int]:
+        """
+        Calcula o efeito de um item para uma chave da sua tabela
+        (subconjunto dos efeitos relevantes + bit de limite atingido).
+        Retorna (máscara a manter, máscara a ligar).
+        """
+        effect_bit = self.item_effect_bits[item]
+        state = key & ~self._cap_flag
+        cleared = 0
+        added = 0
+        if not state & effect_bit and not key & self._cap_flag:
+            state |= effect_bit
+            added |= effect_bit
+        # As regras ativas são coletadas antes de qualquer substituição
+        changes = [rule for rule in self.item_rules[item] if state & rule[0]]
+        for old_bit, new_bit in changes:
+            state = (state & ~old_bit) | new_bit
+            cleared = (cleared | old_bit) & ~new_bit
+            added = (added & ~old_bit) | new_bit
+        return ~cleared, added
+
+    def encode_effects(self, effects: Dict[str, float] = None) -> int:
+        """Converte um dicionário de efeitos em máscara de bits."""
+        state = 0
+        if effects:
+            for name in effects:
+                state |= self.effect_bits[name]
+        return state
+
+    def decode_effects(self, state: int) -> Dict[str, float]:
+        """Converte uma máscara de bits de volta em dicionário de efeitos."""
+        return {
+            name: self.effect_values[name]
+            for i, name in enumerate(self.effect_names)
+            if state >> i & 1
+        }
+
+    def encode_items(self, combination: Sequence[str]) -> List[int]:
+        """Converte uma lista de nomes de itens em índices."""
+        return [self.item_index[name] for name in combination]
+
+    def decode_items(self, indices: Sequence[int]) -> List[str]:
+        """Converte uma lista de índices de itens em nomes."""
+        return [self.item_names[item] for item in indices]
+
+    def apply_item(self, state: int, item: int) -> int:
+        """
+        Aplica um único item (por índice) a um estado e retorna o novo estado.
+        Segue exatamente a semântica de apply_item_effects.
+        """
+        key = state & self._item_masks[item]
+        if state.bit_count() >= MAX_EFFECTS:
+            key |= self._cap_flag
+        entry = self._item_tables[item].get(key)
+        if entry is None:
+            entry = self._item_tables[item][key] = self._compile_entry(item, key)
+        keep, added = entry
+        return (state & keep) | added
+
+    def apply_items(self, indices: Sequence[int], state: int = 0) -> int:
+        """Aplica uma sequência de itens (por índice) a partir de um estado."""
+        return self.evaluate_indices(indices, state)[0]
+
+    def successors(self, state: int, candidates: Sequence[int]) -> List[int]:
+        """Retorna o estado resultante de cada item candidato (por índice), na mesma ordem."""
+        capped = self._cap_flag if state.bit_count() >= MAX_EFFECTS else 0
+        item_masks = self._item_masks
+        item_tables = self._item_tables
+        result = []
+        for item in candidates:
+            key = (state & item_masks[item]) | capped
+            entry = item_tables[item].get(key)
+            if entry is None:
+                entry = item_tables[item][key] = self._compile_entry(item, key)
+            result.append((state & entry[0]) | entry[1])
+        return result
+
+    def best_step(self, state: int, candidates: Sequence[int], base_value: float) -> Tuple[float, int]:
+        """
+        Encontra o item que maximiza base_value * multiplicador - custo após uma única mistura.
+
+        A variação do multiplicador causada por um item depende apenas dos efeitos que ele
+        pode tocar (efeito principal, origens e destinos das regras) e do limite de efeitos,
+        então ela é tabelada por item sem construir o estado seguinte.
+
+        Returns:
+            Tupla contendo: (pontuação em centésimos, índice do item); (-inf, -1) se não houver candidatos
+        """
+        base_units = self._unit_sum(state)
+        capped = self._cap_flag if state.bit_count() >= MAX_EFFECTS else 0
+        touched_masks = self._item_touched
+        gain_tables = self._item_gains
+        item_costs = self.item_costs
+
+        best_score = float("-inf")
+        best_item = -1
+        for item in candidates:
+            key = (state & touched_masks[item]) | capped
+            gain = gain_tables[item].get(key)
+            if gain is None:
+                local_state = key & ~self._cap_flag
+                if capped:
+                    # Preenche bits fora da máscara para reproduzir o limite de efeitos
+                    local_state |= state & ~touched_masks[item]
+                gain = self._unit_sum(self.apply_item(local_state, item)) - self._unit_sum(local_state)
+                gain_tables[item][key] = gain
+            score = base_value * (MULTIPLIER_SCALE + base_units + gain) - MULTIPLIER_SCALE * item_costs[item]
+            if score > best_score:
+                best_score = score
+                best_item = item
+        return best_score, best_item
+
+    def multiplier_units(self, state: int) -> int:
+        """Retorna a soma dos multiplicadores de um estado, em centésimos."""
+        return self._unit_sum(state)
+
+    def multiplier(self, state: int) -> float:
+        """Retorna o multiplicador total (1.0 + soma) de um estado."""
+        return 1.0 + self.multiplier_units(state) / MULTIPLIER_SCALE
+
+    def cost(self, indices: Sequence[int]) -> float:
+        """Retorna o custo total de uma sequência de itens (por índice)."""
+        item_costs = self.item_costs
+        return sum(item_costs[item] for item in indices)
+
+    def evaluate_indices(self, indices: Sequence[int], state: int = 0) -> Tuple[int, float, float]:
+        """
+        Avalia uma receita usando apenas inteiros.
+
+        Args:
+            indices: Índices dos itens na ordem em que serão aplicados
+            state: Máscara de bits dos efeitos iniciais
+
+        Returns:
+            Tupla contendo: (estado final, multiplicador, custo total)
+        """
+        return self.transitions.evaluate(indices, state)
+
+    def evaluate(self, combination: Sequence[str], initial_effects: Dict[str, float] = None) -> Tuple[float, Dict[str, float], float]:
+        """
+        Avalia uma combinação de itens no mesmo formato de evaluate_combination.
+
+        Returns:
+            Tupla contendo: (multiplicador, efeitos finais, custo total)
+        """
+        indices = self.encode_items(combination)
+        state, multiplier, cost = self.evaluate_indices(indices, self.encode_effects(initial_effects))
+        return multiplier, self.decode_effects(state), cost
+
+class TransitionCache:
+    """
+    Cache de transições (estado de efeitos, item) -> próximo estado.
+
+    Os estados alcançados recebem uma linha numa lista densa com o próximo
+    estado para cada item (-1 enquanto a transição não foi calculada) e uma
+    posição extra com o instante do último uso. A tabela é preenchida sob
+    demanda durante a busca e limitada a max_states estados: quando o limite
+    é atingido, os estados usados há mais tempo (LRU) são descartados e a
+    tabela é compactada. Em evaluate, o instante de uso dos estados
+    intermediários só é gravado por uma avaliação em cada STAMP_SAMPLE_PERIOD:
+    a gravação custava quase metade de cada passo, e um estado usado com
+    frequência continua sendo marcado por alguma das avaliações amostradas.
+
+    Contadores: hits (transições encontradas), misses (transições calculadas)
+    e evictions (estados descartados).
+    """
+
+    def __init__(self, engine: EffectEngine, max_states: int = DEFAULT_MAX_STATES):
+        self.engine = engine
+        self.max_states = max_states
+        self._stamp_slot = len(engine.item_names)  # Posição do instante de uso na linha
+        self._stride = self._stamp_slot + 1  # Tamanho de cada linha
+        self._ids: Dict[int, int] = {}
+        self._masks: List[int] = []
+        self._units: List[int] = []
+        self._next: List[int] = []
+        self._tick = 0
+        self._lookups = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    @property
+    def hits(self) -> int:
+        """Número de transições atendidas pelo cache."""
+        return self._lookups - self.misses
+
+    def stats(self) -> Dict[str, float]:
+        """Retorna os contadores do cache."""
+        hits = self.hits
+        return {
+            "hits": hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "states": len(self._masks),
+            "max_states": self.max_states,
+            "hit_rate": hits / self._lookups if self._lookups else 0.0,
+        }
+
+    def reset_stats(self):
+        """Zera os contadores sem descartar as transições."""
+        self._lookups = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        """
+        Descarta todas as transições.
+        As listas são esvaziadas no lugar para que referências locais continuem válidas.
+        """
+        self._ids.clear()
+        self._masks.clear()
+        self._units.clear()
+        self._next.clear()
+
+    def resize(self, max_states: int):
+        """Altera o limite de estados, descartando os menos recentes se necessário."""
+        self.max_states = max(1, max_states)
+        if len(self._masks) > self.max_states:
+            self._evict(self.max_states)
+
+    def _intern(self, state: int) -> int:
+        """
+        Retorna a linha de um estado, criando-a se necessário.
+        Se o limite foi atingido, os estados menos recentes são descartados antes.
+        """
+        row = self._ids.get(state)
+        if row is None:
+            if len(self._masks) >= self.max_states:
+                self._evict(int(self.max_states * EVICTION_KEEP_RATIO))
+            row = len(self._masks) * self._stride
+            self._ids[state] = row
+            self._masks.append(state)
+            self._units.append(self.engine.multiplier_units(state))
+            self._next.extend([-1] * self._stamp_slot)
+            self._next.append(self._tick)
+        return row
+
+    def _miss(self, row: int, item: int) -> int:
+        """
+        Calcula uma transição ausente e a registra.
+        Se o novo estado provocar um despejo, a transição de origem não é
+        registrada, pois a linha de origem pode ter mudado.
+        """
+        self.misses += 1
+        state = self.engine.apply_item(self._masks[row // self._stride], item)
+        target = self._ids.get(state)
+        if target is None:
+            evicting = len(self._masks) >= self.max_states
+            target = self._intern(state)
+            if evicting:
+                return target
+        self._next[row + item] = target
+        return target
+
+    def _evict(self, keep: int):
+        """Mantém apenas os keep estados usados mais recentemente e compacta a tabela."""
+        stride = self._stride
+        stamp_slot = self._stamp_slot
+        old_next = self._next
+        old_masks = self._masks
+        old_units = self._units
+
+        stamps = old_next[stamp_slot::stride]
+        survivors = sorted(range(len(old_masks)), key=stamps.__getitem__, reverse=True)[:keep]
+        survivors.sort()
+
+        # remap[id antigo] = nova linha (ou -1); a última posição atende o valor -1
+        remap = [-1] * (len(old_masks) + 1)
+        for new_id, old_id in enumerate(survivors):
+            remap[old_id] = new_id * stride
+
+        new_next = []
+        for old_id in survivors:
+            base = old_id * stride
+            new_next.extend([remap[target // stride] for target in old_next[base:base + stamp_slot]])
+            new_next.append(old_next[base + stamp_slot])
+
+        self.evictions += len(old_masks) - len(survivors)
+        self._masks[:] = [old_masks[old_id] for old_id in survivors]
+        self._units[:] = [old_units[old_id] for old_id in survivors]
+        self._next[:] = new_next
+        self._ids.clear()
+        self._ids.update((mask, i * stride) for i, mask in enumerate(self._masks))
+
+    def step(self, state: int, item: int) -> int:
+        """Retorna o estado resultante de aplicar um item (por índice) a um estado."""
+        self._tick += 1
+        self._lookups += 1
+        row = self._ids.get(state)
+        if row is None:
+            row = self._intern(state)
+        self._next[row + self._stamp_slot] = self._tick
+        target = self._next[row + item]
+        if target < 0:
+            target = self._miss(row, item)
+        self._next[target + self._stamp_slot] = self._tick
+        return self._masks[target // self._stride]
+
+    def evaluate(self, indices: Sequence[int], state: int = 0) -> Tuple[int, float, float]:
+        """
+        Avalia uma receita percorrendo o cache.
+
+        Returns:
+            Tupla contendo: (estado final, multiplicador, custo total)
+        """
+        self._tick += 1
+        tick = self._tick
+        self._lookups += len(indices)
+
+        next_rows = self._next
+        item_costs = self.engine.item_costs
+        stamp_slot = self._stamp_slot
+        row = self._ids.get(state)
+        if row is None:
+            row = self._intern(state)
+        cost = 0
+        if tick % STAMP_SAMPLE_PERIOD:
+            for item in indices:
+                target = next_rows[row + item]
+                if target < 0:
+                    target = self._miss(row, item)
+                row = target
+                cost += item_costs[item]
+        else:
+            for item in indices:
+                next_rows[row + stamp_slot] = tick
+                target = next_rows[row + item]
+                if target < 0:
+                    target = self._miss(row, item)
+                row = target
+                cost += item_costs[item]
+        next_rows[row + stamp_slot] = tick
+
+        state_id = row // self._stride
+        multiplier = 1.0 + self._units[state_id] / MULTIPLIER_SCALE
+        return self._masks[state_id], multiplier, cost
+
+class FitnessCache:
+    """
+    Memória de avaliações de receitas de uma execução do algoritmo genético.
+
+    A chave é a tupla de índices da receita; os efeitos iniciais fazem parte
+    do cache (initial_state), então cada execução cria o seu. Guarda
+    (estado final, multiplicador, custo) e é limitado a max_entries receitas:
+    quando o limite é atingido, as receitas inseridas há mais tempo são
+    descartadas até restar EVICTION_KEEP_RATIO do limite.
+
+    Contadores: hits (avaliações repetidas evitadas), misses (avaliações
+    feitas) e evictions (receitas descartadas).
+    """
+
+    def __init__(self, initial_state: int = 0, max_entries: int = DEFAULT_FITNESS_CACHE_SIZE):
+        self.initial_state = initial_state
+        self.max_entries = max(1, max_entries)
+        self._entries: Dict[Tuple[int, ...], Tuple[int, float, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Retorna os contadores do cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def get(self, key: Tuple[int, ...]) -> Optional[Tuple[int, float, float]]:
+        """Retorna (estado, multiplicador, custo) de uma receita já avaliada, ou None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: Tuple[int, ...], entry: Tuple[int, float, float]):
+        """Guarda a avaliação de uma receita, descartando as mais antigas se necessário."""
+        entries = self._entries
+        if len(entries) >= self.max_entries and key not in entries:
+            # Dicionários preservam a ordem de inserção: as primeiras chaves são as mais antigas
+            discard = len(entries) - int(self.max_entries * EVICTION_KEEP_RATIO) + 1
+            for old_key in list(islice(entries, discard)):
+                del entries[old_key]
+            self.evictions += discard
+        entries[key] = entry
+
+_default_engine = None
+
+def get_engine() -> EffectEngine:
+    """Retorna o motor compilado a partir das tabelas padrão (criado uma única vez)."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = EffectEngine()
+    return _default_engine
@@ -1,29 +1,48 @@
 """
 Interface gráfica do usuário para o Schedule 1 Calculator.
+O otimizador (e o NumPy) e o PIL são importados no primeiro uso, para a janela
+aparecer sem esperar por eles; o otimizador é pré-carregado em segundo plano.
 """
 
 import tkinter as tk
 from tkinter import ttk, filedialog
-from PIL import Image, ImageTk
 import os
 import sys
 import threading
-import time
 import queue
+import time
 from typing import Dict, List, Tuple, Optional, Callable
 
 # Importações dos módulos locais
 from effects import effect_multipliers
 from items import items, item_prices, get_all_items
 from raw_materials import RAW_MATERIALS
-from utils import resource_path
-from optimizer import optimize
+from utils import get_logger, resource_path
+from profiling import SearchStats
+from recipe_index import INDEX_TOP_K, lookup as lookup_indexed_recipe
+
+logger = get_logger("gui")
+
+def _preload_optimizer():
+    """Importa o otimizador e compila o motor de efeitos antes do primeiro cálculo."""
+    try:
+        import optimizer
+        from effect_engine import get_engine
+        get_engine()
+    except Exception as e:
+        logger.warning("Error preloading optimizer: %s", e)
 
 class Schedule1Calculator(tk.Tk):
     """Interface gráfica para o Schedule 1 Calculator."""
     
-    def __init__(self):
-        """Inicializa a interface gráfica."""
+    def __init__(self, start_time: Optional[float] = None):
+        """
+        Inicializa a interface gráfica.
+
+        Args:
+            start_time: Instante (time.perf_counter) em que o programa começou; usado para
+                medir o tempo até a primeira janela (startup_seconds)
+        """
         super().__init__()
         self.title("Schedule 1 Calculator")
         self.geometry("850x800")
@@ -33,8 +52,16 @@ class Schedule1Calculator(tk.Tk):
         self.raw_material_var = tk.StringVar()
         self.combo_size_var = tk.IntVar(value=4)
         self.banned_items_vars = {}
+        self.diagnostics_var = tk.BooleanVar(value=False)
         self.raw_material_img = None
         
+        # Imagens já decodificadas, por (caminho, tamanho)
+        self.image_cache = {}
+        
+        # Tempo até a primeira janela, medido quando ela é exibida
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.startup_seconds = None
+        
         # Inicializa dicionários para armazenar resultados
         self.result_combination = []
         self.result_multiplier = 0.0
@@ -42,16 +69,27 @@ class Schedule1Calculator(tk.Tk):
         self.result_cost = 0.0
         self.result_profit = 0.0
         self.result_sell_price = 0.0
+        self.result_alternatives = []
+        self.result_stats = None
         
         # Fila para comunicação entre threads
         self.progress_queue = queue.Queue()
         self.is_calculating = False
         
         self.create_widgets()
+        self.bind("<Map>", self._on_first_map, add="+")
         
         # Inicia monitoramento da fila de progresso
         self.monitor_progress_queue()
     
+    def _on_first_map(self, event):
+        """Registra o tempo até a primeira janela e pré-carrega o otimizador."""
+        if event.widget is not self or self.startup_seconds is not None:
+            return
+        self.startup_seconds = time.perf_counter() - self.start_time
+        logger.info("Time to first window: %.3fs", self.startup_seconds)
+        threading.Thread(target=_preload_optimizer, daemon=True).start()
+    
     def create_widgets(self):
         """Cria os widgets da interface gráfica."""
         # Frame principal dividido em duas colunas
@@ -162,6 +200,11 @@ class Schedule1Calculator(tk.Tk):
         calc_button_frame = ttk.Frame(parent_frame)
         calc_button_frame.pack(fill=tk.X, padx=5, pady=10)
         
+        # Mede o tempo de cada fase da busca para o painel de diagnóstico
+        diagnostics_check = ttk.Checkbutton(calc_button_frame, text="Collect phase timings (diagnostics)",
+                                            variable=self.diagnostics_var)
+        diagnostics_check.pack(anchor=tk.W, padx=5, pady=2)
+        
         # Botão Calcular com melhor destaque
         self.calc_button = tk.Button(calc_button_frame, text="CALCULATE", 
                                    command=self.run_calculation,
@@ -235,6 +278,21 @@ class Schedule1Calculator(tk.Tk):
         # Listbox para exibir efeitos
         self.effects_listbox = tk.Listbox(effects_frame)
         self.effects_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Frame para receitas alternativas
+        alternatives_frame = ttk.LabelFrame(self.result_frame, text="Alternative Recipes")
+        alternatives_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Listbox para exibir as melhores receitas distintas
+        self.alternatives_listbox = tk.Listbox(alternatives_frame)
+        self.alternatives_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Painel de diagnóstico: estatísticas da última busca (SearchStats)
+        diagnostics_frame = ttk.LabelFrame(self.result_frame, text="Diagnostics")
+        diagnostics_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.diagnostics_listbox = tk.Listbox(diagnostics_frame, height=6)
+        self.diagnostics_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
     
     def update_raw_material(self, event=None):
         """Atualiza as informações da matéria-prima selecionada."""
@@ -267,19 +325,28 @@ class Schedule1Calculator(tk.Tk):
         self.items_count_label.config(text=f"Quantity: {count}")
     
     def load_image(self, label, path, size=(50, 50)):
-        """Carrega uma imagem e a exibe em um label."""
-        try:
-            img_path = resource_path(path)
-            print(f"Tentando carregar imagem de: {img_path}")  # Linha de depuração
-            img = Image.open(img_path)
-            img = img.resize(size, Image.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
+        """Carrega uma imagem e a exibe em um label; cada imagem é decodificada uma única vez."""
+        key = (path, tuple(size))
+        if key in self.image_cache:
+            photo = self.image_cache[key]
+        else:
+            try:
+                from PIL import Image, ImageTk
+                img_path = resource_path(path)
+                logger.debug("Tentando carregar imagem de: %s", img_path)
+                img = Image.open(img_path)
+                img = img.resize(size, Image.LANCZOS)
+                photo = ImageTk.PhotoImage(img)
+            except Exception as e:
+                logger.warning("Erro ao carregar imagem %s: %s", path, e)
+                photo = None
+            # Falhas também ficam em cache, para não tentar de novo a cada seleção
+            self.image_cache[key] = photo
+        
+        if photo is not None:
             label.config(image=photo)
             label.image = photo  # Mantém uma referência
-            return photo
-        except Exception as e:
-            print(f"Erro ao carregar imagem {path}: {e}")
-            return None
+        return photo
         
     def run_calculation(self):
         """Executa o cálculo em uma thread separada para evitar congelar a UI."""
@@ -298,6 +365,9 @@ class Schedule1Calculator(tk.Tk):
         self.progress_details.config(text="Preparing...")
         self.items_listbox.delete(0, tk.END)
         self.effects_listbox.delete(0, tk.END)
+        self.alternatives_listbox.delete(0, tk.END)
+        self.diagnostics_listbox.delete(0, tk.END)
+        self.result_stats = None
         self.mult_label.config(text="Multiplier: -")
         self.cost_label.config(text="Total Cost: -")
         self.profit_label.config(text="Estimated Profit: -")
@@ -319,15 +389,43 @@ class Schedule1Calculator(tk.Tk):
         # Obtém itens banidos
         banned_items = [item for item, var in self.banned_items_vars.items() if var.get()]
         
+        # Mostra imediatamente a receita pré-calculada (sem itens banidos), se existir
+        indexed_result = lookup_indexed_recipe(selected_material, combo_size, INDEX_TOP_K)
+        if indexed_result is not None:
+            (self.result_combination, self.result_multiplier, self.result_effects, self.result_cost,
+             self.result_profit, alternatives) = indexed_result
+            # Alternativas com itens banidos não são mostradas
+            self.result_alternatives = [alternative for alternative in alternatives
+                                        if not set(banned_items) & set(alternative[0])]
+            self.result_sell_price = base_value * self.result_multiplier
+            self.update_results()
+            
+            if len(self.result_alternatives) == len(alternatives):
+                # As receitas ótimas sem restrições não usam nenhum item banido, então continuam ótimas
+                self.is_calculating = False
+                self.calc_button.config(state=tk.NORMAL)
+                self.cancel_button.config(state=tk.DISABLED)
+                self.progress_bar['value'] = 100
+                self.progress_text.config(text="100%")
+                self.calc_status_label.config(text="Calculation completed!")
+                self.progress_details.config(text="Loaded from the precomputed recipe index.")
+                return
+            
+            # Alguma receita indexada usa itens banidos: fica visível enquanto a busca roda em segundo plano
+            self.calc_status_label.config(text=f"Refining for banned items with {selected_material}...")
+            self.progress_details.config(text="Showing the precomputed recipe while searching without banned items...")
+            self.update()
+        
         # Atualiza status inicial
-        self.calc_status_label.config(text=f"Calculating with {selected_material}...")
-        self.progress_details.config(text=f"Searching for the best combination of {combo_size} items...")
-        self.update()  # Força atualização da UI antes de iniciar o cálculo
+        if indexed_result is None:
+            self.calc_status_label.config(text=f"Calculating with {selected_material}...")
+            self.progress_details.config(text=f"Searching for the best combination of {combo_size} items...")
+            self.update()  # Força atualização da UI antes de iniciar o cálculo
         
         # Inicia o cálculo em uma thread separada
         self.calculation_thread = threading.Thread(
             target=self.perform_calculation, 
-            args=(initial_effects, banned_items, combo_size, base_value)
+            args=(initial_effects, banned_items, combo_size, base_value, self.diagnostics_var.get())
         )
         self.calculation_thread.daemon = True  # Termina a thread quando o programa principal termina
         self.calculation_thread.start()
@@ -382,35 +480,47 @@ class Schedule1Calculator(tk.Tk):
                     self.progress_details.config(text="")
         
         except Exception as e:
-            print(f"Error monitoring progress queue: {e}")
+            logger.exception("Error monitoring progress queue: %s", e)
         
         # Agenda a próxima verificação
         self.after(100, self.monitor_progress_queue)
     
-    def perform_calculation(self, initial_effects, banned_items, combo_size, base_value):
+    def perform_calculation(self, initial_effects, banned_items, combo_size, base_value, collect_timings=False):
         """Executa o cálculo e atualiza a UI com os resultados."""
         try:
             # Informa o início do cálculo
             self.progress_queue.put(("status", "Initializing optimizer..."))
             self.progress_queue.put(("progress", (5, "Preparing calculation environment")))
             
-            print("Starting calculation with the following parameters:")
-            print(f"Initial effects: {initial_effects}")
-            print(f"Banned items: {banned_items}")
-            print(f"Combination size: {combo_size}")
-            print(f"Base value: {base_value}")
+            # Importado aqui (normalmente já pré-carregado) para não atrasar a abertura da janela
+            from optimizer import optimize, DEFAULT_TOP_K
+            
+            logger.info("Starting calculation with the following parameters:")
+            logger.info("Initial effects: %s", initial_effects)
+            logger.info("Banned items: %s", banned_items)
+            logger.info("Combination size: %s", combo_size)
+            logger.info("Base value: %s", base_value)
+            
+            # Estatísticas da busca para o painel de diagnóstico
+            search_stats = SearchStats(timings=collect_timings)
             
             # Executa a função de otimização modificada com feedback de progresso
             result = optimize(
                 initial_effects=initial_effects,
                 banned_items=banned_items,
-                time_limit_seconds=60,  # Ajuste conforme necessário
+                # Prazo máximo: as buscas exatas terminam antes e o algoritmo genético para ao convergir
+                time_limit_seconds=60,
                 combo_size=combo_size,
                 max_perms_to_test=5000,  # Ajuste conforme necessário
                 base_value=base_value,
                 progress_callback=self.update_progress,
-                # Não exibe saída no console
-                verbose=False
+                # O resultado é exibido na janela, não no log
+                verbose=False,
+                # Consultas repetidas são respondidas pelo cache persistente
+                use_result_cache=True,
+                # Também lista as melhores receitas distintas
+                top_k=DEFAULT_TOP_K,
+                search_stats=search_stats
             )
             
             # Verifica se o cálculo foi cancelado
@@ -418,18 +528,19 @@ class Schedule1Calculator(tk.Tk):
                 return
             
             # Extrai resultados
-            self.result_combination, self.result_multiplier, self.result_effects, self.result_cost, self.result_profit = result
+            (self.result_combination, self.result_multiplier, self.result_effects, self.result_cost,
+             self.result_profit, self.result_alternatives) = result
+            self.result_stats = search_stats
             
             # Calcula o Sell Price (base_value * multiplier)
             self.result_sell_price = base_value * self.result_multiplier
             
             # Informa que o cálculo está completo
             self.progress_queue.put(("progress", (95, "Finalizing and processing results")))
-            time.sleep(0.5)  # Pequena pausa para visualização
             self.progress_queue.put(("complete", None))
             
         except Exception as e:
-            print(f"Error during calculation: {e}")
+            logger.exception("Error during calculation: %s", e)
             self.progress_queue.put(("error", str(e)))
     
     def update_progress(self, percentage, message=None):
@@ -460,6 +571,18 @@ class Schedule1Calculator(tk.Tk):
         for effect, value in sorted(self.result_effects.items(), key=lambda x: x[1], reverse=True):
             self.effects_listbox.insert(tk.END, f"{effect}: +{value:.2f}")
         
+        # Atualiza listbox de receitas alternativas
+        self.alternatives_listbox.delete(0, tk.END)
+        for i, (combination, multiplier, _, cost, profit) in enumerate(self.result_alternatives, 1):
+            self.alternatives_listbox.insert(
+                tk.END, f"{i}. ${round(profit)} profit, x{multiplier:.2f}, ${cost:.2f}: {' > '.join(combination)}")
+        
+        # Atualiza o painel de diagnóstico
+        self.diagnostics_listbox.delete(0, tk.END)
+        if self.result_stats is not None:
+            for line in self.result_stats.format_lines():
+                self.diagnostics_listbox.insert(tk.END, line)
+        
         # Atualiza status final
         self.progress_details.config(text=f"Analyzed {len(self.result_combination)} item combinations.")
 
@@ -2,14 +2,24 @@
 Arquivo principal para iniciar o aplicativo Schedule 1 Calculator.
 """
 
+import time
+
+START_TIME = time.perf_counter()  # Início do programa, para medir o tempo até a primeira janela
+
+import multiprocessing
 import os
 import sys
 from gui import Schedule1Calculator
+from utils import configure_logging
 
 def main():
     """Função principal para iniciar o aplicativo."""
-    app = Schedule1Calculator()
+    # Log no console; o nível vem de MIXINGCALCULATOR_LOG_LEVEL (padrão INFO)
+    configure_logging(stream=sys.stdout)
+    app = Schedule1Calculator(start_time=START_TIME)
     app.mainloop()
 
 if __name__ == "__main__":
+    # Necessário para o modelo de ilhas do otimizador em executáveis congelados no Windows
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
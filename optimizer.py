@@ -3,14 +3,56 @@ Módulo de otimização para encontrar a melhor combinação de itens.
 Contém algoritmos genéticos para encontrar combinações ótimas.
 """
 
+import heapq
 import itertools
+import logging
+import math
+import os
 import random
+import sys
 import time
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Set, Tuple, Callable, Optional, Union
 
 # Importações dos módulos locais
 from effects import effect_multipliers, calculate_total_multiplier
 from items import items, item_prices, calculate_total_cost
+from effect_engine import (get_engine, EffectSumTable, FitnessCache, MAX_EFFECTS, MULTIPLIER_SCALE,
+                           DEFAULT_FITNESS_CACHE_SIZE)
+from batch_evaluator import get_batch_evaluator, HAS_NUMPY
+from result_cache import get_result_cache, make_query_key
+from rule_graph import graph_for_items
+from profiling import SearchStats
+from utils import get_logger
+
+EXACT_MAX_COMBO_SIZE = 8  # Maior tamanho de combinação resolvido pela busca exata no modo "auto"
+EXACT_INCUMBENT_BEAM_WIDTH = 1024  # Largura do feixe usado como solução inicial da busca exata
+DEFAULT_BEAM_WIDTH = 256  # Largura padrão da busca em feixe
+BNB_GENETIC_TIME_FRACTION = 0.5  # Fração do prazo do modo "bnb" dada ao algoritmo genético; o resto fica para a prova
+BEAM_OPTIMISM = 0.5  # Fração do ganho máximo admissível usada para ordenar o feixe (1.0 = limite superior puro)
+ISLAND_EPOCH_SECONDS = 1.0  # Duração de cada época do modelo de ilhas, entre migrações
+ISLAND_EPOCH_GENERATIONS = 50  # Duração de cada época em gerações, nas execuções com semente (reprodutíveis)
+ISLAND_MIGRATION_SIZE = 5  # Número de melhores indivíduos que migram para a ilha vizinha a cada época
+SEARCH_MEMORY_MAX_STATES = 2000000  # Máximo de estados da fronteira da busca exata guardados entre consultas
+SEARCH_MEMORY_ELITES = 50  # Número de receitas da última busca guardadas para semear a próxima
+SEARCH_MEMORY_PROVEN = 64  # Número de soluções ótimas provadas guardadas entre consultas
+DEFAULT_TOP_K = 10  # Número padrão de receitas alternativas pedidas pela interface
+TARGET_MAX_STEPS = 12  # Maior número de misturas considerado pela busca de efeitos-alvo
+MAX_GENERATIONS = 10000  # Número máximo padrão de gerações do algoritmo genético
+PROGRESS_INTERVAL_SECONDS = 0.25  # Intervalo mínimo entre relatórios de progresso do algoritmo genético
+CONVERGENCE_CHECK_GENERATIONS = 10  # Intervalo, em gerações, entre verificações do critério de parada antecipada
+CONVERGENCE_MIN_GENERATIONS = 1500  # Mínimo de gerações sem melhoria relevante antes de parar por estagnação
+CONVERGENCE_PATIENCE_FACTOR = 1.0  # Paciência mínima, em múltiplos da geração da última melhoria relevante
+CONVERGENCE_GAP_FACTOR = 1.5  # Paciência mínima, em múltiplos do maior intervalo entre melhorias relevantes
+CONVERGENCE_MIN_GAIN = 0.001  # Ganho relativo de lucro a partir do qual uma melhoria é relevante
+CONVERGENCE_MIN_DIVERSITY = 0.25  # Fração de receitas distintas abaixo da qual a população convergiu
+CONVERGENCE_STAGNATION_DIVERSITY = 0.75  # Fração de receitas distintas abaixo da qual a população estagna, ao fim da paciência
+
+# Log das buscas. Progresso por geração e novos melhores vão em DEBUG, marcos em INFO;
+# as mensagens só são formatadas se o nível estiver habilitado (ver utils.configure_logging)
+logger = get_logger("optimizer")
 
 def apply_item_effects(selected_items: List[str], initial_effects: Dict[str, float] = None) -> Dict[str, float]:
     """
@@ -123,14 +165,16 @@ def evaluate_combination(combination: List[str], initial_effects: Dict[str, floa
     cost = calculate_total_cost(combination)
     return multiplier, effects, cost
 
-def generate_random_combination(available_items, combo_size):
+def generate_random_combination(available_items, combo_size, rng=random):
     """
     Gera uma combinação aleatória de itens com o tamanho especificado,
     considerando apenas os itens disponíveis e permitindo repetições.
+    O gerador aleatório (rng) é o módulo random por padrão, nesta e nas demais
+    funções do algoritmo genético; as buscas passam o random.Random da execução.
     """
-    return [random.choice(available_items) for _ in range(combo_size)]
+    return [rng.choice(available_items) for _ in range(combo_size)]
 
-def mutate_combination(combination, available_items, mutation_rate=0.3):
+def mutate_combination(combination, available_items, mutation_rate=0.3, rng=random):
     """
     Aplica mutação a uma combinação, alterando itens com base na taxa de mutação.
     Permite repetição de itens.
@@ -138,41 +182,45 @@ def mutate_combination(combination, available_items, mutation_rate=0.3):
     result = combination.copy()
     
     # Determina quantos itens serão mutados com base na taxa de mutação
-    num_mutations = max(1, int(len(combination) * mutation_rate * random.uniform(0.5, 1.5)))
+    num_mutations = max(1, int(len(combination) * mutation_rate * rng.uniform(0.5, 1.5)))
     
     # Índices dos itens a serem mutados
-    indices_to_mutate = random.sample(range(len(combination)), min(num_mutations, len(combination)))
+    indices_to_mutate = rng.sample(range(len(combination)), min(num_mutations, len(combination)))
     
     for idx in indices_to_mutate:
         # Seleciona um novo item aleatório da lista de disponíveis (permitindo repetições)
-        result[idx] = random.choice(available_items)
+        result[idx] = rng.choice(available_items)
     
     # 50% de chance de embaralhar a ordem após a mutação
-    if random.random() < 0.5:
-        random.shuffle(result)
+    if rng.random() < 0.5:
+        rng.shuffle(result)
     
     return result
 
-def crossover(parent1, parent2, available_items):
+def crossover(parent1, parent2, available_items, rng=random):
     """
     Realiza um crossover entre dois pais para criar um filho.
     Implementa diferentes estratégias de crossover aleatoriamente.
     Permite repetições de itens.
     """
+    # Com menos de dois itens não há ponto de corte: o filho é a cópia de um dos pais
+    if len(parent1) < 2:
+        return list(rng.choice([parent1, parent2]))
+    
     # Escolhe aleatoriamente uma estratégia de crossover
-    strategy = random.choice(["one_point", "two_point", "uniform"])
+    strategy = rng.choice(["one_point", "two_point", "uniform"])
     
     child = []
     
     if strategy == "one_point":
         # Crossover de um ponto
-        crossover_point = random.randint(1, len(parent1) - 1)
+        crossover_point = rng.randint(1, len(parent1) - 1)
         child = parent1[:crossover_point] + parent2[crossover_point:]
                 
     elif strategy == "two_point":
         # Crossover de dois pontos
         if len(parent1) >= 3:
-            point1, point2 = sorted(random.sample(range(1, len(parent1)), 2))
+            point1, point2 = sorted(rng.sample(range(1, len(parent1)), 2))
             child = parent1[:point1] + parent2[point1:point2] + parent1[point2:]
         else:
             # Fallback para crossover uniforme em caso de combinações muito pequenas
@@ -184,26 +232,26 @@ def crossover(parent1, parent2, available_items):
         
         for i in range(len(parent1)):
             # 50% de chance de pegar do parent1 ou parent2
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 child.append(parent1[i])
             else:
                 child.append(parent2[i])
     
     # Verifica se o filho tem o tamanho correto
     while len(child) < len(parent1):
-        child.append(random.choice(available_items))
+        child.append(rng.choice(available_items))
     
     # Trunca se por algum motivo o filho ficou maior
     if len(child) > len(parent1):
         child = child[:len(parent1)]
     
     # Embaralha a ordem com 50% de chance
-    if random.random() < 0.5:
-        random.shuffle(child)
+    if rng.random() < 0.5:
+        rng.shuffle(child)
     
     return child
 
-def tournament_selection(population, tournament_size=3, base_value=100):
+def tournament_selection(population, tournament_size=3, base_value=100, rng=random):
     """
     Seleciona um indivíduo da população usando seleção por torneio.
     Considera o lucro: (base_value * multiplicador) - custo
@@ -212,8 +260,9 @@ def tournament_selection(population, tournament_size=3, base_value=100):
         population: Lista de tuplas (combinação, multiplicador, efeitos, custo)
         tournament_size: Tamanho do torneio
         base_value: Valor base para cálculo do lucro
+        rng: Gerador aleatório (padrão: o módulo random)
     """
-    tournament = random.sample(population, min(tournament_size, len(population)))
+    tournament = rng.sample(population, min(tournament_size, len(population)))
     
     # Calcula o lucro para cada indivíduo
     fitness_scores = []
@@ -229,6 +278,530 @@ def tournament_selection(population, tournament_size=3, base_value=100):
     # Retorna o indivíduo com maior lucro
     return max(fitness_scores, key=lambda x: x[1])[0]
 
+def count_distinct_permutations(combination):
+    """
+    Conta as permutações distintas de uma combinação sem enumerá-las:
+    n! / (c1! * c2! * ...), onde ci é o número de repetições de cada item.
+    """
+    total = math.factorial(len(combination))
+    for count in Counter(combination).values():
+        total //= math.factorial(count)
+    return total
+
+def iter_distinct_permutations(combination):
+    """
+    Gera as permutações distintas de uma combinação em ordem lexicográfica,
+    uma de cada vez e sem repetir ordens iguais quando há itens repetidos.
+    Permutações consecutivas compartilham o maior prefixo possível.
+    """
+    perm = sorted(combination)
+    n = len(perm)
+    while True:
+        yield tuple(perm)
+        # Próxima permutação: maior i com perm[i] < perm[i + 1]
+        i = n - 2
+        while i >= 0 and perm[i] >= perm[i + 1]:
+            i -= 1
+        if i < 0:
+            return
+        j = n - 1
+        while perm[j] <= perm[i]:
+            j -= 1
+        perm[i], perm[j] = perm[j], perm[i]
+        perm[i + 1:] = reversed(perm[i + 1:])
+
+def unrank_distinct_permutation(combination, rank):
+    """
+    Retorna a permutação distinta de posição rank (ordem lexicográfica) de uma combinação.
+    
+    Args:
+        combination: Itens da combinação (com possíveis repetições)
+        rank: Posição entre 0 e count_distinct_permutations(combination) - 1
+    """
+    counts = Counter(combination)
+    values = sorted(counts)
+    remaining = len(combination)
+    total = count_distinct_permutations(combination)
+    perm = []
+    while remaining:
+        for value in values:
+            if not counts[value]:
+                continue
+            # Número de permutações que começam com este item
+            block = total * counts[value] // remaining
+            if rank < block:
+                perm.append(value)
+                counts[value] -= 1
+                remaining -= 1
+                total = block
+                break
+            rank -= block
+    return tuple(perm)
+
+def sample_distinct_permutations(combination, sample_size, rng=random):
+    """
+    Sorteia permutações distintas de uma combinação sem construir a lista completa.
+    As posições sorteadas são ordenadas, então as permutações saem em ordem
+    lexicográfica; a memória usada depende apenas de sample_size.
+    """
+    total = count_distinct_permutations(combination)
+    if total < sys.maxsize:
+        ranks = rng.sample(range(total), sample_size)
+    else:
+        # random.sample não aceita intervalos maiores que sys.maxsize; com tantas
+        # permutações, sorteios repetidos são raros
+        chosen = set()
+        while len(chosen) < sample_size:
+            chosen.add(rng.randrange(total))
+        ranks = list(chosen)
+    ranks.sort()
+    for rank in ranks:
+        yield unrank_distinct_permutation(combination, rank)
+
+def format_search_progress(gen, evaluations, elapsed, best_profit, time_limit_seconds):
+    """
+    Monta a mensagem de progresso do algoritmo genético a partir do estado real da busca.
+    
+    Args:
+        gen: Gerações concluídas
+        evaluations: Avaliações feitas até agora
+        elapsed: Tempo decorrido em segundos
+        best_profit: Melhor lucro encontrado até agora
+        time_limit_seconds: Limite de tempo em segundos para a busca
+    
+    Returns:
+        Mensagem com gerações, avaliações por segundo, melhor lucro e tempo restante
+    """
+    rate = evaluations / elapsed if elapsed > 0 else 0.0
+    remaining = max(0.0, time_limit_seconds - elapsed)
+    return (f"Generation {gen} | {rate:,.0f} evaluations/s | "
+            f"Best profit ${best_profit:.2f} | {remaining:.0f}s remaining")
+
+def _evaluate_population(combinations, engine, initial_state, base_value, batch_evaluator=None,
+                         fitness_cache=None):
+    """
+    Avalia uma lista de combinações (por índice) e monta as tuplas da população.
+    
+    Args:
+        combinations: Lista de combinações de índices de itens
+        engine: Motor de efeitos usado na avaliação escalar
+        initial_state: Máscara de bits dos efeitos iniciais
+        base_value: Valor base usado no cálculo do lucro
+        batch_evaluator: BatchEvaluator para avaliar todas as combinações em uma
+            única chamada vetorizada (opcional; sem ele a avaliação é escalar)
+        fitness_cache: FitnessCache da execução; receitas já avaliadas (ou repetidas
+            na mesma lista) não são avaliadas de novo (opcional)
+    
+    Returns:
+        Lista de tuplas (combinação, multiplicador, estado, custo, lucro), na mesma ordem
+    """
+    if fitness_cache is not None:
+        # Separa as receitas inéditas; as repetidas reaproveitam a avaliação guardada
+        entries = [None] * len(combinations)
+        pending = {}
+        for i, combo in enumerate(combinations):
+            key = tuple(combo)
+            if key in pending:
+                # Repetida na mesma lista: também conta como avaliação evitada
+                pending[key].append(i)
+                fitness_cache.hits += 1
+                continue
+            entry = fitness_cache.get(key)
+            if entry is not None:
+                entries[i] = entry
+            else:
+                pending[key] = [i]
+        
+        new_combos = [combinations[positions[0]] for positions in pending.values()]
+        for positions, (combo, mult, state, cost, _) in zip(
+                pending.values(), _evaluate_population(new_combos, engine, initial_state, base_value, batch_evaluator)):
+            entry = (state, mult, cost)
+            fitness_cache.put(tuple(combo), entry)
+            for i in positions:
+                entries[i] = entry
+        return [(combo, mult, state, cost, (base_value * mult) - cost)
+                for combo, (state, mult, cost) in zip(combinations, entries)]
+    
+    if batch_evaluator is not None:
+        states, multipliers, costs = batch_evaluator.evaluate(combinations, initial_state)
+        return [(combo, mult, state, cost, (base_value * mult) - cost)
+                for combo, state, mult, cost in zip(combinations, states, multipliers, costs)]
+    
+    evaluated = []
+    for combo in combinations:
+        state, mult, cost = engine.evaluate_indices(combo, initial_state)
+        profit = (base_value * mult) - cost  # Cálculo do lucro
+        evaluated.append((combo, mult, state, cost, profit))
+    return evaluated
+
+def _evolve_generation(population, gen, num_generations, engine, available_items, initial_state,
+                       combo_size, base_value, base_mutation_rate, tournament_size, batch_evaluator=None,
+                       fitness_cache=None, rng=random, phase_seconds=None):
+    """
+    Produz a próxima geração do algoritmo genético.
+    
+    Args:
+        population: População atual ordenada pelo lucro, com tuplas
+            (combinação, multiplicador, estado, custo, lucro)
+        gen: Número da geração atual
+        num_generations: Número máximo de gerações
+        engine: Motor de efeitos usado na avaliação
+        available_items: Índices dos itens disponíveis
+        initial_state: Máscara de bits dos efeitos iniciais
+        combo_size: Número de itens de cada combinação
+        base_value: Valor base usado no cálculo do lucro
+        base_mutation_rate: Taxa base de mutação
+        tournament_size: Tamanho do torneio na seleção
+        batch_evaluator: BatchEvaluator para avaliar a geração em lote (opcional)
+        fitness_cache: FitnessCache para não reavaliar receitas repetidas (opcional)
+        rng: Gerador aleatório da execução
+        phase_seconds: Dicionário de fase -> segundos onde somar o tempo de seleção, crossover,
+            mutação, avaliação e injeção de diversidade (None não mede nada)
+    
+    Returns:
+        Tupla contendo: (nova população ordenada pelo lucro, número de avaliações feitas)
+    """
+    # As fases são executadas uma de cada vez sobre a geração inteira, então medir o
+    # tempo custa apenas algumas chamadas de perf_counter por geração
+    timed = phase_seconds is not None
+    if timed:
+        mark = time.perf_counter()
+    
+    population_size = len(population)
+    evaluations = 0
+    
+    # Cria nova população
+    new_population = []
+    
+    # Elitismo: mantém os melhores indivíduos da população (percentual variável)
+    elite_size = max(1, int(population_size * rng.uniform(0.05, 0.15)))
+    new_population.extend(population[:elite_size])
+    
+    # Adiciona variação na taxa de mutação ao longo do tempo
+    current_mutation_rate = base_mutation_rate * (1 - gen / (2 * num_generations))
+    
+    # Crossover e mutação para o resto da população
+    num_children = population_size - len(new_population)
+    
+    # Seleção de pais pelo método de torneio
+    parents = [(tournament_selection(population, tournament_size, base_value, rng),
+                tournament_selection(population, tournament_size, base_value, rng))
+               for _ in range(num_children)]
+    if timed:
+        mark = _add_phase_time(phase_seconds, "selection", mark)
+    
+    # Crossover
+    children = [crossover(parent1[0], parent2[0], available_items, rng) for parent1, parent2 in parents]
+    if timed:
+        mark = _add_phase_time(phase_seconds, "crossover", mark)
+    
+    # Mutação com taxa variável
+    children = [mutate_combination(child_combo, available_items, current_mutation_rate, rng)
+                if rng.random() < current_mutation_rate else child_combo
+                for child_combo in children]
+    if timed:
+        mark = _add_phase_time(phase_seconds, "mutation", mark)
+    
+    # Avalia todos os filhos da geração de uma vez
+    new_population.extend(_evaluate_population(children, engine, initial_state, base_value,
+                                               batch_evaluator, fitness_cache))
+    evaluations += len(children)
+    
+    # Substitui a população antiga pela nova
+    population = sorted(new_population, key=lambda x: x[4], reverse=True)
+    if timed:
+        mark = _add_phase_time(phase_seconds, "evaluation", mark)
+    
+    # Introduz diversidade aleatória a cada N gerações
+    if gen % 20 == 0 and gen > 0:
+        diversity_count = max(1, int(population_size * 0.1))
+        random_combos = [generate_random_combination(available_items, combo_size, rng) for _ in range(diversity_count)]
+        for individual in _evaluate_population(random_combos, engine, initial_state, base_value,
+                                               batch_evaluator, fitness_cache):
+            evaluations += 1
+            # Substitui um dos piores
+            if len(population) > 0:
+                population[-1] = individual
+        
+        # Reordena após adicionar diversidade
+        population.sort(key=lambda x: x[4], reverse=True)
+        if timed:
+            _add_phase_time(phase_seconds, "diversity", mark)
+    
+    return population, evaluations
+
+def _add_phase_time(phase_seconds, phase, mark):
+    """Soma a phase_seconds o tempo desde mark e retorna o instante atual."""
+    now = time.perf_counter()
+    phase_seconds[phase] = phase_seconds.get(phase, 0.0) + now - mark
+    return now
+
+def _run_island(population, first_gen, num_generations, available_items, initial_state, combo_size,
+                base_value, base_mutation_rate, tournament_size, epoch_seconds, seed,
+                transition_cache_size=None, batch_evaluation=False, fitness_cache_size=0,
+                epoch_generations=None, timings=False):
+    """
+    Evolui uma ilha durante uma época; executado em um processo do pool.
+    
+    Args:
+        population: População da ilha ordenada pelo lucro
+        first_gen: Número da primeira geração desta época
+        num_generations: Número máximo de gerações
+        available_items: Índices dos itens disponíveis
+        initial_state: Máscara de bits dos efeitos iniciais
+        combo_size: Número de itens de cada combinação
+        base_value: Valor base usado no cálculo do lucro
+        base_mutation_rate: Taxa base de mutação da ilha
+        tournament_size: Tamanho do torneio da ilha
+        epoch_seconds: Duração da época em segundos
+        seed: Semente do gerador aleatório desta época
+        transition_cache_size: Limite de estados do cache de transições (opcional)
+        batch_evaluation: Se True, avalia cada geração em lote com o NumPy
+        fitness_cache_size: Limite de receitas na memória de avaliações da época (0 desativa)
+        epoch_generations: Número máximo de gerações da época (None = apenas o tempo)
+        timings: Se True, mede o tempo de cada fase das gerações
+    
+    Returns:
+        Tupla contendo: (população final, próxima geração, número de avaliações,
+        número de avaliações repetidas evitadas, segundos por fase ou None)
+    """
+    # Cada ilha tem seu próprio gerador, com a semente derivada pelo processo principal;
+    # sem ela as ilhas criadas por fork repetiriam a mesma sequência
+    rng = random.Random(seed)
+    engine = get_engine()
+    if transition_cache_size is not None and engine.transitions.max_states != transition_cache_size:
+        engine.transitions.resize(transition_cache_size)
+    batch_evaluator = get_batch_evaluator() if batch_evaluation else None
+    fitness_cache = FitnessCache(initial_state, fitness_cache_size) if fitness_cache_size else None
+    
+    deadline = time.time() + epoch_seconds
+    last_gen = num_generations if epoch_generations is None else min(num_generations, first_gen + epoch_generations)
+    gen = first_gen
+    evaluations = 0
+    phase_seconds = {} if timings else None
+    while gen < last_gen and time.time() < deadline:
+        population, generation_evaluations = _evolve_generation(
+            population, gen, num_generations, engine, available_items, initial_state, combo_size,
+            base_value, base_mutation_rate, tournament_size, batch_evaluator, fitness_cache, rng, phase_seconds)
+        evaluations += generation_evaluations
+        gen += 1
+    return population, gen, evaluations, fitness_cache.hits if fitness_cache else 0, phase_seconds
+
+def _evolve_islands(population, num_islands, num_generations, available_items, initial_state, combo_size,
+                    base_value, base_mutation_rate, tournament_size, start_time, time_limit_seconds,
+                    transition_cache_size=None, progress_callback=None, batch_evaluation=False,
+                    fitness_cache_size=0, rng=random, fixed_epochs=False, phase_seconds=None,
+                    early_stopping=False):
+    """
+    Executa o algoritmo genético no modelo de ilhas em um ProcessPoolExecutor.
+    
+    Cada ilha evolui uma população independente por épocas de ISLAND_EPOCH_SECONDS;
+    ao fim de cada época os ISLAND_MIGRATION_SIZE melhores indivíduos de cada ilha
+    substituem os piores da ilha seguinte (topologia em anel).
+    
+    Args:
+        population: População inicial; cada ilha recebe uma cópia com novos indivíduos aleatórios
+        num_islands: Número de ilhas (processos)
+        num_generations: Número máximo de gerações por ilha
+        available_items: Índices dos itens disponíveis
+        initial_state: Máscara de bits dos efeitos iniciais
+        combo_size: Número de itens de cada combinação
+        base_value: Valor base usado no cálculo do lucro
+        base_mutation_rate: Taxa base de mutação
+        tournament_size: Tamanho do torneio na seleção
+        start_time: Instante de início da otimização
+        time_limit_seconds: Limite de tempo em segundos para a busca
+        transition_cache_size: Limite de estados do cache de transições (opcional)
+        progress_callback: Função de callback para reportar progresso (opcional)
+        batch_evaluation: Se True, as ilhas avaliam cada geração em lote com o NumPy
+        fitness_cache_size: Limite de receitas na memória de avaliações de cada ilha (0 desativa)
+        rng: Gerador aleatório da execução; dele saem as populações das ilhas e a semente
+            de cada ilha em cada época
+        fixed_epochs: Se True, cada época dura ISLAND_EPOCH_GENERATIONS gerações em vez de
+            ISLAND_EPOCH_SECONDS, para que as migrações (e o resultado) não dependam da
+            velocidade dos processos
+        phase_seconds: Dicionário onde somar o tempo de cada fase medido nas ilhas (opcional)
+        early_stopping: Se True, aplica o ConvergenceMonitor ao fim de cada época, sobre as
+            gerações da ilha mais adiantada e a população de todas as ilhas
+    
+    Returns:
+        Tupla contendo: (população de todas as ilhas ordenada pelo lucro, gerações da
+        ilha mais adiantada, número de avaliações feitas, número de avaliações repetidas
+        evitadas, motivo da parada), ou None se cancelado
+    """
+    engine = get_engine()
+    population_size = len(population)
+    
+    # A primeira ilha usa a população inicial; as demais recebem populações aleatórias próprias
+    islands = [population]
+    batch_evaluator = get_batch_evaluator() if batch_evaluation else None
+    for _ in range(num_islands - 1):
+        combos = [generate_random_combination(available_items, combo_size, rng) for _ in range(population_size)]
+        island = _evaluate_population(combos, engine, initial_state, base_value, batch_evaluator)
+        island.sort(key=lambda x: x[4], reverse=True)
+        islands.append(island)
+    generations = [0] * num_islands
+    evaluations = population_size * (num_islands - 1)
+    avoided = 0
+    migration_size = min(ISLAND_MIGRATION_SIZE, population_size // 2)
+    best_profit = max(island[0][4] for island in islands)
+    monitor = ConvergenceMonitor(best_profit) if early_stopping else None
+    stop_reason = "max_generations"
+    
+    epoch_length = f"{ISLAND_EPOCH_GENERATIONS} gerações" if fixed_epochs else f"{ISLAND_EPOCH_SECONDS}s"
+    logger.info("Modelo de ilhas: %s ilhas, migração de %s indivíduos a cada %s",
+                num_islands, migration_size, epoch_length)
+    
+    with ProcessPoolExecutor(max_workers=num_islands) as executor:
+        epoch = 0
+        while min(generations) < num_generations:
+            remaining = time_limit_seconds - (time.time() - start_time)
+            if remaining <= 0:
+                logger.info("Limite de tempo (%ss) atingido após %s gerações.", time_limit_seconds, max(generations),
+                            extra={"event": "time_limit", "generation": max(generations)})
+                stop_reason = "time_limit"
+                break
+            
+            # Semente de cada ilha nesta época, derivada do gerador da execução
+            island_seeds = [rng.getrandbits(64) for _ in range(num_islands)]
+            epoch_seconds = remaining if fixed_epochs else min(ISLAND_EPOCH_SECONDS, remaining)
+            futures = [
+                executor.submit(_run_island, islands[i], generations[i], num_generations, available_items,
+                                initial_state, combo_size, base_value, base_mutation_rate, tournament_size,
+                                epoch_seconds, island_seeds[i], transition_cache_size,
+                                batch_evaluation, fitness_cache_size,
+                                ISLAND_EPOCH_GENERATIONS if fixed_epochs else None, phase_seconds is not None)
+                for i in range(num_islands)
+            ]
+            for i, future in enumerate(futures):
+                islands[i], generations[i], island_evaluations, island_avoided, island_phases = future.result()
+                evaluations += island_evaluations
+                avoided += island_avoided
+                if island_phases:
+                    # Tempo somado das ilhas (de processador, não de relógio)
+                    for phase, seconds in island_phases.items():
+                        phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+            epoch += 1
+            
+            # Migração em anel: os melhores de cada ilha substituem os piores da próxima
+            if num_islands > 1 and migration_size > 0:
+                emigrants = [island[:migration_size] for island in islands]
+                for i in range(num_islands):
+                    target = islands[(i + 1) % num_islands]
+                    target[-migration_size:] = emigrants[i]
+                    target.sort(key=lambda x: x[4], reverse=True)
+            
+            epoch_best = max(island[0][4] for island in islands)
+            if epoch_best > best_profit:
+                best_profit = epoch_best
+                logger.debug("Novo melhor: Lucro = $%.2f", best_profit,
+                             extra={"event": "new_best", "epoch": epoch, "profit": best_profit})
+                if monitor is not None:
+                    monitor.update(max(generations), best_profit)
+            
+            elapsed = time.time() - start_time
+            logger.debug("Época %s: gerações = %s, Profit = $%.2f, %.0f avaliações por segundo",
+                         epoch, max(generations), best_profit, evaluations / max(elapsed, 1e-9))
+            
+            if progress_callback:
+                fraction = elapsed / time_limit_seconds
+                if monitor is not None:
+                    fraction = max(fraction, monitor.progress(max(generations)))
+                progress = 20 + min(50, int(50 * fraction))
+                message = format_search_progress(max(generations), evaluations, elapsed, best_profit, time_limit_seconds)
+                if not progress_callback(progress, f"{message} | {num_islands} islands"):
+                    return None
+            
+            if monitor is not None:
+                reason = monitor.check(max(generations), [individual for island in islands for individual in island])
+                if reason:
+                    stop_reason = reason
+                    break
+    
+    population = sorted((individual for island in islands for individual in island),
+                        key=lambda x: x[4], reverse=True)
+    return population, max(generations), evaluations, avoided, stop_reason
+
+def population_diversity(population):
+    """Fração de receitas distintas (na mesma ordem de itens) em uma população."""
+    if not population:
+        return 0.0
+    return len({tuple(individual[0]) for individual in population}) / len(population)
+
+class ConvergenceMonitor:
+    """
+    Critério de parada antecipada do algoritmo genético.
+    
+    Uma melhoria só é relevante se aumentar o lucro em pelo menos CONVERGENCE_MIN_GAIN
+    (relativo) sobre a última melhoria relevante; melhorias menores não adiam a parada.
+    A "paciência" é contada em gerações sem melhoria relevante e cresce com o histórico da
+    busca: é o maior entre CONVERGENCE_MIN_GENERATIONS, CONVERGENCE_PATIENCE_FACTOR vezes a
+    geração da última melhoria relevante e CONVERGENCE_GAP_FACTOR vezes o maior intervalo
+    já visto entre duas melhorias relevantes (o ritmo de melhoria medido). Intervalos longos
+    entre melhorias são normais no algoritmo genético, então a espera acompanha os que a
+    própria busca já precisou.
+    
+    A busca para depois de metade da paciência se a diversidade da população estiver abaixo
+    de CONVERGENCE_MIN_DIVERSITY ("converged"), e depois da paciência inteira se estiver
+    abaixo de CONVERGENCE_STAGNATION_DIVERSITY ("stagnated"). Esse limite cresce na mesma
+    proporção que a espera, então uma população ainda diversa ganha mais tempo para
+    explorar: com todas as receitas distintas, a busca só para depois de um terço a mais
+    de paciência.
+    
+    O critério só depende do número de gerações, nunca do relógio, então uma execução com
+    semente que para antes do limite de tempo é reprodutível.
+    """
+    
+    def __init__(self, best_profit: float):
+        self.reference_profit = best_profit
+        self.last_gain_generation = 0
+        self.longest_gap = 0
+        self.diversity = 1.0
+    
+    def update(self, gen: int, best_profit: float):
+        """Registra o melhor lucro após a geração gen."""
+        if best_profit - self.reference_profit >= max(abs(self.reference_profit), 1.0) * CONVERGENCE_MIN_GAIN:
+            self.reference_profit = best_profit
+            self.longest_gap = max(self.longest_gap, gen - self.last_gain_generation)
+            self.last_gain_generation = gen
+    
+    @property
+    def patience(self) -> float:
+        """Gerações sem melhoria relevante até a parada por estagnação."""
+        return max(CONVERGENCE_MIN_GENERATIONS, CONVERGENCE_PATIENCE_FACTOR * self.last_gain_generation,
+                   CONVERGENCE_GAP_FACTOR * self.longest_gap)
+    
+    def progress(self, gen: int) -> float:
+        """Fração (0 a 1) do caminho até a parada por estagnação."""
+        return min(1.0, (gen - self.last_gain_generation) / self.patience)
+    
+    def check(self, gen: int, population) -> Optional[str]:
+        """Retorna o motivo da parada ("converged" ou "stagnated") ou None para continuar."""
+        stalled = (gen - self.last_gain_generation) / self.patience
+        if stalled < 0.5:
+            return None
+        self.diversity = population_diversity(population)
+        if self.diversity < CONVERGENCE_MIN_DIVERSITY:
+            reason = "converged"
+        elif stalled >= 1.0 and self.diversity < CONVERGENCE_STAGNATION_DIVERSITY * stalled:
+            reason = "stagnated"
+        else:
+            return None
+        logger.info("Parada antecipada (%s) após %s gerações: %s sem melhoria relevante (paciência %.0f), "
+                    "diversidade %.0f%%", reason, gen, gen - self.last_gain_generation, self.patience,
+                    self.diversity * 100, extra={"event": "stop", "reason": reason, "generation": gen})
+        return reason
+
+def _offer_population(top, population):
+    """Oferece a um TopRecipes as receitas de uma população ordenada pelo lucro."""
+    if top is None:
+        return
+    for combo, _, state, _, profit in population:
+        # A população está ordenada: as próximas receitas também não entrariam
+        if profit <= top.threshold:
+            break
+        top.offer(profit, state, tuple(combo))
+
 def find_best_combination(
     initial_effects: Dict[str, float] = None, 
     time_limit_seconds: int = 30, 
@@ -236,8 +809,18 @@ def find_best_combination(
     max_perms_to_test: int = 5000,
     banned_items: List[str] = None,
     base_value: float = 100,
-    progress_callback: Callable[[int, str], bool] = None
-) -> Tuple[List[str], float, Dict[str, float], float, float]:
+    progress_callback: Callable[[int, str], bool] = None,
+    transition_cache_size: Optional[int] = None,
+    num_islands: int = 1,
+    batch_evaluation: Optional[bool] = None,
+    fitness_cache_size: Optional[int] = None,
+    reuse_search_state: bool = True,
+    top_k: int = 0,
+    search_stats: Optional[SearchStats] = None,
+    seed: Optional[int] = None,
+    max_generations: int = MAX_GENERATIONS,
+    early_stopping: bool = True
+) -> Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]:
     """
     Encontra a melhor combinação de itens que maximize o lucro,
     calculado como (base_value * multiplicador) - custo.
@@ -250,200 +833,1680 @@ def find_best_combination(
         banned_items: Lista de itens que não podem ser usados
         base_value: Valor base usado no cálculo do lucro
         progress_callback: Função de callback para reportar progresso (opcional)
+        transition_cache_size: Limite de estados do cache de transições (opcional)
+        num_islands: Número de populações independentes; acima de 1 usa o modelo de
+            ilhas, com uma população por processo e migração periódica dos melhores
+        batch_evaluation: Se True, avalia cada geração em uma única chamada vetorizada
+            com o NumPy; None usa o NumPy se estiver instalado
+        fitness_cache_size: Limite de receitas na memória de avaliações da execução,
+            que evita reavaliar receitas repetidas (0 desativa); None usa
+            DEFAULT_FITNESS_CACHE_SIZE na avaliação escalar e desativa a memória na avaliação em lote
+        reuse_search_state: Se True, semeia a população com as receitas da busca anterior
+            que não usam itens banidos e reaproveita a memória de avaliações (search_memory)
+        top_k: Se maior que zero, também retorna as top_k melhores receitas com conjuntos
+            finais de efeitos distintos vistas nas populações e no refinamento
+        search_stats: SearchStats (opcional) preenchido com os contadores da execução, as
+            melhorias, os parâmetros efetivos (semente, população, mutação, torneio...) e,
+            se search_stats.timings for True, o tempo de cada fase (inicialização, seleção,
+            crossover, mutação, avaliação, diversidade e refinamento)
+        seed: Semente do gerador aleatório da execução. Com semente, a população não é
+            semeada pela busca anterior e as épocas das ilhas são medidas em gerações, então
+            duas execuções com os mesmos argumentos que terminem antes do limite de tempo
+            (por max_generations ou pela parada antecipada, que só conta gerações) dão o
+            mesmo resultado. Sem semente, uma é sorteada e registrada em hyperparameters
+        max_generations: Número máximo de gerações
+        early_stopping: Se True, a evolução para antes do limite de tempo quando o melhor
+            lucro deixa de melhorar e a população perde diversidade (ver ConvergenceMonitor);
+            o motivo da parada ("converged", "stagnated", "time_limit" ou "max_generations")
+            vai para search_stats.stop_reason
     
     Returns:
-        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro)
+        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas);
+        alternativas lista, com top_k, receitas no mesmo formato, da melhor para a pior, e
+        fica vazia sem top_k
     """
+    # Tempo por fase, somado em search_stats.phase_seconds (None não mede nada)
+    phase_seconds = search_stats.phase_seconds if search_stats is not None and search_stats.timings else None
+    if phase_seconds is not None:
+        phase_mark = time.perf_counter()
+    
     # Remove os itens banidos da lista de itens disponíveis
     all_items = list(items.keys())
     banned_items = banned_items or []
-    available_items = [item for item in all_items if item not in banned_items]
+    available_names = [item for item in all_items if item not in banned_items]
+    
+    # A busca trabalha com índices de itens e máscaras de bits de efeitos;
+    # a conversão para nomes e dicionários só acontece na resposta final
+    engine = get_engine()
+    available_items = engine.encode_items(available_names)
+    initial_state = engine.encode_effects(initial_effects)
+    
+    # Cache de transições (estado, item) compartilhado pelo GA e pelo refinamento
+    transitions = engine.transitions
+    if transition_cache_size is not None:
+        transitions.resize(transition_cache_size)
+    transitions.reset_stats()
+    
+    # Avaliação em lote das gerações (NumPy é opcional)
+    if batch_evaluation and not HAS_NUMPY:
+        logger.warning("Aviso: NumPy não está instalado; usando a avaliação escalar.")
+    batch_evaluation = HAS_NUMPY if batch_evaluation is None else (batch_evaluation and HAS_NUMPY)
+    batch_evaluator = get_batch_evaluator() if batch_evaluation else None
+    
+    # Em lote, avaliar a geração inteira custa menos que separar as receitas já avaliadas
+    if fitness_cache_size is None:
+        fitness_cache_size = 0 if batch_evaluation else DEFAULT_FITNESS_CACHE_SIZE
+    
+    # Memória de avaliações (chave: receita; os efeitos iniciais são fixos). Os valores não
+    # dependem dos itens banidos nem do tamanho, então ela continua válida na próxima busca
+    memory = search_memory if reuse_search_state else None
+    fitness_cache = None
+    if fitness_cache_size:
+        if memory and memory.fitness_cache and memory.fitness_cache.initial_state == initial_state:
+            fitness_cache = memory.fitness_cache
+            fitness_cache.max_entries = fitness_cache_size
+        else:
+            fitness_cache = FitnessCache(initial_state, fitness_cache_size)
+        if memory:
+            memory.fitness_cache = fitness_cache
+        fitness_cache.hits = fitness_cache.misses = fitness_cache.evictions = 0
     
     if len(available_items) < combo_size:
-        print(f"Aviso: O tamanho da combinação ({combo_size}) é maior que o número de itens disponíveis ({len(available_items)}).")
-        print(f"Ajustando o tamanho da combinação para {len(available_items)}.")
+        logger.warning("Aviso: O tamanho da combinação (%s) é maior que o número de itens disponíveis (%s).",
+                       combo_size, len(available_items))
+        logger.info("Ajustando o tamanho da combinação para %s.", len(available_items))
         combo_size = len(available_items)
     
     best_multiplier = 0.0
     best_combination = []
-    best_effects = {}
+    best_state = initial_state
     best_cost = float('inf')
     best_profit = float('-inf')  # Rastrear o melhor lucro
     
     start_time = time.time()
     
+    # Gerador aleatório próprio da execução (o módulo random global não é usado)
+    reproducible = seed is not None
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rng = random.Random(seed)
+    
     # Parâmetros do algoritmo genético mais aleatórios
-    population_size = random.randint(200, 800)
-    num_generations = 10000  # Limite máximo, será limitado pelo tempo
-    base_mutation_rate = random.uniform(0.1, 0.8)
-    tournament_size = random.randint(2, 8)
+    population_size = rng.randint(200, 800)
+    num_generations = max_generations  # Limite máximo, normalmente limitado pelo tempo
+    base_mutation_rate = rng.uniform(0.1, 0.8)
+    tournament_size = rng.randint(2, 8)
+    hyperparameters = {
+        "seed": seed,
+        "population_size": population_size,
+        "base_mutation_rate": base_mutation_rate,
+        "tournament_size": tournament_size,
+        "max_generations": num_generations,
+        "num_islands": num_islands,
+        "early_stopping": early_stopping,
+    }
+    if search_stats is not None:
+        search_stats.hyperparameters.update(hyperparameters)
     
-    print(f"Tamanho da população: {population_size}")
-    print(f"Taxa base de mutação: {base_mutation_rate:.2f}")
-    print(f"Tamanho do torneio: {tournament_size}")
-    print(f"Valor base para cálculo do lucro: ${base_value:.2f}")
+    logger.info("Semente: %s", seed)
+    logger.info("Tamanho da população: %s", population_size)
+    logger.info("Taxa base de mutação: %.2f", base_mutation_rate)
+    logger.info("Tamanho do torneio: %s", tournament_size)
+    logger.info("Valor base para cálculo do lucro: $%.2f", base_value)
+    logger.info("Avaliação: %s", "em lote (NumPy)" if batch_evaluator else "escalar")
     
     # Reportar progresso (10%)
     if progress_callback:
         if not progress_callback(10, f"Inicializando população com {population_size} indivíduos"):
-            return [], 0.0, {}, 0.0, 0.0
+            return [], 0.0, {}, 0.0, 0.0, []
     
-    # Inicializa a população com combinações aleatórias
-    population = []
-    for _ in range(population_size):
-        combo = generate_random_combination(available_items, combo_size)
-        mult, effects, cost = evaluate_combination(combo, initial_effects)
-        profit = (base_value * mult) - cost  # Cálculo do lucro
-        population.append((combo, mult, effects, cost, profit))
+    # Inicializa a população com as receitas da busca anterior que continuam permitidas
+    # (ajustadas ao tamanho atual) e completa com combinações aleatórias; com semente,
+    # a população depende só dos argumentos
+    survivors = memory.survivors(initial_state, available_items) if memory and not reproducible else []
+    combos = [list(_resize_recipe(engine, recipe, combo_size, available_items, initial_state, base_value))
+              for recipe in survivors[:population_size]]
+    if survivors:
+        logger.info("População semeada com %s receitas da busca anterior", len(combos))
+    combos += [generate_random_combination(available_items, combo_size, rng) for _ in range(population_size - len(combos))]
+    population = _evaluate_population(combos, engine, initial_state, base_value, batch_evaluator, fitness_cache)
     
     # Ordena a população pelo lucro
     population.sort(key=lambda x: x[4], reverse=True)
+    if phase_seconds is not None:
+        _add_phase_time(phase_seconds, "initialization", phase_mark)
+    
+    # Melhores receitas distintas vistas durante a busca (pontuação = lucro)
+    top = TopRecipes(top_k) if top_k > 0 else None
+    _offer_population(top, population)
     
     # Acompanha o melhor resultado
-    best_combination, best_multiplier, best_effects, best_cost, best_profit = population[0]
-    print(f"Inicial: Multiplicador = {best_multiplier:.2f}, Cost = ${best_cost:.2f}, Profit = ${best_profit:.2f}")
+    best_combination, best_multiplier, best_state, best_cost, best_profit = population[0]
+    logger.info("Inicial: Multiplicador = %.2f, Cost = $%.2f, Profit = $%.2f", best_multiplier, best_cost, best_profit)
+    improvements = search_stats.improvements if search_stats is not None else None
+    if improvements is not None:
+        improvements.append((time.time() - start_time, best_profit))
     
     # Reportar progresso (20%)
     if progress_callback:
         if not progress_callback(20, f"População inicial criada. Melhor: M={best_multiplier:.2f}, $={best_cost:.2f}"):
-            return [], 0.0, {}, 0.0, 0.0
+            return [], 0.0, {}, 0.0, 0.0, []
+    
+    evaluations = population_size
+    avoided = fitness_cache.hits if fitness_cache else 0  # Avaliações repetidas evitadas
+    generation_avoided = 0
+    gen = 0
+    last_progress = 0.0
+    monitor = ConvergenceMonitor(best_profit) if early_stopping else None
+    stop_reason = "max_generations"
+    
+    if num_islands > 1:
+        # Modelo de ilhas: populações independentes em processos separados
+        result = _evolve_islands(
+            population, num_islands, num_generations, available_items, initial_state, combo_size,
+            base_value, base_mutation_rate, tournament_size, start_time, time_limit_seconds,
+            transition_cache_size, progress_callback, batch_evaluator is not None, fitness_cache_size,
+            rng, reproducible, phase_seconds, early_stopping)
+        if result is None:
+            return [], 0.0, {}, 0.0, 0.0, []
+        population, gen, island_evaluations, island_avoided, stop_reason = result
+        evaluations += island_evaluations
+        avoided += island_avoided
+        _offer_population(top, population)
+        if population[0][4] > best_profit:
+            best_combination, best_multiplier, best_state, best_cost, best_profit = population[0]
+            best_combination = list(best_combination)
+            if improvements is not None:
+                improvements.append((time.time() - start_time, best_profit))
     
     # Evolução da população
-    for gen in range(num_generations):
+    while num_islands <= 1 and gen < num_generations:
         # Verifica se o tempo limite foi atingido
-        if time.time() - start_time > time_limit_seconds:
-            print(f"Limite de tempo ({time_limit_seconds}s) atingido após {gen} gerações.")
+        now = time.time()
+        elapsed = now - start_time
+        if elapsed > time_limit_seconds:
+            logger.info("Limite de tempo (%ss) atingido após %s gerações.", time_limit_seconds, gen,
+                        extra={"event": "time_limit", "generation": gen})
+            stop_reason = "time_limit"
             break
         
-        # Reportar progresso a cada 100 gerações (20% a 70%)
-        if progress_callback and gen % 100 == 0:
-            progress = 20 + min(50, int(50 * gen / num_generations))
-            if not progress_callback(progress, f"Generation {gen}: Best Mutiplier = {best_multiplier:.2f}"):
-                return [], 0.0, {}, 0.0, 0.0
+        # Reportar progresso no máximo a cada PROGRESS_INTERVAL_SECONDS (20% a 70%, pelo tempo
+        # decorrido ou, se estiver mais adiantado, pelo caminho até a parada antecipada)
+        if progress_callback and now - last_progress >= PROGRESS_INTERVAL_SECONDS:
+            last_progress = now
+            fraction = elapsed / time_limit_seconds
+            if monitor is not None:
+                fraction = max(fraction, monitor.progress(gen))
+            progress = 20 + min(50, int(50 * fraction))
+            if not progress_callback(progress, format_search_progress(gen, evaluations, elapsed, best_profit, time_limit_seconds)):
+                return [], 0.0, {}, 0.0, 0.0, []
         
         # Exibe progresso a cada 10 gerações
         if gen % 10 == 0:
-            print(f"Generation {gen}/{num_generations}: Best = {best_multiplier:.2f}, Cost = ${best_cost:.2f}, Profit = ${best_profit:.2f}")
-        
-        # Cria nova população
-        new_population = []
-        
-        # Elitismo: mantém os melhores indivíduos da população (percentual variável)
-        elite_size = max(1, int(population_size * random.uniform(0.05, 0.15)))
-        new_population.extend(population[:elite_size])
-        
-        # Adiciona variação na taxa de mutação ao longo do tempo
-        current_mutation_rate = base_mutation_rate * (1 - gen / (2 * num_generations))
+            logger.debug("Generation %s/%s: Best = %.2f, Cost = $%.2f, Profit = $%.2f, Repetidas evitadas = %s",
+                         gen, num_generations, best_multiplier, best_cost, best_profit, generation_avoided,
+                         extra={"event": "generation", "generation": gen, "profit": best_profit})
         
-        # Crossover e mutação para o resto da população
-        while len(new_population) < population_size:
-            # Seleção de pais pelo método de torneio
-            parent1 = tournament_selection(population, tournament_size, base_value)
-            parent2 = tournament_selection(population, tournament_size, base_value)
-            
-            # Crossover
-            child_combo = crossover(parent1[0], parent2[0], available_items)
-            
-            # Mutação com taxa variável
-            if random.random() < current_mutation_rate:
-                child_combo = mutate_combination(child_combo, available_items, current_mutation_rate)
-            
-            # Avalia o filho
-            mult, effects, cost = evaluate_combination(child_combo, initial_effects)
-            profit = (base_value * mult) - cost  # Cálculo do lucro
-            new_population.append((child_combo, mult, effects, cost, profit))
-            
-            # Atualiza o melhor resultado se necessário com base no lucro
-            if profit > best_profit:
-                best_multiplier = mult
-                best_combination = child_combo.copy()
-                best_effects = effects.copy()
-                best_cost = cost
-                best_profit = profit
-                print(f"Novo melhor: Multiplicador = {best_multiplier:.2f}, Custo = ${best_cost:.2f}, Lucro = ${best_profit:.2f}")
+        population, generation_evaluations = _evolve_generation(
+            population, gen, num_generations, engine, available_items, initial_state, combo_size,
+            base_value, base_mutation_rate, tournament_size, batch_evaluator, fitness_cache, rng, phase_seconds)
+        evaluations += generation_evaluations
+        if fitness_cache:
+            generation_avoided = fitness_cache.hits - avoided
+            avoided = fitness_cache.hits
+        _offer_population(top, population)
+        gen += 1
         
-        # Substitui a população antiga pela nova
-        population = sorted(new_population, key=lambda x: x[4], reverse=True)
+        # Atualiza o melhor resultado se necessário com base no lucro
+        if population[0][4] > best_profit:
+            best_combination, best_multiplier, best_state, best_cost, best_profit = population[0]
+            best_combination = list(best_combination)
+            logger.debug("Novo melhor: Multiplicador = %.2f, Custo = $%.2f, Lucro = $%.2f",
+                         best_multiplier, best_cost, best_profit,
+                         extra={"event": "new_best", "generation": gen, "profit": best_profit})
+            if improvements is not None:
+                improvements.append((time.time() - start_time, best_profit))
+            if monitor is not None:
+                monitor.update(gen, best_profit)
         
-        # Introduz diversidade aleatória a cada N gerações
-        if gen % 20 == 0 and gen > 0:
-            diversity_count = max(1, int(population_size * 0.1))
-            for _ in range(diversity_count):
-                random_combo = generate_random_combination(available_items, combo_size)
-                mult, effects, cost = evaluate_combination(random_combo, initial_effects)
-                profit = (base_value * mult) - cost
-                # Substitui um dos piores
-                if len(population) > 0:
-                    population[-1] = (random_combo, mult, effects, cost, profit)
-            
-            # Reordena após adicionar diversidade
-            population.sort(key=lambda x: x[4], reverse=True)
+        # Parada antecipada: mais gerações provavelmente não melhorariam o resultado
+        if monitor is not None and gen % CONVERGENCE_CHECK_GENERATIONS == 0:
+            reason = monitor.check(gen, population)
+            if reason:
+                stop_reason = reason
+                break
+    
+    ga_time = time.time() - start_time
+    logger.info("Avaliações: %s (%.0f por segundo, %s), repetidas evitadas: %s",
+                evaluations, evaluations / max(ga_time, 1e-9), "em lote" if batch_evaluator else "escalar", avoided)
+    if search_stats is not None:
+        search_stats.generations = gen
+        search_stats.evaluations = evaluations
+        search_stats.cache_hits = avoided
+        search_stats.ga_seconds = ga_time
+        search_stats.stop_reason = stop_reason
     
     # Reportar progresso (70%)
     if progress_callback:
         if not progress_callback(70, f"Algoritmo genético finalizado após {gen} gerações"):
-            return [], 0.0, {}, 0.0, 0.0
+            return [], 0.0, {}, 0.0, 0.0, []
     
     # Fase final: refina a melhor combinação encontrada
-    print("\nRefinando a melhor solução...")
+    logger.info("Refinando a melhor solução...")
+    if phase_seconds is not None:
+        phase_mark = time.perf_counter()
     
-    # Limita o número de permutações a testar
-    total_possible_perms = len(list(itertools.permutations(best_combination)))
+    # Limita o número de permutações a testar (ordens repetidas de itens iguais não contam)
+    total_possible_perms = count_distinct_permutations(best_combination)
     perms_to_test = min(max_perms_to_test, total_possible_perms)
     
     if perms_to_test > 0:
         # Reportar progresso (75%)
         if progress_callback:
             if not progress_callback(75, f"Refinando a solução: testando {perms_to_test} permutações"):
-                return [], 0.0, {}, 0.0, 0.0
+                return [], 0.0, {}, 0.0, 0.0, []
         
+        # As permutações são geradas sob demanda em ordem lexicográfica, para que
+        # permutações com o mesmo prefixo fiquem adjacentes
         if total_possible_perms <= max_perms_to_test:
-            permutations = list(itertools.permutations(best_combination))
+            permutations = iter_distinct_permutations(best_combination)
         else:
-            permutations = random.sample(list(itertools.permutations(best_combination)), perms_to_test)
+            permutations = sample_distinct_permutations(best_combination, perms_to_test, rng)
         
-        print(f"Testando {perms_to_test} permutações de {total_possible_perms} possíveis")
+        logger.info("Testando %s permutações de %s possíveis", perms_to_test, total_possible_perms)
+        
+        # Todas as permutações têm o mesmo custo; os estados de cada prefixo ficam
+        # numa pilha e só a parte que difere da permutação anterior é recalculada
+        perm_cost = engine.cost(best_combination)
+        prefix_states = [initial_state]
+        previous_perm = ()
         
         for i, perm in enumerate(permutations):
             # Verifica se o tempo limite foi atingido
             if time.time() - start_time > time_limit_seconds:
-                print(f"Refinamento interrompido após {i}/{perms_to_test} permutações.")
+                logger.info("Refinamento interrompido após %s/%s permutações.", i, perms_to_test)
                 break
             
             # Reportar progresso a cada 500 permutações (75% a 95%)
             if progress_callback and i % 500 == 0 and i > 0:
                 progress = 75 + min(20, int(20 * i / perms_to_test))
                 if not progress_callback(progress, f"Testando permutação {i}/{perms_to_test}"):
-                    return [], 0.0, {}, 0.0, 0.0
+                    return [], 0.0, {}, 0.0, 0.0, []
             
             if i % 500 == 0 and i > 0:
-                print(f"Testando permutação {i}/{perms_to_test}")
+                logger.debug("Testando permutação %s/%s", i, perms_to_test)
+            
+            shared = 0
+            while shared < len(previous_perm) and previous_perm[shared] == perm[shared]:
+                shared += 1
+            del prefix_states[shared + 1:]
+            for item in perm[shared:]:
+                prefix_states.append(transitions.step(prefix_states[-1], item))
+            previous_perm = perm
             
-            mult, effects, cost = evaluate_combination(perm, initial_effects)
+            state = prefix_states[-1]
+            mult = engine.multiplier(state)
+            cost = perm_cost
             profit = (base_value * mult) - cost  # Cálculo do lucro
+            if top is not None:
+                top.offer(profit, state, perm)
             
             # Atualiza o melhor resultado se necessário
             if profit > best_profit:
                 best_multiplier = mult
                 best_combination = list(perm)
-                best_effects = effects.copy()
+                best_state = state
                 best_cost = cost
                 best_profit = profit
-                print(f"Refinamento: Novo melhor = {best_multiplier:.2f}, Custo = ${best_cost:.2f}, Lucro = ${best_profit:.2f}")
+                logger.debug("Refinamento: Novo melhor = %.2f, Custo = $%.2f, Lucro = $%.2f",
+                             best_multiplier, best_cost, best_profit,
+                             extra={"event": "new_best", "phase": "refinement", "profit": best_profit})
+                if improvements is not None:
+                    improvements.append((time.time() - start_time, best_profit))
+    if phase_seconds is not None:
+        _add_phase_time(phase_seconds, "refinement", phase_mark)
     
     # Reportar progresso (100%)
     if progress_callback:
         if not progress_callback(100, f"Otimização concluída: Multiplicador = {best_multiplier:.2f}, Lucro = ${best_profit:.2f}"):
-            return [], 0.0, {}, 0.0, 0.0
+            return [], 0.0, {}, 0.0, 0.0, []
     
     elapsed_time = time.time() - start_time
-    print(f"\nTempo total de execução: {elapsed_time:.2f} segundos")
+    logger.info("Tempo total de execução: %.2f segundos", elapsed_time)
+    cache_stats = transitions.stats()
+    logger.info("Cache de transições: %s acertos, %s falhas, %s descartes (%.1f%% de acertos)",
+                cache_stats["hits"], cache_stats["misses"], cache_stats["evictions"], cache_stats["hit_rate"] * 100)
+    if search_stats is not None:
+        search_stats.transition_cache_hits = cache_stats["hits"]
+        search_stats.transition_cache_misses = cache_stats["misses"]
+    
+    if memory is not None:
+        memory.remember_elites(initial_state, [best_combination] + [individual[0] for individual in population])
+    
+    # Converte o melhor resultado de volta para nomes de itens e dicionário de efeitos
+    best_combination = engine.decode_items(best_combination)
+    best_effects = engine.decode_effects(best_state)
+    best_multiplier = calculate_total_multiplier(best_effects)
+    best_profit = (base_value * best_multiplier) - best_cost
+    
+    alternatives = []
+    if top is not None:
+        alternatives = _recipes_result(engine, [recipe for _, _, recipe in top.ranked()], initial_state, base_value)
+    return best_combination, best_multiplier, best_effects, best_cost, best_profit, alternatives
+
+def branch_and_bound(
+    initial_effects: Dict[str, float] = None,
+    combo_size: int = 8,
+    banned_items: List[str] = None,
+    base_value: float = 100,
+    incumbent: Optional[List[str]] = None,
+    time_limit_seconds: Optional[float] = None,
+    progress_callback: Callable[[int, str], bool] = None,
+    search_stats: Optional[SearchStats] = None
+) -> Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]:
+    """
+    Busca em profundidade com ramificação e poda (branch-and-bound).
+    
+    Uma receita parcial é podada quando seu multiplicador atual somado ao maior
+    ganho possível nas misturas restantes (limite admissível de solve_exact, que
+    considera os maiores valores de effect_multipliers alcançáveis e o limite de
+    8 efeitos) não consegue superar o lucro da melhor solução conhecida. Também
+    é podada quando o mesmo conjunto de efeitos já foi alcançado na mesma
+    profundidade com custo menor ou igual.
+    
+    Args:
+        initial_effects: Dicionário de efeitos iniciais já presentes
+        combo_size: Número de itens a serem selecionados
+        banned_items: Lista de itens que não podem ser usados
+        base_value: Valor base usado no cálculo do lucro
+        incumbent: Combinação inicial conhecida (por exemplo, o resultado de
+            find_best_combination); se omitida, usa uma busca em feixe
+        time_limit_seconds: Limite de tempo opcional; se atingido, retorna a melhor
+            solução conhecida sem garantia de otimalidade
+        progress_callback: Função de callback para reportar progresso (opcional)
+        search_stats: SearchStats (opcional); stop_reason recebe "complete" se a busca
+            terminou (solução ótima) ou "time_limit" se foi interrompida pelo limite de tempo,
+            e nodes_expanded, nodes_pruned e nodes_dominated recebem os contadores de nós
+    
+    Returns:
+        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas);
+        alternativas fica sempre vazia, no formato das demais buscas
+    """
+    start_time = time.time()
+    engine, available_items, initial_state, combo_size = _prepare_search(initial_effects, combo_size, banned_items)
+    item_costs = engine.item_costs
+    min_item_cost = min((item_costs[item] for item in available_items), default=0)
+    upper_bound = _make_units_bound(engine, available_items, combo_size)
+    
+    # Solução inicial: a combinação informada, se for válida, ou uma busca em feixe
+    if incumbent and len(incumbent) == combo_size and all(name in engine.item_index and engine.item_index[name] in available_items for name in incumbent):
+        best_path = tuple(engine.encode_items(incumbent))
+        best_state, _, best_cost = engine.evaluate_indices(best_path, initial_state)
+        source = "combinação informada"
+    else:
+        best_state, best_cost, best_path = _beam_search_indices(
+            engine, available_items, initial_state, combo_size, base_value, DEFAULT_BEAM_WIDTH, upper_bound)
+        source = "busca em feixe"
+    best_score = base_value * (MULTIPLIER_SCALE + engine.multiplier_units(best_state)) - MULTIPLIER_SCALE * best_cost
+    logger.info("Solução inicial (%s): Lucro = $%.2f", source, best_score / MULTIPLIER_SCALE)
+    
+    if progress_callback:
+        if not progress_callback(10, f"Branch-and-bound: solução inicial com lucro ${best_score / MULTIPLIER_SCALE:.2f}"):
+            return [], 0.0, {}, 0.0, 0.0, []
+    
+    best = [best_score, best_path]
+    cheapest = [{} for _ in range(combo_size + 1)]  # cheapest[profundidade][estado] = menor custo visto
+    counters = {"expanded": 0, "pruned": 0, "dominated": 0}
+    stop = [None]  # Motivo da interrupção ("time" ou "cancel")
+    
+    def search(state, cost, path, remaining):
+        counters["expanded"] += 1
+        if counters["expanded"] % 10000 == 0:
+            if time_limit_seconds is not None and time.time() - start_time > time_limit_seconds:
+                stop[0] = "time"
+        if stop[0]:
+            return
+        
+        if remaining == 1:
+            # Na última mistura basta o melhor item
+            score, item = engine.best_step(state, available_items, base_value)
+            score -= MULTIPLIER_SCALE * cost
+            if score > best[0]:
+                best[0] = score
+                best[1] = path + (item,)
+            return
+        
+        depth = combo_size - remaining + 1
+        seen = cheapest[depth]
+        children = sorted(zip(engine.successors(state, available_items), available_items),
+                          key=lambda child: engine.multiplier_units(child[0]) * base_value - MULTIPLIER_SCALE * item_costs[child[1]],
+                          reverse=True)
+        for new_state, item in children:
+            new_cost = cost + item_costs[item]
+            previous_cost = seen.get(new_state)
+            if previous_cost is not None and previous_cost <= new_cost:
+                counters["dominated"] += 1
+                continue
+            seen[new_state] = new_cost
+            
+            bound = (base_value * (MULTIPLIER_SCALE + upper_bound(new_state, remaining - 1))
+                     - MULTIPLIER_SCALE * (new_cost + (remaining - 1) * min_item_cost))
+            if bound <= best[0]:
+                counters["pruned"] += 1
+                continue
+            
+            search(new_state, new_cost, path + (item,), remaining - 1)
+            if stop[0]:
+                return
+    
+    if combo_size > 0:
+        # Os filhos da raiz são percorridos aqui para permitir reportar progresso
+        root_children = list(zip(engine.successors(initial_state, available_items), available_items))
+        for i, (new_state, item) in enumerate(root_children):
+            if progress_callback:
+                progress = 10 + int(85 * i / len(root_children))
+                if not progress_callback(progress, f"Branch-and-bound: ramo {i + 1}/{len(root_children)}, "
+                                                   f"{counters['expanded']} nós expandidos, {counters['pruned']} podados"):
+                    return [], 0.0, {}, 0.0, 0.0, []
+            
+            new_cost = item_costs[item]
+            previous_cost = cheapest[1].get(new_state)
+            if previous_cost is not None and previous_cost <= new_cost:
+                counters["dominated"] += 1
+                continue
+            cheapest[1][new_state] = new_cost
+            
+            bound = (base_value * (MULTIPLIER_SCALE + upper_bound(new_state, combo_size - 1))
+                     - MULTIPLIER_SCALE * (new_cost + (combo_size - 1) * min_item_cost))
+            if bound <= best[0]:
+                counters["pruned"] += 1
+                continue
+            
+            if combo_size == 1:
+                score = base_value * (MULTIPLIER_SCALE + engine.multiplier_units(new_state)) - MULTIPLIER_SCALE * new_cost
+                if score > best[0]:
+                    best[0] = score
+                    best[1] = (item,)
+                continue
+            
+            search(new_state, new_cost, (item,), combo_size - 1)
+            if stop[0]:
+                logger.info("Limite de tempo (%ss) atingido; retornando a melhor solução conhecida.",
+                            time_limit_seconds)
+                break
+    
+    best_path = best[1]
+    best_combination = engine.decode_items(best_path)
+    best_effects = engine.decode_effects(engine.apply_items(best_path, initial_state))
+    best_cost = engine.cost(best_path)
+    best_multiplier = calculate_total_multiplier(best_effects)
+    best_profit = (base_value * best_multiplier) - best_cost
+    
+    if progress_callback:
+        if not progress_callback(100, f"Otimização concluída: Multiplicador = {best_multiplier:.2f}, Lucro = ${best_profit:.2f}"):
+            return [], 0.0, {}, 0.0, 0.0, []
+    
+    status = "ótima" if not stop[0] else "sem garantia de otimalidade"
+    if search_stats is not None:
+        search_stats.stop_reason = "time_limit" if stop[0] else "complete"
+        search_stats.nodes_expanded = counters["expanded"]
+        search_stats.nodes_pruned = counters["pruned"]
+        search_stats.nodes_dominated = counters["dominated"]
+    logger.info("Nós expandidos: %s, podados pelo limite: %s, dominados: %s",
+                counters["expanded"], counters["pruned"], counters["dominated"])
+    logger.info("Solução %s: Multiplicador = %.2f, Custo = $%.2f, Lucro = $%.2f",
+                status, best_multiplier, best_cost, best_profit)
+    logger.info("Tempo total de execução: %.2f segundos", time.time() - start_time)
+    
+    return best_combination, best_multiplier, best_effects, best_cost, best_profit, []
+
+class TopRecipes:
+    """
+    Heap limitado às k melhores receitas distintas encontradas por uma busca.
+    
+    Guarda uma única receita por conjunto final de efeitos (a de maior pontuação),
+    o que também impede sequências repetidas. Ofertas abaixo da k-ésima pontuação
+    são descartadas em tempo constante; entradas substituídas ficam no heap e são
+    ignoradas quando chegam ao topo.
+    """
+    
+    def __init__(self, k: int):
+        self.k = max(0, k)
+        self._heap = []  # (pontuação, contador, estado), menor pontuação no topo
+        self._best = {}  # estado -> (pontuação, receita)
+        self._counter = 0
+    
+    def __len__(self) -> int:
+        return len(self._best)
+    
+    @property
+    def threshold(self) -> float:
+        """Pontuação que uma nova receita precisa superar para entrar (-inf enquanto houver vaga)."""
+        if len(self._best) < self.k:
+            return float("-inf")
+        heap = self._heap
+        while True:
+            score, _, state = heap[0]
+            entry = self._best.get(state)
+            if entry is not None and entry[0] == score:
+                return score
+            heapq.heappop(heap)
+    
+    def offer(self, score, state, recipe):
+        """Oferece uma receita com sua pontuação e seu estado final de efeitos."""
+        entry = self._best.get(state)
+        if entry is not None:
+            if score > entry[0]:
+                self._push(score, state, recipe)
+            return
+        if self.k == 0 or score <= self.threshold:
+            return
+        if len(self._best) >= self.k:
+            # Remove a pior receita (o topo do heap é válido após threshold)
+            _, _, worst_state = heapq.heappop(self._heap)
+            del self._best[worst_state]
+        self._push(score, state, recipe)
+    
+    def _push(self, score, state, recipe):
+        self._best[state] = (score, recipe)
+        self._counter += 1
+        heapq.heappush(self._heap, (score, self._counter, state))
+    
+    def ranked(self):
+        """Retorna as receitas como (pontuação, estado, receita), da melhor para a pior."""
+        return sorted(((score, state, recipe) for state, (score, recipe) in self._best.items()),
+                      key=lambda entry: entry[0], reverse=True)
+
+def _recipes_result(engine, paths, initial_state, base_value):
+    """
+    Converte receitas (sequências de índices) no formato de resultado do otimizador.
+    
+    Returns:
+        Lista de tuplas (combinação, multiplicador, efeitos, custo, lucro), do maior para o menor lucro
+    """
+    results = []
+    for path in paths:
+        effects = engine.decode_effects(engine.apply_items(path, initial_state))
+        multiplier = calculate_total_multiplier(effects)
+        cost = engine.cost(path)
+        results.append((engine.decode_items(path), multiplier, effects, cost, (base_value * multiplier) - cost))
+    results.sort(key=lambda result: result[4], reverse=True)
+    return results
+
+class SearchMemory:
+    """
+    Estado da última busca, reaproveitado pela próxima consulta.
     
-    return best_combination, best_multiplier, best_effects, best_cost, best_profit
+    - Fronteira da busca exata: o menor custo de cada conjunto de efeitos em cada
+      profundidade depende apenas dos efeitos iniciais e dos itens permitidos, então
+      as camadas (sem poda) valem para qualquer tamanho de combinação e valor base.
+      Com itens recém-banidos elas são reparadas, e não recalculadas.
+    - Melhor última mistura de cada estado da fronteira, por valor base: com itens
+      recém-banidos, as que continuam permitidas valem como estão.
+    - Receitas de elite: as melhores receitas da última busca; as que não usam itens
+      recém-banidos servem de solução inicial (busca exata) ou de sementes da
+      população (algoritmo genético).
+    - Memória de avaliações do algoritmo genético, válida enquanto os efeitos
+      iniciais forem os mesmos.
+    
+    O cache de transições do motor de efeitos já é compartilhado entre execuções.
+    """
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        """Descarta todo o estado guardado."""
+        self.frontier_key = None  # (estado inicial, itens permitidos) das camadas guardadas
+        self.layers = []  # layers[d][estado] = menor custo na profundidade d (layers[0] é o estado inicial)
+        self.parents = []  # parents[d - 1][estado] = estado anterior * número de itens + item
+        self.last_steps = {}  # (valor base, profundidade) -> {estado: (pontuação do melhor item sem o custo, item)}
+        self.elite_state = None  # Estado inicial das receitas de elite
+        self.elites = []  # Receitas (tuplas de índices) da última busca, da melhor para a pior
+        self.proven = {}  # (estado inicial, valor base, tamanho) -> (itens permitidos, receita) de soluções provadas
+        self.fitness_cache = None
+    
+    def frontier_states(self) -> int:
+        """Número total de estados guardados nas camadas da busca exata."""
+        return sum(len(layer) for layer in self.layers)
+    
+    def remember_elites(self, initial_state, recipes):
+        """Guarda até SEARCH_MEMORY_ELITES receitas distintas, da melhor para a pior."""
+        elites = []
+        seen = set()
+        for recipe in recipes:
+            recipe = tuple(recipe)
+            if recipe and recipe not in seen:
+                seen.add(recipe)
+                elites.append(recipe)
+                if len(elites) >= SEARCH_MEMORY_ELITES:
+                    break
+        self.elite_state = initial_state
+        self.elites = elites
+    
+    def survivors(self, initial_state, available_items):
+        """Receitas de elite com os mesmos efeitos iniciais que só usam itens permitidos."""
+        if self.elite_state != initial_state:
+            return []
+        allowed = set(available_items)
+        return [recipe for recipe in self.elites if allowed.issuperset(recipe)]
+
+search_memory = SearchMemory()  # Estado compartilhado pelas buscas com reuse_search_state=True
+
+def clear_search_state():
+    """Descarta o estado da última busca (fronteira, receitas de elite e memória de avaliações)."""
+    search_memory.clear()
+
+def _resize_recipe(engine, recipe, combo_size, available_items, initial_state, base_value):
+    """
+    Ajusta uma receita ao tamanho pedido: corta o final ou completa com o melhor
+    item a cada mistura. Retorna a nova receita (tupla de índices).
+    """
+    recipe = list(recipe[:combo_size])
+    state = engine.apply_items(recipe, initial_state)
+    while len(recipe) < combo_size and available_items:
+        _, item = engine.best_step(state, available_items, base_value)
+        state = engine.apply_item(state, item)
+        recipe.append(item)
+    return tuple(recipe)
+
+def _make_units_bound(engine, available_items, max_steps):
+    """
+    Cria uma função que retorna um limite superior admissível (em centésimos)
+    para a soma dos multiplicadores após um número de misturas restantes.
+    
+    Cada efeito presente pode se transformar no máximo uma vez por mistura,
+    seguindo as regras dos itens disponíveis, e cada mistura adiciona no máximo
+    um efeito novo. O limite soma, para cada efeito, o maior valor alcançável
+    a partir dele e, para cada efeito novo, o maior valor que o efeito de algum
+    item pode atingir até o fim, respeitando o limite de 8 efeitos.
+    """
+    # reach[k][e]: maior valor alcançável a partir do efeito e em até k misturas (grafo de regras)
+    graph = graph_for_items(available_items)
+    reach = [graph.max_units_within(k) for k in range(max_steps + 1)]
+    
+    # new_values[k]: maior valor de um efeito adicionado com k misturas restantes após ele
+    item_effects = {engine.item_effect_bits[item].bit_length() - 1 for item in available_items}
+    new_values = [max((reach[k][e] for e in item_effects), default=0) for k in range(max_steps + 1)]
+    new_sums = [sum(new_values[:remaining]) for remaining in range(max_steps + 1)]
+    reach_sums = [EffectSumTable(values) for values in reach]
+    
+    def upper_bound(state, remaining):
+        if state.bit_count() + remaining <= MAX_EFFECTS:
+            return reach_sums[remaining](state) + new_sums[remaining]
+        # Mais candidatos do que o limite de efeitos: soma apenas os 8 maiores
+        values = new_values[:remaining]
+        reach_remaining = reach[remaining]
+        while state:
+            low_bit = state & -state
+            values.append(reach_remaining[low_bit.bit_length() - 1])
+            state ^= low_bit
+        values.sort(reverse=True)
+        return sum(values[:MAX_EFFECTS])
+    
+    return upper_bound
+
+def _beam_search_indices(engine, available_items, initial_state, combo_size, base_value,
+                         beam_width, upper_bound, progress_callback=None, top=None):
+    """
+    Núcleo da busca em feixe, sobre índices de itens e máscaras de efeitos.
+    
+    A cada profundidade expande todos os itens disponíveis a partir das beam_width
+    receitas parciais mantidas, deduplica pelo conjunto de efeitos resultante
+    (mantendo a mais barata) e conserva as beam_width melhores segundo o lucro
+    otimista: o multiplicador atual acrescido de uma fração BEAM_OPTIMISM do ganho
+    máximo admissível nas misturas restantes.
+    
+    Se top (TopRecipes) for informado, todas as receitas completas da última mistura
+    são oferecidas a ele, com pontuação em centésimos e a sequência de índices como receita.
+    
+    Returns:
+        Tupla contendo: (estado final, custo, sequência de índices), ou None se cancelado
+    """
+    item_costs = engine.item_costs
+    
+    def optimistic_score(entry, remaining):
+        state, (cost, _) = entry
+        current_units = engine.multiplier_units(state)
+        optimistic_units = current_units + BEAM_OPTIMISM * (upper_bound(state, remaining) - current_units)
+        return base_value * optimistic_units - MULTIPLIER_SCALE * cost
+    
+    beam = {initial_state: (0, ())}
+    for depth in range(1, combo_size):
+        remaining = combo_size - depth
+        expanded = {}
+        for state, (cost, path) in beam.items():
+            for item, new_state in zip(available_items, engine.successors(state, available_items)):
+                new_cost = cost + item_costs[item]
+                current = expanded.get(new_state)
+                if current is None or new_cost < current[0]:
+                    expanded[new_state] = (new_cost, path + (item,))
+        ranked = sorted(expanded.items(), key=lambda entry: optimistic_score(entry, remaining), reverse=True)
+        beam = dict(ranked[:beam_width])
+        
+        if progress_callback:
+            progress = 10 + int(85 * depth / combo_size)
+            if not progress_callback(progress, f"Busca em feixe: profundidade {depth}/{combo_size}"):
+                return None
+    
+    if combo_size == 0:
+        return initial_state, 0, ()
+    
+    if top is not None:
+        # Oferece todas as receitas completas às alternativas
+        for state, (cost, path) in beam.items():
+            for item, new_state in zip(available_items, engine.successors(state, available_items)):
+                new_cost = cost + item_costs[item]
+                score = base_value * (MULTIPLIER_SCALE + engine.multiplier_units(new_state)) - MULTIPLIER_SCALE * new_cost
+                top.offer(score, new_state, path + (item,))
+    
+    # Última mistura: basta o melhor item para cada receita parcial
+    best = None
+    for state, (cost, path) in beam.items():
+        score, item = engine.best_step(state, available_items, base_value)
+        score -= MULTIPLIER_SCALE * cost
+        if best is None or score > best[0]:
+            best = (score, state, cost, path, item)
+    _, state, cost, path, item = best
+    return engine.apply_item(state, item), cost + item_costs[item], path + (item,)
+
+def _prepare_search(initial_effects, combo_size, banned_items):
+    """
+    Prepara os dados comuns às buscas determinísticas.
+    
+    Returns:
+        Tupla contendo: (motor, índices dos itens disponíveis, estado inicial, tamanho da combinação)
+    """
+    # Remove os itens banidos da lista de itens disponíveis
+    banned_items = banned_items or []
+    available_names = [item for item in items.keys() if item not in banned_items]
+    
+    if len(available_names) < combo_size:
+        logger.warning("Aviso: O tamanho da combinação (%s) é maior que o número de itens disponíveis (%s).",
+                       combo_size, len(available_names))
+        logger.info("Ajustando o tamanho da combinação para %s.", len(available_names))
+        combo_size = len(available_names)
+    
+    engine = get_engine()
+    return engine, engine.encode_items(available_names), engine.encode_effects(initial_effects), combo_size
+
+def beam_search(
+    initial_effects: Dict[str, float] = None,
+    combo_size: int = 8,
+    banned_items: List[str] = None,
+    base_value: float = 100,
+    beam_width: int = DEFAULT_BEAM_WIDTH,
+    progress_callback: Callable[[int, str], bool] = None,
+    top_k: int = 0
+) -> Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]:
+    """
+    Busca em feixe: modo rápido e determinístico entre o algoritmo genético e a busca exata.
+    
+    Args:
+        initial_effects: Dicionário de efeitos iniciais já presentes
+        combo_size: Número de itens a serem selecionados
+        banned_items: Lista de itens que não podem ser usados
+        base_value: Valor base usado no cálculo do lucro
+        beam_width: Número de receitas parciais mantidas a cada profundidade
+        progress_callback: Função de callback para reportar progresso (opcional)
+        top_k: Se maior que zero, também retorna as top_k melhores receitas com
+            conjuntos finais de efeitos distintos encontradas na última mistura
+    
+    Returns:
+        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas);
+        alternativas lista, com top_k, receitas no mesmo formato, da melhor para a pior, e
+        fica vazia sem top_k
+    """
+    start_time = time.time()
+    engine, available_items, initial_state, combo_size = _prepare_search(initial_effects, combo_size, banned_items)
+    
+    upper_bound = _make_units_bound(engine, available_items, combo_size)
+    top = TopRecipes(top_k) if top_k > 0 else None
+    result = _beam_search_indices(engine, available_items, initial_state, combo_size,
+                                  base_value, max(1, beam_width), upper_bound, progress_callback, top)
+    if result is None:
+        return [], 0.0, {}, 0.0, 0.0, []
+    
+    best_state, best_cost, best_path = result
+    best_combination = engine.decode_items(best_path)
+    best_effects = engine.decode_effects(best_state)
+    best_multiplier = calculate_total_multiplier(best_effects)
+    best_profit = (base_value * best_multiplier) - best_cost
+    
+    if progress_callback:
+        if not progress_callback(100, f"Otimização concluída: Multiplicador = {best_multiplier:.2f}, Lucro = ${best_profit:.2f}"):
+            return [], 0.0, {}, 0.0, 0.0, []
+    
+    logger.info("Busca em feixe (largura %s): Multiplicador = %.2f, Custo = $%.2f, Lucro = $%.2f",
+                beam_width, best_multiplier, best_cost, best_profit)
+    logger.info("Tempo total de execução: %.2f segundos", time.time() - start_time)
+    
+    alternatives = []
+    if top is not None:
+        paths = [recipe for _, _, recipe in top.ranked()] or [best_path]
+        alternatives = _recipes_result(engine, paths, initial_state, base_value)
+    return best_combination, best_multiplier, best_effects, best_cost, best_profit, alternatives
+
+def solve_exact(
+    initial_effects: Dict[str, float] = None,
+    combo_size: int = 8,
+    banned_items: List[str] = None,
+    base_value: float = 100,
+    time_limit_seconds: Optional[float] = None,
+    progress_callback: Callable[[int, str], bool] = None,
+    reuse_search_state: bool = True,
+    top_k: int = 0,
+    search_stats: Optional[SearchStats] = None
+) -> Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]:
+    """
+    Encontra a combinação ótima de forma determinística por programação dinâmica
+    sobre os conjuntos de efeitos alcançáveis.
+    
+    A cada profundidade é mantido apenas o caminho mais barato até cada conjunto
+    de efeitos, pois o resultado das próximas misturas depende só do conjunto.
+    Na última mistura, estados cujo limite superior de lucro não supera a melhor
+    solução conhecida (obtida de uma busca em feixe ou da busca anterior) são podados.
+    
+    Com reuse_search_state, as camadas calculadas ficam em search_memory: uma nova
+    consulta com os mesmos efeitos iniciais e itens permitidos só calcula as camadas
+    que faltam (mudar o tamanho da combinação ou o valor base é quase imediato), e
+    banir itens que a última solução ótima não usa a mantém ótima sem nova busca.
+    
+    Args:
+        initial_effects: Dicionário de efeitos iniciais já presentes
+        combo_size: Número de itens a serem selecionados
+        banned_items: Lista de itens que não podem ser usados
+        base_value: Valor base usado no cálculo do lucro
+        time_limit_seconds: Limite de tempo opcional; se atingido, retorna a melhor
+            solução conhecida sem garantia de otimalidade
+        progress_callback: Função de callback para reportar progresso (opcional)
+        reuse_search_state: Se True, reaproveita e atualiza o estado da última busca
+        top_k: Se maior que zero, também retorna as top_k melhores receitas com
+            conjuntos finais de efeitos distintos (exatas quando a otimalidade é provada)
+        search_stats: SearchStats (opcional); stop_reason recebe "complete" se a otimalidade
+            foi provada ou "time_limit" se a busca foi interrompida pelo limite de tempo
+    
+    Returns:
+        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas);
+        alternativas lista, com top_k, receitas no mesmo formato, da melhor para a pior, e
+        fica vazia sem top_k
+    """
+    start_time = time.time()
+    engine, available_items, initial_state, combo_size = _prepare_search(initial_effects, combo_size, banned_items)
+    allowed = frozenset(available_items)
+    memory = search_memory if reuse_search_state else None
+    
+    if progress_callback:
+        if not progress_callback(10, "Calculando solução inicial"):
+            return [], 0.0, {}, 0.0, 0.0, []
+    
+    # Restringir os itens não muda uma solução ótima anterior se ela continua permitida
+    # (as alternativas também, se as top_k primeiras continuam permitidas)
+    best_path = None
+    proven_key = (initial_state, base_value, combo_size)
+    if memory and proven_key in memory.proven:
+        last_allowed, last_path, last_top_paths = memory.proven[proven_key]
+        top_paths = list(last_top_paths[:top_k])
+        if (allowed <= last_allowed and allowed.issuperset(last_path) and len(top_paths) == top_k
+                and all(allowed.issuperset(path) for path in top_paths)):
+            best_path = last_path
+            logger.info("Solução ótima anterior continua válida com os itens permitidos.")
+    
+    if best_path is None:
+        best_path, proven, top_paths = _solve_exact_indices(
+            engine, available_items, initial_state, combo_size, base_value, memory,
+            start_time, time_limit_seconds, progress_callback, top_k)
+        if best_path is None:
+            return [], 0.0, {}, 0.0, 0.0, []
+        if memory is not None:
+            memory.remember_elites(initial_state, [best_path] + top_paths
+                                   + memory.survivors(initial_state, available_items))
+            if proven:
+                if len(memory.proven) >= SEARCH_MEMORY_PROVEN:
+                    memory.proven.clear()
+                memory.proven[proven_key] = (allowed, tuple(best_path), tuple(map(tuple, top_paths)))
+    else:
+        proven = True
+    
+    best_combination = engine.decode_items(best_path)
+    best_effects = engine.decode_effects(engine.apply_items(best_path, initial_state))
+    best_cost = engine.cost(best_path)
+    best_multiplier = calculate_total_multiplier(best_effects)
+    best_profit = (base_value * best_multiplier) - best_cost
+    
+    if progress_callback:
+        if not progress_callback(100, f"Otimização concluída: Multiplicador = {best_multiplier:.2f}, Lucro = ${best_profit:.2f}"):
+            return [], 0.0, {}, 0.0, 0.0, []
+    
+    elapsed_time = time.time() - start_time
+    status = "ótima" if proven else "sem garantia de otimalidade"
+    if search_stats is not None:
+        search_stats.stop_reason = "complete" if proven else "time_limit"
+    logger.info("Solução %s: Multiplicador = %.2f, Custo = $%.2f, Lucro = $%.2f",
+                status, best_multiplier, best_cost, best_profit)
+    logger.info("Tempo total de execução: %.2f segundos", elapsed_time)
+    
+    alternatives = _recipes_result(engine, top_paths, initial_state, base_value) if top_k > 0 else []
+    return best_combination, best_multiplier, best_effects, best_cost, best_profit, alternatives
+
+def solve_all_lengths(
+    initial_effects: Dict[str, float] = None,
+    combo_size: int = 8,
+    banned_items: List[str] = None,
+    base_value: float = 100,
+    time_limit_seconds: Optional[float] = None,
+    progress_callback: Callable[[int, str], bool] = None,
+    reuse_search_state: bool = True,
+    search_stats: Optional[SearchStats] = None
+) -> List[Tuple[List[str], float, Dict[str, float], float, float]]:
+    """
+    Encontra em uma única busca a receita ótima de cada tamanho, de 1 a combo_size itens.
+    
+    As camadas da programação dinâmica de solve_exact guardam o menor custo de cada
+    conjunto de efeitos em cada profundidade, então a melhor receita de cada tamanho
+    menor que combo_size sai de uma passada pela sua camada. Só o maior tamanho usa a
+    última mistura podada de solve_exact, com a melhor receita do tamanho anterior
+    (completada com o melhor item) como solução inicial; o custo total fica próximo
+    ao de uma única busca exata com combo_size itens.
+    
+    Args:
+        initial_effects: Dicionário de efeitos iniciais já presentes
+        combo_size: Maior número de itens das receitas
+        banned_items: Lista de itens que não podem ser usados
+        base_value: Valor base usado no cálculo do lucro
+        time_limit_seconds: Limite de tempo opcional; se atingido, os tamanhos que faltam
+            são completados com o melhor item a cada mistura, sem garantia de otimalidade
+        progress_callback: Função de callback para reportar progresso (opcional)
+        reuse_search_state: Se True, reaproveita e atualiza o estado da última busca
+        search_stats: SearchStats (opcional); stop_reason recebe "complete" se todas as
+            receitas são ótimas ou "time_limit" se a busca foi interrompida pelo limite de tempo
+    
+    Returns:
+        Lista com uma tupla (combinação, multiplicador, efeitos, custo, lucro) por tamanho,
+        do menor para o maior, ou lista vazia se cancelado
+    """
+    start_time = time.time()
+    engine, available_items, initial_state, combo_size = _prepare_search(initial_effects, combo_size, banned_items)
+    allowed = frozenset(available_items)
+    # Sem reaproveitamento, uma memória temporária leva as camadas até a última mistura
+    memory = search_memory if reuse_search_state else SearchMemory()
+    num_items = len(engine.item_names)
+    
+    if progress_callback:
+        if not progress_callback(10, "Calculando a melhor receita de cada tamanho"):
+            return []
+    
+    frontier = _build_frontier(engine, available_items, initial_state, combo_size - 1, memory,
+                               start_time, time_limit_seconds, progress_callback, combo_size)
+    if frontier is None:
+        return []
+    layers, parents, proven = frontier
+    
+    # Tamanhos menores: a melhor pontuação (lucro em centésimos) de cada camada
+    paths = []
+    for depth in range(1, min(len(layers), combo_size)):
+        best_score = None
+        for state, cost in layers[depth].items():
+            score = base_value * (MULTIPLIER_SCALE + engine.multiplier_units(state)) - MULTIPLIER_SCALE * cost
+            if best_score is None or score > best_score:
+                best_score, best_state = score, state
+        paths.append(_backtrack_path(parents, num_items, best_state, depth))
+    
+    if combo_size > 0 and proven:
+        # Maior tamanho: última mistura de solve_exact sobre as mesmas camadas
+        memory.remember_elites(initial_state, paths[-1:])
+        best_path, proven, _ = _solve_exact_indices(
+            engine, available_items, initial_state, combo_size, base_value, memory,
+            start_time, time_limit_seconds, progress_callback)
+        if best_path is None:
+            return []
+        paths.append(best_path)
+    
+    # Tamanhos que o limite de tempo não alcançou: completa a última receita conhecida
+    while len(paths) < combo_size:
+        previous = paths[-1] if paths else ()
+        paths.append(list(_resize_recipe(engine, previous, len(paths) + 1, available_items,
+                                         initial_state, base_value)))
+    
+    if reuse_search_state:
+        memory.remember_elites(initial_state, paths[::-1])
+        if proven:
+            # Cada tamanho fica disponível para solve_exact sem nova busca
+            for path in paths:
+                if len(memory.proven) >= SEARCH_MEMORY_PROVEN:
+                    memory.proven.clear()
+                memory.proven[(initial_state, base_value, len(path))] = (allowed, tuple(path), ())
+    
+    results = _recipes_result(engine, paths, initial_state, base_value)
+    results.sort(key=lambda result: len(result[0]))
+    
+    if progress_callback:
+        if not progress_callback(100, f"Otimização concluída: melhores receitas de 1 a {combo_size} itens"):
+            return []
+    
+    status = "ótimas" if proven else "sem garantia de otimalidade"
+    if search_stats is not None:
+        search_stats.stop_reason = "complete" if proven else "time_limit"
+    for combination, multiplier, _, cost, profit in results:
+        logger.info("%s itens (%s): Multiplicador = %.2f, Custo = $%.2f, Lucro = $%.2f",
+                    len(combination), status, multiplier, cost, profit)
+    logger.info("Tempo total de execução: %.2f segundos", time.time() - start_time)
+    
+    return results
+
+def pareto_front(
+    initial_effects: Dict[str, float] = None,
+    combo_size: int = 8,
+    banned_items: List[str] = None,
+    base_value: float = 100,
+    time_limit_seconds: Optional[float] = None,
+    progress_callback: Callable[[int, str], bool] = None,
+    reuse_search_state: bool = True,
+    search_stats: Optional[SearchStats] = None
+) -> List[Tuple[List[str], float, Dict[str, float], float, float]]:
+    """
+    Encontra em uma única busca as receitas não dominadas em preço de venda
+    (base_value * multiplicador, maior é melhor), custo total e número de misturas
+    (menores são melhores), entre todas as receitas de 1 a combo_size itens.
+    
+    As camadas da programação dinâmica de solve_exact já dão o menor custo de cada
+    conjunto de efeitos em cada profundidade, que são os únicos candidatos. As
+    profundidades são percorridas em ordem crescente com uma escada das receitas
+    aceitas (custos em ordem crescente e o maior multiplicador até cada custo): um
+    candidato é dominado por uma receita mais curta se a escada tiver multiplicador
+    maior ou igual com custo menor ou igual, o que uma busca binária responde. Os
+    sobreviventes de cada profundidade são ordenados por custo para descartar os
+    dominados de mesmo tamanho. Na última profundidade, estados cujo melhor
+    multiplicador possível já está dominado não são expandidos.
+    
+    Args:
+        initial_effects: Dicionário de efeitos iniciais já presentes
+        combo_size: Maior número de itens das receitas
+        banned_items: Lista de itens que não podem ser usados
+        base_value: Valor base usado no cálculo do preço de venda e do lucro
+        time_limit_seconds: Limite de tempo opcional; se atingido, a fronteira só
+            considera as profundidades já calculadas
+        progress_callback: Função de callback para reportar progresso (opcional)
+        reuse_search_state: Se True, reaproveita e atualiza as camadas da última busca exata
+        search_stats: SearchStats (opcional); stop_reason recebe "complete" se a fronteira
+            considera todas as profundidades ou "time_limit" se a busca foi interrompida
+    
+    Returns:
+        Lista de tuplas (combinação, multiplicador, efeitos, custo, lucro), ordenada pelo
+        número de itens e depois pelo custo, ou lista vazia se cancelado
+    """
+    start_time = time.time()
+    engine, available_items, initial_state, combo_size = _prepare_search(initial_effects, combo_size, banned_items)
+    memory = search_memory if reuse_search_state else None
+    item_costs = engine.item_costs
+    num_items = len(engine.item_names)
+    
+    if progress_callback:
+        if not progress_callback(10, "Calculando a fronteira de Pareto"):
+            return []
+    
+    frontier = _build_frontier(engine, available_items, initial_state, combo_size - 1, memory,
+                               start_time, time_limit_seconds, progress_callback, combo_size)
+    if frontier is None:
+        return []
+    layers, parents, complete = frontier
+    
+    upper_bound = _make_units_bound(engine, available_items, 1)
+    min_item_cost = min((item_costs[item] for item in available_items), default=0)
+    
+    # Escada das receitas já aceitas (todas mais curtas que a profundidade atual)
+    points = []  # (custo, soma dos multiplicadores em centésimos)
+    staircase_costs = []
+    staircase_units = []  # staircase_units[i] = maior soma com custo <= staircase_costs[i]
+    
+    def best_units(cost):
+        i = bisect_right(staircase_costs, cost)
+        return staircase_units[i - 1] if i else -1
+    
+    front = []  # (profundidade, estado, último passo ou None)
+    for depth in range(1, combo_size + 1):
+        steps = None  # Último passo (estado anterior * num_items + item) da profundidade final
+        if depth < len(layers):
+            candidates = layers[depth]
+        elif depth == combo_size and complete:
+            # Última profundidade: só expande estados que podem gerar receitas não dominadas.
+            # Além da escada das receitas mais curtas, uma escada própria (custos e somas
+            # estritamente crescentes) guarda a fronteira parcial desta profundidade; como
+            # empates com ela ainda podem pertencer à fronteira, só a dominância estrita poda
+            candidates = {}
+            steps = {}
+            final_costs = []
+            final_units = []
+            pruned = 0
+            
+            def strictly_dominated(cost, units):
+                i = bisect_right(final_costs, cost)
+                return i > 0 and (final_units[i - 1] > units
+                                  or (final_units[i - 1] == units and final_costs[i - 1] < cost))
+            
+            for state, cost in layers[depth - 1].items():
+                bound = upper_bound(state, 1)
+                if best_units(cost + min_item_cost) >= bound or strictly_dominated(cost + min_item_cost, bound):
+                    pruned += 1
+                    continue
+                for item, new_state in zip(available_items, engine.successors(state, available_items)):
+                    new_cost = cost + item_costs[item]
+                    current = candidates.get(new_state)
+                    if current is not None and new_cost >= current:
+                        continue
+                    units = engine.multiplier_units(new_state)
+                    if units <= best_units(new_cost) or strictly_dominated(new_cost, units):
+                        continue
+                    candidates[new_state] = new_cost
+                    steps[new_state] = state * num_items + item
+                    
+                    # Insere na escada desta profundidade, removendo os pontos que passam a ser dominados
+                    i = bisect_right(final_costs, new_cost)
+                    if i and final_units[i - 1] >= units:
+                        continue
+                    j = i
+                    while j < len(final_costs) and final_units[j] <= units:
+                        j += 1
+                    if i and final_costs[i - 1] == new_cost:
+                        i -= 1
+                    final_costs[i:j] = [new_cost]
+                    final_units[i:j] = [units]
+            logger.debug("Profundidade %s/%s: %s candidatos, %s estados podados",
+                         depth, combo_size, len(candidates), pruned)
+        else:
+            break
+        
+        # Descarta os dominados por receitas mais curtas e, depois, os de mesmo tamanho
+        survivors = []
+        for state, cost in candidates.items():
+            units = engine.multiplier_units(state)
+            if units > best_units(cost):
+                survivors.append((cost, -units, state))
+        survivors.sort()
+        accepted = 0
+        running = -1
+        for cost, negative_units, state in survivors:
+            if -negative_units > running:
+                running = -negative_units
+                front.append((depth, state, steps[state] if steps else None))
+                points.append((cost, running))
+                accepted += 1
+        logger.debug("Fronteira de Pareto com %s itens: %s receitas", depth, accepted)
+        
+        points.sort()
+        staircase_costs = [cost for cost, _ in points]
+        staircase_units = list(itertools.accumulate((units for _, units in points), max))
+    
+    paths = []
+    for depth, state, step in front:
+        if step is None:
+            paths.append(_backtrack_path(parents, num_items, state, depth))
+        else:
+            previous_state, item = divmod(step, num_items)
+            paths.append(_backtrack_path(parents, num_items, previous_state, depth - 1) + [item])
+    results = _recipes_result(engine, paths, initial_state, base_value)
+    results.sort(key=lambda result: (len(result[0]), result[3]))
+    
+    if progress_callback:
+        if not progress_callback(100, f"Fronteira de Pareto concluída: {len(results)} receitas"):
+            return []
+    
+    if search_stats is not None:
+        search_stats.stop_reason = "complete" if complete else "time_limit"
+    logger.info("Fronteira de Pareto: %s receitas não dominadas", len(results))
+    logger.info("Tempo total de execução: %.2f segundos", time.time() - start_time)
+    
+    return results
+
+def _build_frontier(engine, available_items, initial_state, max_depth, memory, start_time,
+                    time_limit_seconds=None, progress_callback=None, total_depth=None):
+    """
+    Calcula as camadas da programação dinâmica até a profundidade max_depth.
+    
+    layers[d] guarda o menor custo de cada conjunto de efeitos alcançável com d misturas
+    e parents[d - 1] o passo (estado anterior * número de itens + item) que o alcança.
+    As camadas não são podadas, para valerem em qualquer consulta futura; com memory,
+    as camadas guardadas para os mesmos efeitos iniciais e itens permitidos são
+    reaproveitadas e as novas são guardadas se couberem em SEARCH_MEMORY_MAX_STATES.
+    Se os itens permitidos forem parte dos guardados (itens recém-banidos), as camadas
+    guardadas são reparadas (ver _repair_layer) e continuam guardadas como estão, para
+    a próxima consulta que volte a permitir esses itens.
+    
+    Returns:
+        Tupla contendo: (camadas, pais, False se o limite de tempo interrompeu o cálculo),
+        ou None se cancelado
+    """
+    item_costs = engine.item_costs
+    num_items = len(engine.item_names)
+    total_depth = total_depth or max_depth
+    
+    # Camadas já calculadas para os mesmos efeitos iniciais e itens permitidos
+    frontier_key = (initial_state, frozenset(available_items))
+    base_layers, base_parents = [], []  # Camadas guardadas sobre mais itens, reparadas uma a uma
+    if memory is not None and memory.frontier_key == frontier_key:
+        layers, parents = memory.layers, memory.parents
+        logger.info("Reaproveitando %s camadas da busca anterior (%s estados)",
+                    len(layers) - 1, memory.frontier_states())
+    else:
+        layers = [{initial_state: 0}]  # layers[d][estado] = menor custo na profundidade d
+        parents = []  # parents[d - 1][estado] = estado anterior * num_items + item
+        if (memory is not None and memory.frontier_key is not None and memory.frontier_key[0] == initial_state
+                and frontier_key[1] < memory.frontier_key[1]):
+            base_layers, base_parents = memory.layers, memory.parents
+            banned = memory.frontier_key[1] - frontier_key[1]
+            logger.info("Reparando %s camadas da busca anterior sem %s itens banidos",
+                        min(len(base_layers) - 1, max_depth), len(banned))
+    changed = set()  # Estados da camada guardada anterior cujo menor custo mudou
+    complete = True
+    
+    for depth in range(len(layers), max_depth + 1):
+        layer = layers[depth - 1]
+        if depth < len(base_layers):
+            next_layer, layer_parents, changed = _repair_layer(
+                engine, available_items, banned, layer, base_layers[depth], base_parents[depth - 1], changed)
+        else:
+            next_layer = {}
+            layer_parents = {}
+            for state, cost in layer.items():
+                for item, new_state in zip(available_items, engine.successors(state, available_items)):
+                    new_cost = cost + item_costs[item]
+                    current = next_layer.get(new_state)
+                    if current is None or new_cost < current:
+                        next_layer[new_state] = new_cost
+                        layer_parents[new_state] = state * num_items + item
+        layers.append(next_layer)
+        parents.append(layer_parents)
+        logger.debug("Profundidade %s/%s: %s estados", depth, total_depth, len(next_layer))
+        
+        if progress_callback:
+            progress = 10 + int(85 * depth / max(1, total_depth))
+            if not progress_callback(progress, f"Busca exata: profundidade {depth}/{total_depth}, {len(next_layer)} estados"):
+                return None
+        
+        if time_limit_seconds is not None and time.time() - start_time > time_limit_seconds:
+            logger.info("Limite de tempo (%ss) atingido na profundidade %s; retornando a melhor solução conhecida.",
+                        time_limit_seconds, depth)
+            complete = False
+            break
+    
+    if memory is not None and not base_layers:
+        if memory.frontier_key != frontier_key:
+            memory.last_steps = {}
+        if sum(len(layer) for layer in layers) <= SEARCH_MEMORY_MAX_STATES:
+            memory.frontier_key = frontier_key
+            memory.layers, memory.parents = layers, parents
+        else:
+            memory.frontier_key, memory.layers, memory.parents = None, [], []
+    
+    return layers, parents, complete
+
+def _repair_layer(engine, available_items, banned, layer, base_layer, base_parents, changed):
+    """
+    Recalcula uma camada guardada sobre mais itens depois que alguns deles foram banidos.
+    
+    Um estado cujo passo guardado não usa item banido nem parte de um estado cujo custo
+    mudou mantém custo e passo: o menor custo sobre mais itens já era alcançado por um
+    caminho permitido. Só os demais são recalculados, a partir da camada anterior.
+    
+    Args:
+        banned: Índices dos itens guardados que não são mais permitidos
+        layer: Camada anterior, já reparada
+        base_layer: Camada guardada a reparar
+        base_parents: Passos da camada guardada
+        changed: Estados da camada anterior guardada cujo custo mudou ou que deixaram de ser alcançáveis
+    
+    Returns:
+        Tupla contendo: (camada, passos, estados da camada cujo custo mudou ou que deixaram
+        de ser alcançáveis)
+    """
+    item_costs = engine.item_costs
+    num_items = len(engine.item_names)
+    next_layer = {}
+    layer_parents = {}
+    invalid = set()
+    for state, step in base_parents.items():
+        previous, item = divmod(step, num_items)
+        if item in banned or previous in changed:
+            invalid.add(state)
+        else:
+            next_layer[state] = base_layer[state]
+            layer_parents[state] = step
+    
+    repaired = {}  # estado -> (menor custo, passo) dos estados recalculados
+    if invalid:
+        for state, cost in layer.items():
+            for item, new_state in zip(available_items, engine.successors(state, available_items)):
+                if new_state in invalid:
+                    new_cost = cost + item_costs[item]
+                    current = repaired.get(new_state)
+                    if current is None or new_cost < current[0]:
+                        repaired[new_state] = (new_cost, state * num_items + item)
+    
+    for state, (cost, step) in repaired.items():
+        next_layer[state] = cost
+        layer_parents[state] = step
+        if cost == base_layer[state]:
+            invalid.discard(state)
+    return next_layer, layer_parents, invalid
+
+def _backtrack_path(parents, num_items, state, depth):
+    """Reconstrói a sequência de índices que alcança um estado de uma camada."""
+    path = []
+    for d in range(depth, 0, -1):
+        state, item = divmod(parents[d - 1][state], num_items)
+        path.append(item)
+    return path[::-1]
+
+def _solve_exact_indices(engine, available_items, initial_state, combo_size, base_value, memory,
+                         start_time, time_limit_seconds=None, progress_callback=None, top_k=0):
+    """
+    Programação dinâmica de solve_exact sobre índices e máscaras de bits.
+    
+    Com top_k, a última mistura oferece a um TopRecipes todos os itens de cada estado
+    que ainda pode superar a k-ésima melhor pontuação, em vez de só o melhor item.
+    
+    Returns:
+        Tupla contendo: (melhor receita como lista de índices, True se a otimalidade foi
+        provada, lista das top_k melhores receitas distintas), ou (None, False, []) se cancelado
+    """
+    item_costs = engine.item_costs
+    num_items = len(engine.item_names)
+    upper_bound = _make_units_bound(engine, available_items, combo_size)
+    
+    # Alternativas: receitas completas são tuplas de índices; as da última mistura ficam
+    # como estado anterior * num_items + item até a reconstrução do caminho
+    top = TopRecipes(top_k) if top_k > 0 else None
+    
+    # Solução inicial para a poda (pontuação = lucro em centésimos): receitas da busca
+    # anterior que continuam permitidas ou, se não houver, uma busca em feixe
+    survivors = memory.survivors(initial_state, available_items) if memory else []
+    if survivors:
+        candidates = [_resize_recipe(engine, recipe, combo_size, available_items, initial_state, base_value)
+                      for recipe in survivors]
+        if top is not None:
+            for recipe in candidates:
+                final_state = engine.apply_items(recipe, initial_state)
+                top.offer(base_value * (MULTIPLIER_SCALE + engine.multiplier_units(final_state))
+                          - MULTIPLIER_SCALE * engine.cost(recipe), final_state, recipe)
+        best_path = max(candidates, key=lambda recipe: base_value * engine.multiplier_units(
+            engine.apply_items(recipe, initial_state)) - MULTIPLIER_SCALE * engine.cost(recipe))
+        best_state = engine.apply_items(best_path, initial_state)
+        best_cost = engine.cost(best_path)
+        source = f"{len(survivors)} receitas da busca anterior"
+    else:
+        best_state, best_cost, best_path = _beam_search_indices(
+            engine, available_items, initial_state, combo_size, base_value, EXACT_INCUMBENT_BEAM_WIDTH, upper_bound,
+            top=top)
+        source = "busca em feixe"
+    best_score = base_value * (MULTIPLIER_SCALE + engine.multiplier_units(best_state)) - MULTIPLIER_SCALE * best_cost
+    best_final = None  # (estado anterior, último item) da melhor solução da busca exata
+    logger.info("Solução inicial (%s): Lucro = $%.2f", source, best_score / MULTIPLIER_SCALE)
+    
+    min_item_cost = min((item_costs[item] for item in available_items), default=0)
+    
+    frontier = _build_frontier(engine, available_items, initial_state, combo_size - 1, memory,
+                               start_time, time_limit_seconds, progress_callback, combo_size)
+    if frontier is None:
+        return None, False, []
+    layers, parents, proven = frontier
+    
+    if proven and combo_size > 0 and top is not None:
+        # Última mistura com alternativas: todos os itens de cada estado que ainda pode
+        # superar a k-ésima melhor pontuação
+        expanded = 0
+        pruned = 0
+        for state, cost in layers[combo_size - 1].items():
+            bound = base_value * (MULTIPLIER_SCALE + upper_bound(state, 1)) - MULTIPLIER_SCALE * (cost + min_item_cost)
+            threshold = top.threshold
+            if bound <= threshold:
+                pruned += 1
+                continue
+            expanded += 1
+            # Só percorre todos os itens se o melhor deles puder entrar nas alternativas
+            score, _ = engine.best_step(state, available_items, base_value)
+            if score - MULTIPLIER_SCALE * cost <= threshold:
+                continue
+            for item, new_state in zip(available_items, engine.successors(state, available_items)):
+                score = (base_value * (MULTIPLIER_SCALE + engine.multiplier_units(new_state))
+                         - MULTIPLIER_SCALE * (cost + item_costs[item]))
+                top.offer(score, new_state, state * num_items + item)
+        logger.debug("Profundidade %s/%s: %s expandidos, %s podados", combo_size, combo_size, expanded, pruned)
+        best_score, _, best_recipe = top.ranked()[0]
+        if isinstance(best_recipe, tuple):
+            best_path = best_recipe
+        else:
+            best_final = divmod(best_recipe, num_items)
+    elif proven and combo_size > 0:
+        # Última mistura: basta o melhor item de cada estado que ainda pode superar a melhor solução.
+        # O melhor item de cada estado fica na memória, sobre os itens das camadas guardadas; se
+        # alguns deles foram banidos, os guardados que continuam permitidos valem como estão e
+        # os demais ainda servem de limite superior
+        steps = None
+        exact_steps = False
+        if memory is not None and memory.frontier_key is not None and memory.frontier_key[0] == initial_state:
+            steps = memory.last_steps.setdefault((base_value, combo_size - 1), {})
+            exact_steps = memory.frontier_key[1] == frozenset(available_items)
+        allowed = set(available_items)
+        expanded = 0
+        pruned = 0
+        reused = 0
+        for state, cost in layers[combo_size - 1].items():
+            step = steps.get(state) if steps is not None else None
+            if step is not None:
+                score, item = step
+                score -= MULTIPLIER_SCALE * cost
+                if exact_steps or item in allowed:
+                    reused += 1
+                    if score > best_score:
+                        best_score = score
+                        best_final = (state, item)
+                    continue
+                if score <= best_score:
+                    pruned += 1
+                    continue
+            bound = base_value * (MULTIPLIER_SCALE + upper_bound(state, 1)) - MULTIPLIER_SCALE * (cost + min_item_cost)
+            if bound <= best_score:
+                pruned += 1
+                continue
+            expanded += 1
+            score, item = engine.best_step(state, available_items, base_value)
+            if exact_steps:
+                steps[state] = (score, item)
+            score -= MULTIPLIER_SCALE * cost
+            if score > best_score:
+                best_score = score
+                best_final = (state, item)
+        logger.debug("Profundidade %s/%s: %s expandidos, %s podados, %s da memória",
+                     combo_size, combo_size, expanded, pruned, reused)
+    
+    def backtrack(state, item):
+        return _backtrack_path(parents, num_items, state, combo_size - 1) + [item]
+    
+    # Reconstrói o caminho da melhor solução encontrada pela busca exata
+    if best_final is not None:
+        best_path = backtrack(*best_final)
+    
+    top_paths = []
+    if top is not None:
+        for _, _, recipe in top.ranked():
+            top_paths.append(list(recipe) if isinstance(recipe, tuple) else backtrack(*divmod(recipe, num_items)))
+    
+    return list(best_path), proven, top_paths
+
+def _make_target_heuristic(engine, available_items, required_mask, forbidden_mask):
+    """
+    Cria uma função que retorna limites inferiores (misturas, custo) para o que falta até
+    um estado ter todos os efeitos de required_mask e nenhum de forbidden_mask
+    (math.inf se algum efeito exigido for inalcançável).
+    
+    Um efeito só surge em uma mistura a partir de um efeito presente antes dela (pelas
+    regras do item usado) ou como efeito principal do item, que só se transforma a partir
+    da mistura seguinte. Então um efeito exigido ausente custa pelo menos o menor caminho
+    no grafo de regras (RuleGraph) a partir de um efeito presente, ou a partir do efeito de
+    algum item somado ao preço e à mistura desse item. Um efeito proibido presente precisa
+    de uma mistura. Os limites são o maior valor entre os efeitos e ficam em cache por estado.
+    """
+    graph = graph_for_items(available_items)
+    item_costs = engine.item_costs
+    
+    # Para cada efeito exigido: (bit, misturas e custo a partir de cada efeito, e a partir de um item novo)
+    targets = []
+    required = required_mask
+    while required:
+        bit = required & -required
+        required ^= bit
+        target = bit.bit_length() - 1
+        targets.append((bit, [row[target] for row in graph.steps], [row[target] for row in graph.costs],
+                        graph.steps_from_new_item(target), graph.cost_from_new_item(target)))
+    min_item_cost = min((item_costs[item] for item in available_items), default=0)
+    
+    cache = {}
+    
+    def remaining(state):
+        bounds = cache.get(state)
+        if bounds is not None:
+            return bounds
+        if state & forbidden_mask:
+            total_steps, total_cost = 1, min_item_cost
+        else:
+            total_steps, total_cost = 0, 0
+        present = []
+        rest = state
+        while rest:
+            low_bit = rest & -rest
+            present.append(low_bit.bit_length() - 1)
+            rest ^= low_bit
+        for bit, steps, costs, added_steps, added_cost in targets:
+            if state & bit:
+                continue
+            total_steps = max(total_steps, min([added_steps] + [steps[effect] for effect in present]))
+            total_cost = max(total_cost, min([added_cost] + [costs[effect] for effect in present]))
+        bounds = cache[state] = (total_steps, max(total_cost, total_steps * min_item_cost))
+        return bounds
+    
+    return remaining
+
+def find_target_recipe(
+    required_effects: List[str],
+    forbidden_effects: List[str] = None,
+    initial_effects: Dict[str, float] = None,
+    banned_items: List[str] = None,
+    objective: str = "cost",
+    max_steps: int = TARGET_MAX_STEPS,
+    base_value: float = 100,
+    time_limit_seconds: Optional[float] = None
+) -> Optional[Tuple[List[str], float, Dict[str, float], float, float]]:
+    """
+    Encontra a receita mais barata (objective="cost") ou mais curta (objective="length")
+    cujos efeitos finais incluem todos os required_effects e nenhum dos forbidden_effects.
+    
+    Busca A* sobre os conjuntos de efeitos, com as transições do motor de efeitos (regras
+    dos itens e limite de 8 efeitos). A prioridade é (custo, misturas) ou (misturas, custo)
+    somada a limites inferiores admissíveis para o que falta (ver _make_target_heuristic).
+    Um conjunto de efeitos só é expandido de
+    novo se for alcançado com menos misturas, por causa do limite max_steps. Efeitos
+    proibidos só valem para o resultado: podem surgir e ser transformados no meio da receita.
+    
+    Args:
+        required_effects: Efeitos que o resultado precisa ter
+        forbidden_effects: Efeitos que o resultado não pode ter
+        initial_effects: Dicionário de efeitos iniciais já presentes
+        banned_items: Lista de itens que não podem ser usados
+        objective: "cost" (menor custo, depois menos misturas) ou "length" (menos misturas,
+            depois menor custo)
+        max_steps: Maior número de itens da receita
+        base_value: Valor base usado no cálculo do lucro
+        time_limit_seconds: Limite de tempo opcional
+    
+    Returns:
+        Tupla contendo: (combinação, multiplicador, efeitos, custo, lucro), ou None se nenhuma
+        receita de até max_steps itens atinge o alvo (ou se o limite de tempo for atingido)
+    """
+    if objective not in ("cost", "length"):
+        raise ValueError(f"Objetivo desconhecido: {objective}")
+    engine = get_engine()
+    forbidden_effects = forbidden_effects or []
+    unknown = [name for name in list(required_effects) + list(forbidden_effects) if name not in engine.effect_bits]
+    if unknown:
+        raise ValueError(f"Efeitos desconhecidos: {', '.join(unknown)}")
+    
+    start_time = time.time()
+    required_mask = engine.encode_effects(required_effects)
+    forbidden_mask = engine.encode_effects(forbidden_effects)
+    if required_mask & forbidden_mask or required_mask.bit_count() > MAX_EFFECTS:
+        logger.info("Alvo impossível: efeitos exigidos e proibidos se contradizem ou excedem o limite de efeitos.")
+        return None
+    
+    banned_items = banned_items or []
+    available_items = engine.encode_items([item for item in items.keys() if item not in banned_items])
+    initial_state = engine.encode_effects(initial_effects)
+    item_costs = engine.item_costs
+    
+    remaining = _make_target_heuristic(engine, available_items, required_mask, forbidden_mask)
+    
+    def priority(state, cost, steps):
+        missing_steps, missing_cost = remaining(state)
+        if objective == "cost":
+            return cost + missing_cost, steps + missing_steps
+        return steps + missing_steps, cost + missing_cost
+    
+    # Cada entrada do heap aponta para um nó (estado, nó anterior, item) do caminho que a gerou
+    nodes = [(initial_state, None, None)]
+    heap = [(priority(initial_state, 0, 0), 0, 0, 0)]  # (prioridade, nó, custo, misturas)
+    labels = {initial_state: (0, 0)}  # estado -> (custo, misturas) do melhor caminho enfileirado
+    expanded_steps = {}  # estado -> menor número de misturas com que já foi expandido
+    found = None
+    while heap:
+        _, node, cost, steps = heapq.heappop(heap)
+        state = nodes[node][0]
+        if expanded_steps.get(state, max_steps + 1) <= steps:
+            continue
+        if state & required_mask == required_mask and not state & forbidden_mask:
+            found = node
+            break
+        expanded_steps[state] = steps
+        if steps >= max_steps:
+            continue
+        if (time_limit_seconds is not None and len(expanded_steps) % 1000 == 0
+                and time.time() - start_time > time_limit_seconds):
+            logger.info("Limite de tempo (%ss) atingido após %s estados expandidos.",
+                        time_limit_seconds, len(expanded_steps))
+            return None
+        for item, new_state in zip(available_items, engine.successors(state, available_items)):
+            new_cost = cost + item_costs[item]
+            # Um caminho mais caro e não mais curto que outro já enfileirado não leva a nada melhor
+            label = labels.get(new_state)
+            if label is not None and label[0] <= new_cost and label[1] <= steps + 1:
+                continue
+            if steps + 1 + remaining(new_state)[0] > max_steps:
+                continue
+            labels[new_state] = (new_cost, steps + 1)
+            nodes.append((new_state, node, item))
+            heapq.heappush(heap, (priority(new_state, new_cost, steps + 1), len(nodes) - 1, new_cost, steps + 1))
+    
+    if found is None:
+        logger.info("Nenhuma receita de até %s itens atinge o alvo (%s estados expandidos).",
+                    max_steps, len(expanded_steps))
+        return None
+    
+    path = []
+    _, node, item = nodes[found]
+    while node is not None:
+        path.append(item)
+        _, node, item = nodes[node]
+    path.reverse()
+    
+    result = _recipes_result(engine, [path], initial_state, base_value)[0]
+    logger.info("Receita para o alvo (%s): %s itens, Custo = $%.2f, %s estados expandidos em %.3f segundos",
+                objective, len(path), result[3], len(expanded_steps), time.time() - start_time)
+    return result
 
 def optimize(initial_effects=None, time_limit_seconds=30, combo_size=8, 
             max_perms_to_test=5000, banned_items=None, cost_weight=0.3, 
-            base_value=100, verbose=True, progress_callback=None):
+            base_value=100, verbose=True, progress_callback=None,
+            transition_cache_size=None, mode="auto", beam_width=None, num_islands=None,
+            use_result_cache=False, reuse_search_state=True, top_k=0, seed=None, search_stats=None,
+            early_stopping=True):
     """
     Executa o processo de otimização e exibe os resultados.
     
@@ -455,49 +2518,252 @@ def optimize(initial_effects=None, time_limit_seconds=30, combo_size=8,
         banned_items: Lista de itens que não podem ser usados
         cost_weight: Não mais utilizado, mantido para compatibilidade
         base_value: Valor base usado no cálculo do lucro
-        verbose: Se True, imprime mensagens detalhadas no console
+        verbose: Se True, registra o relatório final no log (nível INFO)
         progress_callback: Função de callback para reportar progresso (opcional)
+        transition_cache_size: Limite de estados do cache de transições (opcional)
+        mode: "exact" (solve_exact), "beam" (beam_search), "genetic" (find_best_combination),
+            "bnb" (algoritmo genético, por até BNB_GENETIC_TIME_FRACTION do prazo, seguido de
+            uma prova de otimalidade a partir do seu resultado: solve_exact até EXACT_MAX_COMBO_SIZE itens e branch_and_bound acima disso),
+            "pareto" (pareto_front: receitas de 1 a combo_size itens não dominadas em preço de
+            venda, custo e número de misturas, retornadas no lugar das alternativas),
+            "lengths" (solve_all_lengths: a melhor receita de cada tamanho de 1 a combo_size,
+            retornadas no lugar das alternativas) ou "auto", que usa a busca em feixe se beam_width for informado, o algoritmo genético
+            se num_islands for informado e, caso contrário, a busca exata até
+            EXACT_MAX_COMBO_SIZE itens e o algoritmo genético acima disso
+        beam_width: Largura da busca em feixe (opcional)
+        num_islands: Número de ilhas do algoritmo genético, cada uma em um processo;
+            0 usa uma ilha por núcleo (opcional)
+        use_result_cache: Se True, consulta o cache persistente de resultados (result_cache)
+            antes de buscar e guarda nele o resultado de buscas concluídas
+        reuse_search_state: Se True, a busca exata e o algoritmo genético reaproveitam o
+            estado da consulta anterior (ver SearchMemory)
+        top_k: Se maior que zero, também retorna as top_k melhores receitas distintas
+            (conjuntos finais de efeitos diferentes), incluindo a melhor
+        seed: Semente do algoritmo genético (modos "genetic" e "bnb"; ver find_best_combination).
+            Os demais modos são determinísticos e apenas a registram
+        search_stats: SearchStats (opcional) preenchido com as estatísticas da busca: sempre
+            a duração total e os parâmetros efetivos (modo, semente, ...), os contadores do
+            algoritmo genético e, com search_stats.timings, o tempo de cada fase
+        early_stopping: Se True, o algoritmo genético (modos "genetic" e "bnb") para antes
+            do limite de tempo quando estagna ou converge; time_limit_seconds continua sendo o
+            prazo máximo
     
     Returns:
-        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro)
+        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas);
+        alternativas lista, com top_k, receitas no mesmo formato, da melhor para a pior (nos
+        modos "pareto" e "lengths", a fronteira ou as receitas por tamanho), e fica vazia sem
+        top_k ou se a busca for cancelada
     """
+    start_time = time.perf_counter()
+    timings = search_stats is not None and search_stats.timings
+    # Sem SearchStats do chamador, um interno registra ao menos se a busca terminou (stop_reason)
+    if search_stats is None:
+        search_stats = SearchStats()
+    
+    if mode == "auto":
+        if beam_width is not None:
+            mode = "beam"
+        elif num_islands is not None:
+            mode = "genetic"
+        else:
+            mode = "exact" if combo_size <= EXACT_MAX_COMBO_SIZE else "genetic"
+    if mode not in ("exact", "beam", "genetic", "bnb", "pareto", "lengths"):
+        raise ValueError(f"Modo de otimização desconhecido: {mode}")
+    if num_islands == 0:
+        num_islands = os.cpu_count() or 1
+    
     if initial_effects:
-        print(f"Iniciando otimização com os efeitos iniciais: {initial_effects}")
+        logger.info("Iniciando otimização com os efeitos iniciais: %s", initial_effects)
     else:
-        print("Iniciando otimização sem efeitos iniciais...")
+        logger.info("Iniciando otimização sem efeitos iniciais...")
     
     if banned_items:
-        print(f"Itens banidos: {banned_items}")
+        logger.info("Itens banidos: %s", banned_items)
     else:
-        print("Nenhum item está banido.")
-    
-    print(f"Limite de tempo: {time_limit_seconds} segundos")
-    print(f"Tamanho da combinação: {combo_size} itens")
-    print(f"Máximo de permutações a testar: {max_perms_to_test}")
-    print(f"Valor base para cálculo do lucro: ${base_value:.2f}")
-    
-    best_combination, best_multiplier, best_effects, best_cost, best_profit = find_best_combination(
-        initial_effects=initial_effects,
-        time_limit_seconds=time_limit_seconds,
-        combo_size=combo_size,
-        max_perms_to_test=max_perms_to_test,
-        banned_items=banned_items,
-        base_value=base_value,
-        progress_callback=progress_callback
-    )
-    
-    if verbose:
-        print("\n===== RESULTADO FINAL =====")
-        print(f"Melhor multiplicador: {best_multiplier:.2f}")
-        print(f"Custo total: ${best_cost:.2f}")
-        print(f"Lucro estimado: ${best_profit:.2f} (Base ${base_value:.2f} * Multiplicador {best_multiplier:.2f} - Custo ${best_cost:.2f})")
+        logger.info("Nenhum item está banido.")
+    
+    logger.info("Limite de tempo: %s segundos", time_limit_seconds)
+    logger.info("Tamanho da combinação: %s itens", combo_size)
+    logger.info("Máximo de permutações a testar: %s", max_perms_to_test)
+    logger.info("Valor base para cálculo do lucro: $%.2f", base_value)
+    logger.info("Modo de busca: %s", mode)
+    
+    # Parâmetros efetivos; o algoritmo genético completa com os seus
+    search_stats.hyperparameters.update(mode=mode, seed=seed)
+    if mode == "beam":
+        search_stats.hyperparameters["beam_width"] = beam_width or DEFAULT_BEAM_WIDTH
+    
+    if timings:
+        phase_mark = time.perf_counter()
+    cached_result = None
+    if use_result_cache:
+        cache_mode = f"beam:{beam_width or DEFAULT_BEAM_WIDTH}" if mode == "beam" else mode
+        if seed is not None and mode in ("genetic", "bnb"):
+            cache_mode += f":seed={seed}"  # O resultado de uma execução com semente depende dela
+            if not early_stopping:
+                cache_mode += ":no-early-stop"
+        cache_key = make_query_key(initial_effects, banned_items, combo_size, base_value, cache_mode)
+        cached_result = get_result_cache().get(cache_key)
+        if cached_result is not None and mode not in ("pareto", "lengths"):
+            if len(cached_result[5]) < top_k:
+                # O resultado guardado tem menos alternativas do que o pedido
+                cached_result = None
+            else:
+                cached_result = cached_result[:5] + (cached_result[5][:top_k],)
+        if cached_result is not None:
+            logger.info("Resultado encontrado no cache de resultados.")
+            if progress_callback:
+                progress_callback(100, "Result loaded from cache")
+        if timings:
+            phase_mark = _add_phase_time(search_stats.phase_seconds, "cache_lookup", phase_mark)
+    
+    if cached_result is not None:
+        result = cached_result
+    elif mode == "exact":
+        result = solve_exact(
+            initial_effects=initial_effects,
+            combo_size=combo_size,
+            banned_items=banned_items,
+            base_value=base_value,
+            time_limit_seconds=time_limit_seconds,
+            progress_callback=progress_callback,
+            reuse_search_state=reuse_search_state,
+            top_k=top_k,
+            search_stats=search_stats
+        )
+    elif mode in ("pareto", "lengths"):
+        search = pareto_front if mode == "pareto" else solve_all_lengths
+        recipes = search(
+            initial_effects=initial_effects,
+            combo_size=combo_size,
+            banned_items=banned_items,
+            base_value=base_value,
+            time_limit_seconds=time_limit_seconds,
+            progress_callback=progress_callback,
+            reuse_search_state=reuse_search_state,
+            search_stats=search_stats
+        )
+        if recipes:
+            # Receita principal: a de maior lucro da lista (a mais curta e barata em caso de empate)
+            best = max(recipes, key=lambda recipe: (recipe[4], -len(recipe[0]), -recipe[3]))
+            result = tuple(best) + (recipes,)
+        else:
+            result = [], 0.0, {}, 0.0, 0.0, []
+    elif mode == "beam":
+        result = beam_search(
+            initial_effects=initial_effects,
+            combo_size=combo_size,
+            banned_items=banned_items,
+            base_value=base_value,
+            beam_width=beam_width or DEFAULT_BEAM_WIDTH,
+            progress_callback=progress_callback,
+            top_k=top_k
+        )
+    else:
+        result = find_best_combination(
+            initial_effects=initial_effects,
+            # No modo "bnb", o GA só fornece a solução inicial; a prova precisa de tempo garantido
+            time_limit_seconds=time_limit_seconds * BNB_GENETIC_TIME_FRACTION if mode == "bnb" else time_limit_seconds,
+            combo_size=combo_size,
+            max_perms_to_test=max_perms_to_test,
+            banned_items=banned_items,
+            base_value=base_value,
+            progress_callback=progress_callback,
+            transition_cache_size=transition_cache_size,
+            num_islands=num_islands or 1,
+            reuse_search_state=reuse_search_state,
+            top_k=top_k,
+            search_stats=search_stats,
+            seed=seed,
+            early_stopping=early_stopping
+        )
+        if mode == "bnb" and result[0]:
+            # Prova a otimalidade a partir do resultado do algoritmo genético. O prazo é o da
+            # consulta inteira: a prova usa o tempo que o GA deixou, ao menos o que ele não recebeu
+            genetic_result = result
+            if timings:
+                phase_mark = time.perf_counter()
+            proof_seconds = max(0.0, time_limit_seconds - (time.perf_counter() - start_time))
+            if combo_size <= EXACT_MAX_COMBO_SIZE:
+                # Até esse tamanho a programação dinâmica prova mais rápido que a busca em
+                # profundidade; o resultado do GA chega a ela pela memória da busca
+                search_stats.hyperparameters["proof"] = "exact"
+                result = solve_exact(
+                    initial_effects=initial_effects,
+                    combo_size=combo_size,
+                    banned_items=banned_items,
+                    base_value=base_value,
+                    time_limit_seconds=proof_seconds,
+                    progress_callback=progress_callback,
+                    reuse_search_state=reuse_search_state,
+                    search_stats=search_stats
+                )
+            else:
+                search_stats.hyperparameters["proof"] = "branch_and_bound"
+                result = branch_and_bound(
+                    initial_effects=initial_effects,
+                    combo_size=combo_size,
+                    banned_items=banned_items,
+                    base_value=base_value,
+                    incumbent=result[0],
+                    time_limit_seconds=proof_seconds,
+                    progress_callback=progress_callback,
+                    search_stats=search_stats
+                )
+            if timings:
+                _add_phase_time(search_stats.phase_seconds, "search", phase_mark)
+            if top_k > 0 and result[0]:
+                # As alternativas vêm do algoritmo genético, com a solução do branch and bound no lugar
+                # da receita de mesmos efeitos finais
+                alternatives = [result[:5]] + [alternative for alternative in genetic_result[5]
+                                               if alternative[2] != result[2]]
+                result = result[:5] + (alternatives[:top_k],)
+    if timings and cached_result is None and mode not in ("genetic", "bnb"):
+        _add_phase_time(search_stats.phase_seconds, "search", phase_mark)
+    best_combination, best_multiplier, best_effects, best_cost, best_profit, _ = result
+    
+    # Buscas canceladas retornam uma combinação vazia e não são guardadas. Buscas exatas
+    # (exact, bnb, pareto, lengths) interrompidas pelo limite de tempo também não: o cache
+    # passaria a responder sem garantia de otimalidade. Os modos heurísticos sempre guardam
+    finished = mode in ("genetic", "beam") or search_stats.stop_reason != "time_limit"
+    if use_result_cache and cached_result is None and best_combination and finished:
+        if timings:
+            phase_mark = time.perf_counter()
+        get_result_cache().put(cache_key, result)
+        if timings:
+            _add_phase_time(search_stats.phase_seconds, "cache_store", phase_mark)
+    
+    # O relatório só é montado se alguém for recebê-lo
+    if verbose and logger.isEnabledFor(logging.INFO):
+        lines = ["===== RESULTADO FINAL ====="]
+        lines.append(f"Melhor multiplicador: {best_multiplier:.2f}")
+        lines.append(f"Custo total: ${best_cost:.2f}")
+        lines.append(f"Lucro estimado: ${best_profit:.2f} (Base ${base_value:.2f} * Multiplicador {best_multiplier:.2f} - Custo ${best_cost:.2f})")
         
-        print("\nMelhor combinação (na ordem):")
+        lines.append("\nMelhor combinação (na ordem):")
         for i, item in enumerate(best_combination, 1):
-            print(f"{i}. {item} (${item_prices[item]})")
+            lines.append(f"{i}. {item} (${item_prices[item]})")
         
-        print("\nEfeitos finais ativos:")
+        lines.append("\nEfeitos finais ativos:")
         for effect, value in sorted(best_effects.items(), key=lambda x: x[1], reverse=True):
-            print(f"- {effect}: +{value:.2f}")
+            lines.append(f"- {effect}: +{value:.2f}")
+        
+        if mode == "lengths":
+            lines.append("\nMelhor receita de cada tamanho:")
+            for combination, multiplier, _, cost, profit in result[5]:
+                lines.append(f"- {len(combination)} itens: Lucro ${profit:.2f}, Multiplicador {multiplier:.2f}, "
+                             f"Custo ${cost:.2f}: {', '.join(combination)}")
+        elif mode == "pareto":
+            lines.append("\nFronteira de Pareto (itens, preço de venda, custo):")
+            for combination, multiplier, _, cost, profit in result[5]:
+                lines.append(f"- {len(combination)} itens, ${base_value * multiplier:.2f}, ${cost:.2f} "
+                             f"(lucro ${profit:.2f}): {', '.join(combination)}")
+        elif top_k > 0:
+            lines.append("\nReceitas alternativas:")
+            for i, (combination, multiplier, _, cost, profit) in enumerate(result[5], 1):
+                lines.append(f"{i}. Lucro ${profit:.2f}, Multiplicador {multiplier:.2f}, Custo ${cost:.2f}: "
+                             f"{', '.join(combination)}")
+        logger.info("%s", "\n".join(lines), extra={"event": "result", "profit": best_profit})
     
-    return best_combination, best_multiplier, best_effects, best_cost, best_profit
\ No newline at end of file
+    search_stats.total_seconds = time.perf_counter() - start_time
+    return result
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Estatísticas e instrumentação das buscas.
+Um SearchStats passado para optimize ou find_best_combination recebe os contadores da
+execução (gerações, avaliações, acertos de cache), a linha do tempo das melhorias e os
+parâmetros efetivos. Com timings=True, também recebe o tempo gasto em cada fase da
+busca (PHASES).
+
+Sem SearchStats nada é medido. Com timings=False, só são guardados os contadores, que
+a busca já mantém de qualquer forma.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fases medidas, na ordem de execução. As do algoritmo genético vêm de find_best_combination.
+# "search" é a duração das buscas sem fases (exata, feixe, branch and bound...), e as
+# fases de cache vêm de optimize
+PHASES = (
+    "cache_lookup", "initialization", "selection", "crossover", "mutation",
+    "evaluation", "diversity", "refinement", "search", "cache_store",
+)
+
+class SearchStats:
+    """
+    Estatísticas estruturadas de uma execução do otimizador.
+
+    - phase_seconds: segundos gastos em cada fase de PHASES (só com timings=True)
+    - generations, evaluations: gerações concluídas e receitas avaliadas pelo algoritmo genético
+    - cache_hits: avaliações evitadas pela memória de avaliações (receitas repetidas)
+    - transition_cache_hits, transition_cache_misses: consultas ao cache de transições
+    - ga_seconds: duração da fase evolutiva; total_seconds: duração de optimize
+    - improvements: (segundos desde o início, lucro) de cada novo melhor resultado
+    - hyperparameters: parâmetros efetivos da execução (modo, semente, população...)
+    - nodes_expanded, nodes_pruned, nodes_dominated: nós do branch_and_bound expandidos,
+      podados pelo limite superior e descartados por um caminho mais barato ao mesmo estado
+    - stop_reason: por que a busca terminou; no algoritmo genético, "converged", "stagnated",
+      "time_limit" ou "max_generations", e nas buscas exatas (solve_exact, branch_and_bound,
+      pareto_front, solve_all_lengths), "complete" ou "time_limit"; None na busca em feixe
+    """
+
+    def __init__(self, timings: bool = False):
+        self.timings = timings
+        self.phase_seconds: Dict[str, float] = {}
+        self.generations = 0
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.transition_cache_hits = 0
+        self.transition_cache_misses = 0
+        self.nodes_expanded = 0
+        self.nodes_pruned = 0
+        self.nodes_dominated = 0
+        self.ga_seconds = 0.0
+        self.total_seconds = 0.0
+        self.improvements: List[Tuple[float, float]] = []
+        self.hyperparameters: Dict[str, Any] = {}
+        self.stop_reason: Optional[str] = None
+
+    @property
+    def evaluations_per_second(self) -> float:
+        """Avaliações por segundo da fase evolutiva."""
+        return self.evaluations / self.ga_seconds if self.ga_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retorna as estatísticas como dicionário serializável em JSON."""
+        return {
+            "phase_seconds": {phase: round(self.phase_seconds[phase], 6)
+                              for phase in PHASES if phase in self.phase_seconds},
+            "generations": self.generations,
+            "evaluations": self.evaluations,
+            "evaluations_per_second": round(self.evaluations_per_second),
+            "cache_hits": self.cache_hits,
+            "transition_cache_hits": self.transition_cache_hits,
+            "transition_cache_misses": self.transition_cache_misses,
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_pruned": self.nodes_pruned,
+            "nodes_dominated": self.nodes_dominated,
+            "ga_seconds": round(self.ga_seconds, 6),
+            "stop_reason": self.stop_reason,
+            "total_seconds": round(self.total_seconds, 6),
+            "improvements": [[round(seconds, 6), round(profit, 2)] for seconds, profit in self.improvements],
+            "hyperparameters": self.hyperparameters,
+        }
+
+    def format_lines(self) -> List[str]:
+        """Linhas de texto para exibição (painel de diagnóstico da interface)."""
+        lines = [f"Total time: {self.total_seconds:.3f}s"]
+        measured = sum(self.phase_seconds.values())
+        for phase in PHASES:
+            if phase in self.phase_seconds:
+                seconds = self.phase_seconds[phase]
+                share = seconds / measured if measured > 0 else 0.0
+                lines.append(f"{phase}: {seconds:.3f}s ({share:.0%})")
+        if self.generations or self.evaluations:
+            lines.append(f"Generations: {self.generations:,}")
+            lines.append(f"Evaluations: {self.evaluations:,} ({self.evaluations_per_second:,.0f}/s)")
+            lines.append(f"Fitness cache hits: {self.cache_hits:,}")
+        if self.transition_cache_hits or self.transition_cache_misses:
+            lines.append(f"Transition cache: {self.transition_cache_hits:,} hits, "
+                         f"{self.transition_cache_misses:,} misses")
+        if self.nodes_expanded:
+            lines.append(f"Branch-and-bound nodes: {self.nodes_expanded:,} expanded, "
+                         f"{self.nodes_pruned:,} pruned, {self.nodes_dominated:,} dominated")
+        if self.stop_reason:
+            lines.append(f"Stop reason: {self.stop_reason}")
+        if self.improvements:
+            lines.append(f"Improvements: {len(self.improvements)}, last at {self.improvements[-1][0]:.2f}s")
+        for name, value in self.hyperparameters.items():
+            lines.append(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+        return lines
@@ -3,6 +3,9 @@ Módulo de definição das matérias-primas disponíveis no jogo.
 Contém informações sobre as matérias-primas, seus efeitos base e valores.
 """
 
+# Importações dos módulos locais
+from effects import effect_multipliers
+
 # Definição das matérias-primas e suas propriedades
 RAW_MATERIALS = {
     "OG Kush": {
@@ -57,4 +60,11 @@ def get_raw_material_img_path(raw_material_name):
     """Retorna o caminho da imagem de uma matéria-prima específica."""
     if raw_material_name in RAW_MATERIALS:
         return RAW_MATERIALS[raw_material_name].get("img_path", "")
-    return ""
\ No newline at end of file
+    return ""
+
+def get_raw_material_initial_effects(raw_material_name):
+    """Retorna o dicionário de efeitos iniciais de uma matéria-prima ({} para o efeito "None")."""
+    effect = get_raw_material_effect(raw_material_name)
+    if not effect or effect == "None":
+        return {}
+    return {effect: effect_multipliers[effect]}
@@ -0,0 +1,130 @@
+"""
+Índice pré-calculado das melhores receitas.
+Guarda as INDEX_TOP_K melhores receitas distintas (busca exata, sem itens banidos)
+de cada matéria-prima para cada tamanho de combinação de 1 a INDEX_MAX_COMBO_SIZE
+em recipe_index.json,
+distribuído junto com a pasta images/ e carregado apenas na primeira consulta.
+
+Para gerar o índice novamente (após alterar items.py, effects.py ou raw_materials.py):
+    python recipe_index.py
+"""
+
+import hashlib
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Importações dos módulos locais
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+from result_cache import tables_fingerprint
+from utils import configure_logging, get_logger, resource_path
+
+INDEX_FILE = "recipe_index.json"  # Caminho do índice, relativo à pasta do aplicativo
+INDEX_MAX_COMBO_SIZE = 8  # Maior tamanho de combinação do índice (o mesmo da interface)
+INDEX_TOP_K = 10  # Número de receitas distintas guardadas por matéria-prima e tamanho
+INDEX_VERSION = 2  # Versão do formato do arquivo (2: lista de receitas por tamanho)
+
+logger = get_logger("recipe_index")
+
+def index_fingerprint() -> str:
+    """Hash das tabelas de itens, efeitos e preços e das matérias-primas usadas no índice."""
+    materials = {name: [info["effect"], info["value"]] for name, info in RAW_MATERIALS.items()}
+    data = f"{INDEX_VERSION}:{INDEX_TOP_K}:" + tables_fingerprint() + json.dumps(materials, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def build_index(path: str = INDEX_FILE, max_combo_size: int = INDEX_MAX_COMBO_SIZE) -> Dict[str, Dict[str, List[List[str]]]]:
+    """
+    Resolve todos os pares (matéria-prima, tamanho) sem itens banidos e grava o índice.
+    
+    Args:
+        path: Arquivo de saída
+        max_combo_size: Maior tamanho de combinação a resolver
+    
+    Returns:
+        Dicionário {matéria-prima: {tamanho: combinações, da melhor para a pior}}
+    """
+    # Importação local: o otimizador só é necessário para gerar o índice
+    from optimizer import solve_exact
+    
+    recipes = {}
+    for name, info in RAW_MATERIALS.items():
+        recipes[name] = {}
+        for combo_size in range(1, max_combo_size + 1):
+            start_time = time.time()
+            combination, _, _, _, profit, alternatives = solve_exact(
+                initial_effects=get_raw_material_initial_effects(name),
+                combo_size=combo_size,
+                base_value=info["value"],
+                top_k=INDEX_TOP_K
+            )
+            recipes[name][str(combo_size)] = [combination] + [
+                alternative[0] for alternative in alternatives if alternative[0] != combination]
+            logger.info("%s, %s itens: Lucro = $%.2f (%.1fs)", name, combo_size, profit, time.time() - start_time)
+    
+    with open(path, "w", encoding="utf-8") as index_file:
+        json.dump({"fingerprint": index_fingerprint(), "recipes": recipes}, index_file,
+                  separators=(",", ":"), sort_keys=True)
+    return recipes
+
+_index = None
+
+def load_index() -> Dict[str, Dict[str, List[List[str]]]]:
+    """
+    Carrega o índice na primeira chamada.
+    Retorna um dicionário vazio se o arquivo não existir ou tiver sido gerado
+    para outras tabelas de itens, efeitos ou matérias-primas.
+    """
+    global _index
+    if _index is None:
+        _index = {}
+        try:
+            with open(resource_path(INDEX_FILE), encoding="utf-8") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError) as e:
+            logger.warning("Aviso: índice de receitas indisponível (%s).", e)
+            return _index
+        if data.get("fingerprint") == index_fingerprint():
+            _index = data.get("recipes", {})
+        else:
+            logger.warning("Aviso: o índice de receitas está desatualizado; execute 'python recipe_index.py'.")
+    return _index
+
+def lookup(raw_material_name: str, combo_size: int,
+           top_k: int = 0) -> Optional[Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]]:
+    """
+    Retorna a receita indexada de uma matéria-prima e tamanho, ou None.
+    
+    Args:
+        raw_material_name: Nome da matéria-prima
+        combo_size: Tamanho da combinação
+        top_k: Se maior que zero, também retorna até top_k receitas distintas (no máximo INDEX_TOP_K)
+    
+    Returns:
+        Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas);
+        alternativas lista, com top_k, receitas no mesmo formato, da melhor para a pior, e
+        fica vazia sem top_k
+    """
+    combinations = load_index().get(raw_material_name, {}).get(str(combo_size))
+    if not combinations:
+        return None
+    
+    # Importação local: só o motor de efeitos é necessário para completar o resultado
+    from effect_engine import get_engine
+    from effects import calculate_total_multiplier
+    engine = get_engine()
+    initial_effects = get_raw_material_initial_effects(raw_material_name)
+    base_value = RAW_MATERIALS[raw_material_name]["value"]
+    
+    results = []
+    for combination in combinations[:max(1, top_k)]:
+        _, effects, cost = engine.evaluate(combination, initial_effects)
+        multiplier = calculate_total_multiplier(effects)
+        results.append((list(combination), multiplier, effects, cost, base_value * multiplier - cost))
+    return results[0] + (results if top_k > 0 else [],)
+
+if __name__ == "__main__":
+    configure_logging(logging.WARNING)
+    logger.setLevel(logging.INFO)  # Só o progresso do índice, sem o log das buscas
+    build_index(sys.argv[1] if len(sys.argv) > 1 else INDEX_FILE)
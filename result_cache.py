@@ -0,0 +1,151 @@
+"""
+Cache persistente de resultados de otimização em SQLite.
+Guarda a melhor receita (e as alternativas, se pedidas) de cada consulta normalizada (efeitos iniciais, itens
+banidos, tamanho da combinação, valor base e modo de busca) junto com uma
+impressão digital das tabelas de itens, efeitos e preços: quando items.py ou
+effects.py mudam, as entradas antigas deixam de valer e são descartadas.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Importações dos módulos locais
+from effects import effect_multipliers
+from items import items, item_prices
+from utils import get_logger
+
+CACHE_PATH_ENV = "MIXINGCALCULATOR_CACHE"  # Variável de ambiente que substitui o caminho padrão do cache
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".mixingcalculator", "results.sqlite3")
+
+logger = get_logger("result_cache")
+
+def tables_fingerprint() -> str:
+    """Retorna um hash SHA-256 das tabelas de itens, efeitos e preços."""
+    tables = {"items": items, "effects": effect_multipliers, "prices": item_prices}
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode("utf-8")).hexdigest()
+
+def make_query_key(initial_effects: Dict[str, float] = None, banned_items: List[str] = None,
+                   combo_size: int = 8, base_value: float = 100, mode: str = "exact") -> str:
+    """
+    Normaliza uma consulta em uma chave de texto.
+    A ordem dos efeitos iniciais e dos itens banidos não altera a chave.
+    """
+    query = {
+        "initial_effects": sorted((initial_effects or {}).items()),
+        "banned_items": sorted(set(banned_items or [])),
+        "combo_size": int(combo_size),
+        "base_value": float(base_value),
+        "mode": mode,
+    }
+    return json.dumps(query, sort_keys=True)
+
+class ResultCache:
+    """
+    Cache de resultados em um arquivo SQLite.
+
+    Cada operação abre e fecha sua própria conexão, então o cache pode ser usado
+    a partir da thread de cálculo da interface e de vários processos.
+    Erros de banco de dados são reportados e tratados como ausência no cache.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get(CACHE_PATH_ENV) or DEFAULT_CACHE_PATH
+        self.fingerprint = tables_fingerprint()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre o banco, criando a tabela e descartando entradas de tabelas antigas na primeira vez."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " query TEXT NOT NULL,"
+                    " fingerprint TEXT NOT NULL,"
+                    " result TEXT NOT NULL,"
+                    " created REAL NOT NULL,"
+                    " PRIMARY KEY (query, fingerprint))"
+                )
+                connection.execute("DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,))
+            self._ready = True
+        return connection
+
+    def get(self, query: str) -> Optional[Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]]:
+        """
+        Retorna o resultado guardado para uma consulta (ver make_query_key), ou None.
+
+        Returns:
+            Tupla contendo: (melhor combinação, multiplicador, efeitos, custo, lucro, alternativas),
+            com a lista de alternativas vazia se o resultado foi guardado sem elas
+        """
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT result FROM results WHERE query = ? AND fingerprint = ?",
+                    (query, self.fingerprint)
+                ).fetchone()
+            finally:
+                connection.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Aviso: não foi possível ler o cache de resultados (%s).", e)
+            return None
+        if row is None:
+            return None
+        stored = json.loads(row[0])
+        alternatives = [tuple(alternative) for alternative in stored.get("alternatives", [])]
+        return (stored["combination"], stored["multiplier"], stored["effects"], stored["cost"], stored["profit"],
+                alternatives)
+
+    def put(self, query: str, result: Tuple[List[str], float, Dict[str, float], float, float, List[tuple]]):
+        """Guarda o resultado de uma consulta (com as alternativas), substituindo o anterior."""
+        combination, multiplier, effects, cost, profit, alternatives = result
+        stored = {
+            "combination": list(combination),
+            "multiplier": multiplier,
+            "effects": effects,
+            "cost": cost,
+            "profit": profit,
+            "alternatives": [list(alternative) for alternative in alternatives],
+        }
+        stored = json.dumps(stored)
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO results (query, fingerprint, result, created) VALUES (?, ?, ?, ?)",
+                        (query, self.fingerprint, stored, time.time())
+                    )
+            finally:
+                connection.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Aviso: não foi possível gravar no cache de resultados (%s).", e)
+
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute("DELETE FROM results")
+            finally:
+                connection.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Aviso: não foi possível limpar o cache de resultados (%s).", e)
+
+_default_cache = None
+
+def get_result_cache() -> ResultCache:
+    """Retorna o cache de resultados no caminho padrão (criado uma única vez)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
@@ -0,0 +1,223 @@
+"""
+Grafo compilado das regras de transformação dos itens.
+As regras de items.py formam um grafo dirigido entre efeitos, com arestas
+rotuladas pelos itens que as aplicam. O grafo é compilado uma única vez por
+conjunto de itens permitidos, junto com o menor número de misturas e o menor
+custo para ir de cada efeito a cada outro.
+
+As distâncias ignoram as interações entre efeitos e o limite de 8 efeitos, então
+são limites inferiores: o otimizador as usa para podar buscas, e how_to_reach
+confirma as rotas sugeridas simulando a receita no motor de efeitos.
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Importações dos módulos locais
+from effect_engine import EffectEngine, get_engine
+from items import items
+
+RULE_GRAPH_CACHE_SIZE = 64  # Número de grafos (conjuntos de itens permitidos) mantidos em cache
+
+class RuleGraph:
+    """
+    Grafo de regras sobre índices de efeitos (posições dos bits do EffectEngine).
+
+    - edges[antigo][novo]: (menor preço, itens que aplicam a regra, do mais barato ao mais caro)
+    - steps[origem][destino]: menor número de misturas (math.inf se inalcançável)
+    - costs[origem][destino]: menor soma de preços dos itens no caminho
+
+    Cada regra leva uma mistura. Um efeito adicionado por um item só se transforma a
+    partir da mistura seguinte, o que os métodos *_from_new_item levam em conta.
+    """
+
+    def __init__(self, engine: EffectEngine, available_items: Sequence[int]):
+        self.engine = engine
+        self.available_items = tuple(available_items)
+        self.num_effects = len(engine.effect_names)
+
+        self.edges: List[Dict[int, Tuple[float, Tuple[int, ...]]]] = [{} for _ in range(self.num_effects)]
+        rule_items: List[Dict[int, List[int]]] = [{} for _ in range(self.num_effects)]
+        for item in self.available_items:
+            for old_bit, new_bit in engine.item_rules[item]:
+                rule_items[old_bit.bit_length() - 1].setdefault(new_bit.bit_length() - 1, []).append(item)
+        for old, targets in enumerate(rule_items):
+            for new, rule_item_list in targets.items():
+                rule_item_list.sort(key=lambda item: engine.item_costs[item])
+                self.edges[old][new] = (engine.item_costs[rule_item_list[0]], tuple(rule_item_list))
+
+        self.item_effects = sorted({engine.item_effect_bits[item].bit_length() - 1 for item in self.available_items})
+
+        # Caminhos mínimos a partir de cada efeito, com o passo anterior para reconstruir rotas
+        self.steps: List[List[float]] = []
+        self.costs: List[List[float]] = []
+        self._step_parents: List[List[Optional[Tuple[int, int]]]] = []
+        self._cost_parents: List[List[Optional[Tuple[int, int]]]] = []
+        for source in range(self.num_effects):
+            steps, step_parents = self._shortest_paths(source, use_cost=False)
+            costs, cost_parents = self._shortest_paths(source, use_cost=True)
+            self.steps.append(steps)
+            self.costs.append(costs)
+            self._step_parents.append(step_parents)
+            self._cost_parents.append(cost_parents)
+
+        self._within_masks: Dict[int, List[int]] = {}
+
+    def _shortest_paths(self, source: int, use_cost: bool):
+        """Dijkstra a partir de um efeito; o peso é o preço do item mais barato ou uma mistura."""
+        distances = [math.inf] * self.num_effects
+        parents: List[Optional[Tuple[int, int]]] = [None] * self.num_effects
+        distances[source] = 0
+        heap = [(0, source)]
+        while heap:
+            distance, effect = heapq.heappop(heap)
+            if distance > distances[effect]:
+                continue
+            for new, (price, rule_items) in self.edges[effect].items():
+                candidate = distance + (price if use_cost else 1)
+                if candidate < distances[new]:
+                    distances[new] = candidate
+                    parents[new] = (effect, rule_items[0])
+                    heapq.heappush(heap, (candidate, new))
+        return distances, parents
+
+    def within_masks(self, max_mixes: int) -> List[int]:
+        """Máscara de bits, por efeito, dos efeitos alcançáveis em até max_mixes misturas."""
+        masks = self._within_masks.get(max_mixes)
+        if masks is None:
+            masks = [sum(1 << target for target, steps in enumerate(row) if steps <= max_mixes)
+                     for row in self.steps]
+            self._within_masks[max_mixes] = masks
+        return masks
+
+    def max_units_within(self, max_mixes: int) -> List[int]:
+        """Maior multiplicador (em centésimos), por efeito, alcançável em até max_mixes misturas."""
+        units = self.engine.effect_units
+        return [max(units[target] for target, steps in enumerate(row) if steps <= max_mixes)
+                for row in self.steps]
+
+    def steps_from_new_item(self, target: int) -> float:
+        """Menor número de misturas até target começando pela adição do efeito de um item."""
+        return min((1 + self.steps[effect][target] for effect in self.item_effects), default=math.inf)
+
+    def cost_from_new_item(self, target: int) -> float:
+        """Menor custo até target começando pela adição do efeito de um item (incluindo seu preço)."""
+        engine = self.engine
+        return min((engine.item_costs[item] + self.costs[engine.item_effect_bits[item].bit_length() - 1][target]
+                    for item in self.available_items), default=math.inf)
+
+    def route_indices(self, source: int, target: int, objective: str = "cost") -> Optional[List[int]]:
+        """Itens (índices) do caminho mínimo de source a target no grafo, ou None."""
+        parents = self._cost_parents[source] if objective == "cost" else self._step_parents[source]
+        if self.steps[source][target] == math.inf:
+            return None
+        path = []
+        effect = target
+        while effect != source:
+            effect, item = parents[effect]
+            path.append(item)
+        path.reverse()
+        return path
+
+    def _effect_index(self, name: str) -> int:
+        bit = self.engine.effect_bits.get(name)
+        if bit is None:
+            raise ValueError(f"Efeito desconhecido: {name}")
+        return bit.bit_length() - 1
+
+    def reachable(self, effect: str, max_mixes: Optional[int] = None) -> Dict[str, Tuple[int, float]]:
+        """
+        Efeitos alcançáveis a partir de um efeito pelas regras.
+
+        Args:
+            effect: Nome do efeito de origem
+            max_mixes: Número máximo de misturas (None = sem limite)
+
+        Returns:
+            Dicionário {efeito: (menor número de misturas, menor custo)}
+        """
+        source = self._effect_index(effect)
+        names = self.engine.effect_names
+        return {
+            names[target]: (steps, self.costs[source][target])
+            for target, steps in enumerate(self.steps[source])
+            if steps != math.inf and (max_mixes is None or steps <= max_mixes)
+        }
+
+    def route(self, from_effect: str, to_effect: str, objective: str = "cost") -> Optional[List[str]]:
+        """
+        Itens do caminho mínimo de um efeito a outro no grafo de regras, sem simular a receita.
+
+        Args:
+            from_effect: Efeito de origem
+            to_effect: Efeito de destino
+            objective: "cost" (menor custo) ou "length" (menos misturas)
+
+        Returns:
+            Lista de nomes de itens, ou None se to_effect for inalcançável
+        """
+        path = self.route_indices(self._effect_index(from_effect), self._effect_index(to_effect), objective)
+        return None if path is None else self.engine.decode_items(path)
+
+    def how_to_reach(self, target_effect: str, current_effects: Dict[str, float] = None,
+                     objective: str = "cost") -> Optional[List[str]]:
+        """
+        Responde "como obter target_effect a partir da mistura atual" sem busca.
+
+        Tenta as rotas do grafo a partir de cada efeito presente e a partir do efeito de
+        cada item, da melhor para a pior segundo objective, e retorna a primeira que, simulada
+        no motor de efeitos, termina com o efeito (as outras regras dos itens e o limite de
+        8 efeitos podem desviar uma rota).
+
+        Args:
+            target_effect: Efeito desejado
+            current_effects: Efeitos atuais da mistura
+            objective: "cost" (menor custo) ou "length" (menos misturas)
+
+        Returns:
+            Lista de nomes de itens (vazia se o efeito já está presente), ou None se nenhuma
+            rota do grafo funcionar; nesse caso, optimizer.find_target_recipe faz a busca completa
+        """
+        engine = self.engine
+        target = self._effect_index(target_effect)
+        state = engine.encode_effects(current_effects)
+        if state >> target & 1:
+            return []
+
+        candidates = []
+        for effect in range(self.num_effects):
+            if state >> effect & 1:
+                path = self.route_indices(effect, target, objective)
+                if path is not None:
+                    candidates.append(path)
+        for item in self.available_items:
+            path = self.route_indices(engine.item_effect_bits[item].bit_length() - 1, target, objective)
+            if path is not None:
+                candidates.append([item] + path)
+
+        if objective == "cost":
+            candidates.sort(key=lambda path: (engine.cost(path), len(path)))
+        else:
+            candidates.sort(key=lambda path: (len(path), engine.cost(path)))
+        for path in candidates:
+            if engine.apply_items(path, state) >> target & 1:
+                return engine.decode_items(path)
+        return None
+
+_graphs: Dict[frozenset, RuleGraph] = {}
+
+def graph_for_items(available_items: Sequence[int]) -> RuleGraph:
+    """Retorna o grafo do motor padrão para um conjunto de índices de itens (compilado uma única vez)."""
+    key = frozenset(available_items)
+    graph = _graphs.get(key)
+    if graph is None:
+        if len(_graphs) >= RULE_GRAPH_CACHE_SIZE:
+            _graphs.clear()
+        graph = _graphs[key] = RuleGraph(get_engine(), sorted(key))
+    return graph
+
+def get_rule_graph(banned_items: List[str] = None) -> RuleGraph:
+    """Retorna o grafo de regras dos itens não banidos (compilado uma única vez)."""
+    banned_items = banned_items or []
+    return graph_for_items(get_engine().encode_items([item for item in items.keys() if item not in banned_items]))
@@ -0,0 +1,39 @@
+"""Enumeração exaustiva das receitas pequenas, usada como referência pelos testes das buscas."""
+
+import functools
+import itertools
+
+import pytest
+
+import optimizer
+from items import items
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+MATERIALS = ["OG Kush", "Meth"]  # Um com efeito inicial e um sem
+SIZES = [1, 2, 3, 4]
+
+@functools.lru_cache(maxsize=None)
+def all_recipes(material):
+    """Todas as receitas de 1 a 4 itens da matéria-prima: (combinação, multiplicador, efeitos, custo)."""
+    initial_effects = get_raw_material_initial_effects(material)
+    return [(list(combination),) + optimizer.evaluate_combination(list(combination), initial_effects)
+            for size in SIZES
+            for combination in itertools.product(items, repeat=size)]
+
+def best_profit(material, size, banned_items=()):
+    """Maior lucro entre as receitas de exatamente size itens sem itens banidos."""
+    base_value = RAW_MATERIALS[material]["value"]
+    return max(base_value * multiplier - cost
+               for combination, multiplier, _, cost in all_recipes(material)
+               if len(combination) == size and not set(combination) & set(banned_items))
+
+def check_result(result, material, size, expected_profit):
+    """Confere o tamanho e o lucro de um resultado e se ele descreve a própria combinação."""
+    combination, multiplier, effects, cost, profit = result[:5]
+    assert len(combination) == size
+    assert profit == pytest.approx(expected_profit)
+    expected_multiplier, expected_effects, expected_cost = optimizer.evaluate_combination(
+        combination, get_raw_material_initial_effects(material))
+    assert multiplier == pytest.approx(expected_multiplier)
+    assert set(effects) == set(expected_effects)
+    assert cost == expected_cost
@@ -0,0 +1,8 @@
+"""Configuração dos testes: os módulos do projeto ficam na raiz do repositório."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
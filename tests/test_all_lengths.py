@@ -0,0 +1,28 @@
+"""Melhor receita de cada tamanho comparada com a força bruta em combinações pequenas."""
+
+import pytest
+
+import optimizer
+from brute_force import MATERIALS, SIZES, best_profit, check_result
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+@pytest.mark.parametrize("material", MATERIALS)
+def test_solve_all_lengths_matches_brute_force(material):
+    results = optimizer.solve_all_lengths(get_raw_material_initial_effects(material), max(SIZES),
+                                          base_value=RAW_MATERIALS[material]["value"],
+                                          reuse_search_state=False)
+    assert len(results) == len(SIZES)
+    for size, result in zip(SIZES, results):
+        check_result(result, material, size, best_profit(material, size))
+
+def test_optimize_lengths_mode_lists_every_size():
+    initial_effects = get_raw_material_initial_effects("Meth")
+    result = optimizer.optimize(initial_effects, combo_size=4, base_value=70, verbose=False, mode="lengths")
+    assert [len(recipe[0]) for recipe in result[5]] == SIZES
+    assert result[4] == max(recipe[4] for recipe in result[5])
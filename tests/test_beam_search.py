@@ -0,0 +1,23 @@
+"""Busca em feixe: com feixe largo, comparada com a força bruta em combinações pequenas."""
+
+import pytest
+
+import optimizer
+from brute_force import MATERIALS, SIZES, best_profit, check_result
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+BRUTE_FORCE_BEAM_WIDTH = 100000  # Maior que o número de receitas de 4 itens, então o feixe não descarta nada
+
+@pytest.mark.parametrize("material", MATERIALS)
+@pytest.mark.parametrize("size", SIZES)
+def test_wide_beam_search_matches_brute_force(material, size):
+    result = optimizer.beam_search(get_raw_material_initial_effects(material), size,
+                                   base_value=RAW_MATERIALS[material]["value"],
+                                   beam_width=BRUTE_FORCE_BEAM_WIDTH)
+    check_result(result, material, size, best_profit(material, size))
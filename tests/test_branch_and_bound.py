@@ -0,0 +1,45 @@
+"""Branch-and-bound comparado com a força bruta em combinações pequenas."""
+
+import pytest
+
+import optimizer
+from brute_force import MATERIALS, SIZES, best_profit, check_result
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+@pytest.mark.parametrize("material", MATERIALS)
+@pytest.mark.parametrize("size", SIZES)
+def test_branch_and_bound_matches_brute_force(material, size):
+    result = optimizer.branch_and_bound(get_raw_material_initial_effects(material), size,
+                                        base_value=RAW_MATERIALS[material]["value"])
+    check_result(result, material, size, best_profit(material, size))
+
+@pytest.mark.parametrize("size", SIZES)
+def test_branch_and_bound_improves_poor_incumbent(size):
+    incumbent = ["Cuke"] * size
+    result = optimizer.branch_and_bound(get_raw_material_initial_effects("OG Kush"), size, base_value=35,
+                                        incumbent=incumbent)
+    check_result(result, "OG Kush", size, best_profit("OG Kush", size))
+
+def test_branch_and_bound_reports_node_counts():
+    stats = optimizer.SearchStats()
+    optimizer.branch_and_bound(get_raw_material_initial_effects("OG Kush"), 4, base_value=35, search_stats=stats)
+    assert stats.stop_reason == "complete"
+    assert stats.nodes_expanded > 0
+    assert stats.nodes_pruned + stats.nodes_dominated > 0
+    counts = stats.to_dict()
+    assert (counts["nodes_expanded"], counts["nodes_pruned"], counts["nodes_dominated"]) == (
+        stats.nodes_expanded, stats.nodes_pruned, stats.nodes_dominated)
+
+def test_bnb_mode_proves_small_recipes_with_exact_search():
+    stats = optimizer.SearchStats()
+    result = optimizer.optimize(get_raw_material_initial_effects("OG Kush"), time_limit_seconds=5, combo_size=4,
+                                base_value=35, verbose=False, mode="bnb", seed=0, search_stats=stats)
+    assert stats.hyperparameters["proof"] == "exact"
+    assert stats.stop_reason == "complete"
+    check_result(result, "OG Kush", 4, best_profit("OG Kush", 4))
@@ -0,0 +1,75 @@
+"""Linha de comando: normalização das consultas e lotes."""
+
+import json
+
+import pytest
+
+import cli
+
+def test_normalize_query_fills_defaults():
+    query = cli.normalize_query({"raw_material": "OG Kush"})
+    assert query == {
+        "raw_material": "OG Kush",
+        "combo_size": 8,
+        "banned_items": [],
+        "time_limit_seconds": cli.DEFAULT_TIME_LIMIT_SECONDS,
+        "mode": "auto",
+        "seed": None,
+        "early_stopping": True,
+    }
+
+def test_normalize_query_parses_csv_strings():
+    query = cli.normalize_query({"raw_material": "Meth", "combo_size": "5", "banned_items": " Cuke ; Donut;;Cuke",
+                                 "time_limit_seconds": "2.5", "seed": "7", "early_stopping": "False"})
+    assert query["combo_size"] == 5
+    assert query["banned_items"] == ["Cuke", "Donut"]
+    assert query["time_limit_seconds"] == 2.5
+    assert query["seed"] == 7
+    assert query["early_stopping"] is False
+
+@pytest.mark.parametrize("raw_query, message", [
+    ({"raw_material": "Oregano"}, "Unknown raw material"),
+    ({}, "Unknown raw material"),
+    ({"raw_material": "Meth", "banned_items": "Cuke;Pizza"}, "Unknown items: Pizza"),
+    ({"raw_material": "Meth", "combo_size": -1}, "Invalid combo size"),
+])
+def test_normalize_query_rejects_invalid_queries(raw_query, message):
+    with pytest.raises(ValueError, match=message):
+        cli.normalize_query(raw_query)
+
+def read_output(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+def test_run_batch_round_trip(tmp_path, capsys):
+    path = tmp_path / "queries.jsonl"
+    queries = [
+        {"raw_material": "OG Kush", "combo_size": 3, "mode": "exact"},
+        {"raw_material": "Oregano"},
+        {"raw_material": "Meth", "combo_size": 2, "banned_items": ["Cuke"], "mode": "exact"},
+    ]
+    path.write_text("\n".join(json.dumps(query) for query in queries) + "\n", encoding="utf-8")
+
+    errors = cli.run_batch(list(cli.read_queries(str(path))), workers=1, use_result_cache=False)
+    outputs = read_output(capsys)
+    assert errors == 1
+    assert [output["index"] for output in outputs] == [0, 1, 2]
+    assert "error" in outputs[1]
+    assert outputs[0]["query"] == cli.normalize_query(queries[0])
+    assert len(outputs[0]["combination"]) == 3
+    assert "Cuke" not in outputs[2]["combination"]
+    for output in (outputs[0], outputs[2]):
+        expected = cli.solve_query(output["query"], use_result_cache=False)
+        assert output["combination"] == expected["combination"]
+        assert output["profit"] == expected["profit"]
+
+def test_csv_batch_through_main(tmp_path, capsys):
+    path = tmp_path / "queries.csv"
+    path.write_text("raw_material,combo_size,banned_items,mode\n"
+                    "Cocaine,2,Cuke;Banana,exact\n"
+                    "Meth,1,,exact\n", encoding="utf-8")
+    assert cli.main(["--batch", str(path), "--workers", "1", "--no-cache"]) == 0
+    outputs = sorted(read_output(capsys), key=lambda output: output["index"])
+    assert [output["query"]["raw_material"] for output in outputs] == ["Cocaine", "Meth"]
+    assert outputs[0]["query"]["banned_items"] == ["Banana", "Cuke"]
+    assert not {"Banana", "Cuke"} & set(outputs[0]["combination"])
+    assert len(outputs[1]["combination"]) == 1
@@ -0,0 +1,68 @@
+"""Motor de efeitos em máscaras de bits e cache de transições."""
+
+import random
+
+import pytest
+
+from effect_engine import EffectEngine, TransitionCache
+from items import items
+from optimizer import evaluate_combination
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.mark.parametrize("max_states", [None, 3, 50])
+def test_engine_matches_reference_evaluation(max_states):
+    # Com poucos estados, quase toda avaliação passa pelo despejo do cache de transições
+    engine = EffectEngine() if max_states is None else EffectEngine(max_states=max_states)
+    rng = random.Random(max_states)
+    names = list(items)
+    for _ in range(3000):
+        initial_effects = get_raw_material_initial_effects(rng.choice(list(RAW_MATERIALS)))
+        combination = [rng.choice(names) for _ in range(rng.randint(1, 10))]
+        multiplier, effects, cost = engine.evaluate(combination, initial_effects)
+        expected_multiplier, expected_effects, expected_cost = evaluate_combination(combination, initial_effects)
+        assert effects == expected_effects
+        assert cost == expected_cost
+        assert multiplier == pytest.approx(expected_multiplier)
+    if max_states is not None:
+        assert len(engine.transitions) <= max_states
+        assert engine.transitions.evictions > 0
+
+def test_transition_cache_evicts_least_recently_used_state():
+    engine = EffectEngine()
+    cache = TransitionCache(engine, max_states=4)
+    first, second, third, fourth = range(4)
+    start = 0
+    states = [cache.step(start, item) for item in (first, second, third)]  # 4 estados: o limite
+    assert len(set(states + [start])) == 4
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    # Volta a usar start e o primeiro estado; o segundo passa a ser o menos recente
+    assert cache.step(start, first) == states[0]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # Um estado novo despeja o menos recente (75% dos 4 estados ficam)
+    new_state = cache.step(states[0], fourth)
+    assert new_state == engine.apply_item(states[0], fourth)
+    assert cache.evictions == 1
+    assert len(cache) == 4
+
+    # A transição até o terceiro estado continua guardada; a do segundo foi descartada com ele
+    assert cache.step(start, third) == states[2]
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.step(start, second) == states[1]
+    assert (cache.hits, cache.misses) == (2, 5)
+
+def test_transition_cache_stats_and_reset():
+    engine = EffectEngine()
+    cache = TransitionCache(engine)
+    for _ in range(3):
+        cache.step(0, 0)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["states"]) == (2, 1, 2)
+    assert stats["hit_rate"] == 2 / 3
+    cache.reset_stats()
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 0, 0)
+    assert len(cache) == 2
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.evictions == 1
@@ -0,0 +1,61 @@
+"""Operadores e execuções do algoritmo genético."""
+
+import random
+
+import pytest
+
+import optimizer
+from items import items
+from raw_materials import get_raw_material_initial_effects
+
+INITIAL_EFFECTS = get_raw_material_initial_effects("OG Kush")
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+@pytest.mark.parametrize("size", [1, 2, 3, 8])
+def test_crossover_keeps_size_and_parent_items(size):
+    rng = random.Random(0)
+    available_items = list(items)
+    for _ in range(200):
+        parent1 = [rng.choice(available_items) for _ in range(size)]
+        parent2 = [rng.choice(available_items) for _ in range(size)]
+        child = optimizer.crossover(parent1, parent2, available_items, rng)
+        assert len(child) == size
+        assert child is not parent1 and child is not parent2
+        if size == 1:
+            assert child in (parent1, parent2)
+
+def test_genetic_search_with_single_item():
+    result = optimizer.optimize(INITIAL_EFFECTS, time_limit_seconds=2, combo_size=1, base_value=35,
+                                verbose=False, mode="genetic", seed=0)
+    assert len(result[0]) == 1
+
+def test_seeded_runs_with_default_options_match(monkeypatch):
+    # A parada antecipada (ligada por padrão) só conta gerações, então não depende da velocidade
+    monkeypatch.setattr(optimizer, "CONVERGENCE_MIN_GENERATIONS", 100)
+    results = []
+    for _ in range(2):
+        stats = optimizer.SearchStats()
+        results.append(optimizer.optimize(INITIAL_EFFECTS, time_limit_seconds=60, combo_size=3, base_value=35,
+                                          verbose=False, mode="genetic", seed=7, search_stats=stats))
+        assert stats.stop_reason != "time_limit"
+    assert results[0] == results[1]
+
+def test_convergence_monitor_patience_and_diversity():
+    monitor = optimizer.ConvergenceMonitor(100.0)
+    monitor.update(10, 110.0)
+    monitor.update(2010, 120.0)
+    # A paciência acompanha o maior intervalo entre melhorias (2000 gerações)
+    assert monitor.patience == 2000 * optimizer.CONVERGENCE_GAP_FACTOR
+    stop = 2010 + int(monitor.patience)
+    diverse = [([item], 1.0, {}, 0, 0.0) for item in list(items)[:4]]
+    uniform = [(["Cuke"], 1.0, {}, 0, 0.0)] * 3 + [(["Banana"], 1.0, {}, 0, 0.0)]
+    assert monitor.check(stop - 10, uniform) is None
+    # Com a população ainda diversa, a estagnação espera mais
+    assert monitor.check(stop, diverse) is None
+    assert monitor.check(stop, uniform) == "stagnated"
+    assert monitor.check(2010 + int(monitor.patience * 4 / 3) + 10, diverse) == "stagnated"
@@ -0,0 +1,38 @@
+"""Fronteira de Pareto comparada com a força bruta em combinações pequenas."""
+
+import pytest
+
+import optimizer
+from brute_force import MATERIALS, SIZES, all_recipes
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+@pytest.mark.parametrize("material", MATERIALS)
+def test_pareto_front_matches_brute_force(material):
+    def point(combination, multiplier, cost):
+        # Preço em centésimos do multiplicador (maior é melhor), custo e misturas (menores são melhores)
+        return round(multiplier * 100), cost, len(combination)
+
+    def dominates(a, b):
+        return a != b and a[0] >= b[0] and a[1] <= b[1] and a[2] <= b[2]
+
+    points = {point(combination, multiplier, cost) for combination, multiplier, _, cost in all_recipes(material)}
+    expected = {p for p in points if not any(dominates(q, p) for q in points)}
+
+    results = optimizer.pareto_front(get_raw_material_initial_effects(material), max(SIZES),
+                                     base_value=RAW_MATERIALS[material]["value"], reuse_search_state=False)
+    front = [point(result[0], result[1], result[3]) for result in results]
+    assert len(front) == len(set(front))
+    assert set(front) == expected
+
+def test_optimize_pareto_mode_returns_front():
+    initial_effects = get_raw_material_initial_effects("OG Kush")
+    front = optimizer.pareto_front(initial_effects, 3, base_value=35, reuse_search_state=False)
+    result = optimizer.optimize(initial_effects, combo_size=3, base_value=35, verbose=False, mode="pareto")
+    assert [recipe[0] for recipe in result[5]] == [recipe[0] for recipe in front]
+    assert result[4] == max(recipe[4] for recipe in front)
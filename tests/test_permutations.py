@@ -0,0 +1,46 @@
+"""Permutações distintas usadas no refinamento, sem materializar a lista completa."""
+
+import itertools
+import random
+
+import pytest
+
+import optimizer
+
+COMBINATIONS = [
+    [3],
+    [1, 2],
+    [2, 2],
+    [5, 1, 5, 0],
+    [4, 4, 4, 1, 1],
+    [7, 3, 3, 0, 9, 3],
+]
+
+@pytest.mark.parametrize("combination", COMBINATIONS)
+def test_iter_distinct_permutations_matches_itertools(combination):
+    expected = sorted(set(itertools.permutations(combination)))
+    permutations = list(optimizer.iter_distinct_permutations(combination))
+    assert permutations == expected
+    assert optimizer.count_distinct_permutations(combination) == len(expected)
+
+@pytest.mark.parametrize("combination", COMBINATIONS)
+def test_unrank_follows_lexicographic_order(combination):
+    permutations = list(optimizer.iter_distinct_permutations(combination))
+    assert [optimizer.unrank_distinct_permutation(combination, rank)
+            for rank in range(len(permutations))] == permutations
+
+@pytest.mark.parametrize("combination", COMBINATIONS)
+def test_sample_distinct_permutations_has_no_duplicates(combination):
+    total = optimizer.count_distinct_permutations(combination)
+    for sample_size in {1, total // 2 or 1, total}:
+        sample = list(optimizer.sample_distinct_permutations(combination, sample_size, random.Random(sample_size)))
+        assert len(sample) == sample_size
+        assert len(set(sample)) == sample_size
+        assert sample == sorted(sample)
+        assert all(sorted(permutation) == sorted(combination) for permutation in sample)
+
+def test_sample_from_huge_permutation_count():
+    combination = list(range(25))  # 25! permutações, mais que sys.maxsize
+    sample = list(optimizer.sample_distinct_permutations(combination, 50, random.Random(0)))
+    assert len(set(sample)) == 50
+    assert all(sorted(permutation) == combination for permutation in sample)
@@ -0,0 +1,42 @@
+"""Índice pré-calculado das melhores receitas."""
+
+import json
+
+import pytest
+
+import optimizer
+import recipe_index
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    """Faz a próxima consulta recarregar o índice do disco."""
+    monkeypatch.setattr(recipe_index, "_index", None)
+
+@pytest.mark.parametrize("material", ["OG Kush", "Cocaine"])
+@pytest.mark.parametrize("size", [1, 4])
+def test_lookup_matches_exact_search(fresh_index, material, size):
+    result = recipe_index.lookup(material, size, top_k=3)
+    expected = optimizer.solve_exact(get_raw_material_initial_effects(material), size,
+                                     base_value=RAW_MATERIALS[material]["value"], reuse_search_state=False)
+    assert result[4] == pytest.approx(expected[4])
+    assert len(result[5]) == 3
+    assert result[5][0][0] == result[0]
+    assert recipe_index.lookup(material, size)[5] == []
+
+def test_lookup_ignores_index_with_other_fingerprint(fresh_index, tmp_path, monkeypatch):
+    path = tmp_path / recipe_index.INDEX_FILE
+    recipes = {"OG Kush": {"1": [["Cuke"]]}}
+    path.write_text(json.dumps({"fingerprint": "outras tabelas", "recipes": recipes}), encoding="utf-8")
+    monkeypatch.setattr(recipe_index, "resource_path", lambda relative_path: str(path))
+    assert recipe_index.lookup("OG Kush", 1) is None
+
+    # Com a impressão digital atual, o mesmo arquivo é aceito
+    path.write_text(json.dumps({"fingerprint": recipe_index.index_fingerprint(), "recipes": recipes}),
+                    encoding="utf-8")
+    monkeypatch.setattr(recipe_index, "_index", None)
+    assert recipe_index.lookup("OG Kush", 1)[0] == ["Cuke"]
+
+def test_lookup_without_index_file(fresh_index, tmp_path, monkeypatch):
+    monkeypatch.setattr(recipe_index, "resource_path", lambda relative_path: str(tmp_path / "ausente.json"))
+    assert recipe_index.lookup("OG Kush", 1) is None
@@ -0,0 +1,75 @@
+"""Cache persistente de resultados e seu uso pelo otimizador."""
+
+import pytest
+
+import optimizer
+import result_cache
+from raw_materials import get_raw_material_initial_effects
+
+INITIAL_EFFECTS = get_raw_material_initial_effects("OG Kush")
+RESULT = (["Cuke", "Banana"], 1.88, {"Gingeritis": 0.2, "Thought-Provoking": 0.44, "Sneaky": 0.24}, 4, 61.8,
+          [(["Cuke", "Banana"], 1.88, {"Gingeritis": 0.2, "Thought-Provoking": 0.44, "Sneaky": 0.24}, 4, 61.8),
+           (["Cuke", "Cuke"], 1.2, {"Energizing": 0.22}, 4, 38.0)])
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = result_cache.ResultCache(str(tmp_path / "results.sqlite3"))
+    monkeypatch.setattr(result_cache, "_default_cache", cache)
+    optimizer.clear_search_state()
+    yield cache
+    optimizer.clear_search_state()
+
+def test_round_trip_keeps_all_six_fields(cache):
+    key = result_cache.make_query_key(INITIAL_EFFECTS, ["Battery"], 2, 35, "exact")
+    assert cache.get(key) is None
+    cache.put(key, RESULT)
+    assert cache.get(key) == RESULT
+    # Resultado sem alternativas volta com a lista vazia
+    cache.put(key, RESULT[:5] + ([],))
+    assert cache.get(key) == RESULT[:5] + ([],)
+
+def test_query_key_ignores_order():
+    key = result_cache.make_query_key({"Calming": 0.1, "Sneaky": 0.24}, ["Cuke", "Battery", "Cuke"], 4, 35, "exact")
+    assert key == result_cache.make_query_key({"Sneaky": 0.24, "Calming": 0.1}, ["Battery", "Cuke"], 4, 35.0, "exact")
+    assert key != result_cache.make_query_key({"Calming": 0.1, "Sneaky": 0.24}, ["Cuke"], 4, 35, "exact")
+    assert key != result_cache.make_query_key({"Calming": 0.1, "Sneaky": 0.24}, ["Cuke", "Battery"], 4, 35, "beam")
+
+def test_changed_tables_invalidate_entries(cache):
+    key = result_cache.make_query_key(INITIAL_EFFECTS, None, 2, 35, "exact")
+    cache.put(key, RESULT)
+    stale = result_cache.ResultCache(cache.path)
+    stale.fingerprint = "outras tabelas"
+    assert stale.get(key) is None
+    # A nova impressão digital descarta as entradas antigas do arquivo
+    assert result_cache.ResultCache(cache.path).get(key) is None
+
+def test_clear_removes_entries(cache):
+    key = result_cache.make_query_key(INITIAL_EFFECTS, None, 2, 35, "exact")
+    cache.put(key, RESULT)
+    cache.clear()
+    assert cache.get(key) is None
+
+def test_optimize_caches_finished_exact_search(cache):
+    result = optimizer.optimize(INITIAL_EFFECTS, combo_size=3, base_value=35, verbose=False, mode="exact",
+                                use_result_cache=True)
+    key = result_cache.make_query_key(INITIAL_EFFECTS, None, 3, 35, "exact")
+    assert cache.get(key) == result
+    assert optimizer.optimize(INITIAL_EFFECTS, combo_size=3, base_value=35, verbose=False, mode="exact",
+                              use_result_cache=True) == result
+
+def test_optimize_skips_exact_search_stopped_by_time_limit(cache):
+    stats = optimizer.SearchStats()
+    result = optimizer.optimize(INITIAL_EFFECTS, time_limit_seconds=1e-9, combo_size=8, base_value=35,
+                                verbose=False, mode="exact", use_result_cache=True, search_stats=stats)
+    assert stats.stop_reason == "time_limit"
+    assert len(result[0]) == 8
+    assert cache.get(result_cache.make_query_key(INITIAL_EFFECTS, None, 8, 35, "exact")) is None
+
+def test_unreadable_database_counts_as_miss(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    path.write_bytes(b"not a database" * 100)
+    cache = result_cache.ResultCache(str(path))
+    key = result_cache.make_query_key(INITIAL_EFFECTS, None, 2, 35, "exact")
+    cache.put(key, RESULT)
+    assert cache.get(key) is None
+    cache.clear()
@@ -0,0 +1,52 @@
+"""Grafo compilado das regras dos itens."""
+
+import pytest
+
+from effect_engine import EffectEngine
+from optimizer import apply_item_effects
+from rule_graph import RuleGraph, get_rule_graph
+
+# A -> B (x, 1), B -> C (y, 2) e A -> C direto (z, 10); nada leva a E
+MULTIPLIERS = {"A": 0.1, "B": 0.2, "C": 0.3, "D": 0.4, "E": 0.5}
+ITEMS = {
+    "x": {"effect": "D", "rules": {"A": "B"}},
+    "y": {"effect": "D", "rules": {"B": "C"}},
+    "z": {"effect": "D", "rules": {"A": "C"}},
+}
+PRICES = {"x": 1, "y": 2, "z": 10}
+
+@pytest.fixture
+def graph():
+    engine = EffectEngine(ITEMS, MULTIPLIERS, PRICES)
+    return RuleGraph(engine, range(len(ITEMS)))
+
+def test_reachable(graph):
+    # Misturas e custo mínimos são independentes: C leva uma mistura (z) ou custa 3 (x, y)
+    assert graph.reachable("A") == {"A": (0, 0), "B": (1, 1), "C": (1, 3)}
+    assert graph.reachable("A", max_mixes=0) == {"A": (0, 0)}
+    assert graph.reachable("C") == {"C": (0, 0)}
+    assert graph.reachable("D") == {"D": (0, 0)}
+
+def test_route(graph):
+    assert graph.route("A", "C") == ["x", "y"]
+    assert graph.route("A", "C", objective="length") == ["z"]
+    assert graph.route("B", "C") == ["y"]
+    assert graph.route("A", "E") is None
+    assert graph.route("C", "A") is None
+    with pytest.raises(ValueError):
+        graph.route("A", "F")
+
+def test_route_without_banned_item():
+    engine = EffectEngine(ITEMS, MULTIPLIERS, PRICES)
+    graph = RuleGraph(engine, engine.encode_items(["x", "z"]))
+    assert graph.route("A", "C") == ["z"]
+    assert graph.reachable("B") == {"B": (0, 0)}
+
+@pytest.mark.parametrize("target", ["Thought-Provoking", "Anti-Gravity", "Zombifying", "Calming"])
+def test_how_to_reach_route_gives_the_effect(target):
+    current_effects = {"Calming": 0.1}
+    route = get_rule_graph().how_to_reach(target, current_effects)
+    assert route is not None
+    assert target in apply_item_effects(route, current_effects)
+    if target in current_effects:
+        assert route == []
@@ -0,0 +1,88 @@
+"""Reaproveitamento do estado da busca exata entre consultas (search_memory)."""
+
+import time
+
+import pytest
+
+import optimizer
+from brute_force import best_profit, check_result
+from items import items
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+INITIAL_EFFECTS = get_raw_material_initial_effects("OG Kush")
+BANNED_ITEM = "Battery"  # Usado pela receita ótima de 8 itens, então o ban muda a resposta
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+def test_repaired_frontier_matches_cold_build():
+    engine = optimizer.get_engine()
+    initial_state = engine.encode_effects(INITIAL_EFFECTS)
+    all_items = list(range(len(engine.item_names)))
+    allowed = [item for item in all_items if item != engine.item_index[BANNED_ITEM]]
+    memory = optimizer.SearchMemory()
+    optimizer._build_frontier(engine, all_items, initial_state, 6, memory, time.time())
+
+    layers, parents, complete = optimizer._build_frontier(engine, allowed, initial_state, 6, memory, time.time())
+    cold_layers, _, _ = optimizer._build_frontier(engine, allowed, initial_state, 6, optimizer.SearchMemory(),
+                                                  time.time())
+
+    assert complete
+    assert layers == cold_layers
+    # As camadas guardadas continuam sendo as de todos os itens
+    assert memory.frontier_key == (initial_state, frozenset(all_items))
+    # Cada caminho reparado só usa itens permitidos e custa o que a camada diz
+    num_items = len(engine.item_names)
+    for state, cost in layers[-1].items():
+        path = optimizer._backtrack_path(parents, num_items, state, len(layers) - 1)
+        assert set(path) <= set(allowed)
+        assert engine.apply_items(path, initial_state) == state
+        assert engine.cost(path) == pytest.approx(cost)
+
+def test_ban_after_warm_solve_is_faster_than_cold_solve():
+    optimizer.solve_exact(INITIAL_EFFECTS, combo_size=8)
+
+    start = time.perf_counter()
+    warm = optimizer.solve_exact(INITIAL_EFFECTS, combo_size=8, banned_items=[BANNED_ITEM])
+    warm_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    cold = optimizer.solve_exact(INITIAL_EFFECTS, combo_size=8, banned_items=[BANNED_ITEM],
+                                 reuse_search_state=False)
+    cold_seconds = time.perf_counter() - start
+
+    assert BANNED_ITEM not in warm[0]
+    assert warm[4] == pytest.approx(cold[4])
+    assert warm[3] == pytest.approx(cold[3])
+    assert warm_seconds < cold_seconds
+
+def test_search_memory_reuse_matches_cold_searches():
+    # Mesma memória atravessando matérias-primas, tamanhos e valores base em ordem variada
+    for material, size, base_value in [("OG Kush", 4, 35), ("OG Kush", 2, 35), ("OG Kush", 3, 150),
+                                       ("Meth", 3, 70), ("OG Kush", 4, 150), ("Meth", 1, 70)]:
+        initial_effects = get_raw_material_initial_effects(material)
+        warm = optimizer.solve_exact(initial_effects, size, base_value=base_value)
+        cold = optimizer.solve_exact(initial_effects, size, base_value=base_value, reuse_search_state=False)
+        assert warm[4] == pytest.approx(cold[4])
+        assert len(warm[0]) == size
+
+def test_search_memory_keeps_proven_optimum_after_unrelated_ban():
+    material, size = "OG Kush", 4
+    initial_effects = get_raw_material_initial_effects(material)
+    base_value = RAW_MATERIALS[material]["value"]
+    first = optimizer.solve_exact(initial_effects, size, base_value=base_value)
+    unused = next(item for item in items if item not in first[0])
+
+    stats = optimizer.SearchStats()
+    second = optimizer.solve_exact(initial_effects, size, [unused], base_value, search_stats=stats)
+    assert second[0] == first[0]
+    assert unused not in second[0]
+    assert stats.stop_reason == "complete"
+
+    # Banir um item usado pela receita ótima muda a resposta, que continua ótima
+    used = first[0][0]
+    third = optimizer.solve_exact(initial_effects, size, [unused, used], base_value)
+    check_result(third, material, size, best_profit(material, size, [unused, used]))
+    assert used not in third[0]
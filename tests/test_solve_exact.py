@@ -0,0 +1,20 @@
+"""Busca exata comparada com a força bruta em combinações pequenas (1 a 4 itens)."""
+
+import pytest
+
+import optimizer
+from brute_force import MATERIALS, SIZES, best_profit, check_result
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+@pytest.fixture(autouse=True)
+def clean_search_state():
+    optimizer.clear_search_state()
+    yield
+    optimizer.clear_search_state()
+
+@pytest.mark.parametrize("material", MATERIALS)
+@pytest.mark.parametrize("size", SIZES)
+def test_solve_exact_matches_brute_force(material, size):
+    result = optimizer.solve_exact(get_raw_material_initial_effects(material), size,
+                                   base_value=RAW_MATERIALS[material]["value"], reuse_search_state=False)
+    check_result(result, material, size, best_profit(material, size))
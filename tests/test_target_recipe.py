@@ -0,0 +1,45 @@
+"""Busca por efeitos-alvo comparada com a força bruta em combinações pequenas."""
+
+import pytest
+
+import optimizer
+from brute_force import MATERIALS, all_recipes
+from raw_materials import RAW_MATERIALS, get_raw_material_initial_effects
+
+TARGETS = [
+    (["Thought-Provoking", "Sneaky"], []),
+    (["Energizing"], ["Calming"]),
+    (["Gingeritis", "Munchies"], ["Sneaky"]),
+    (["Calming", "Energizing", "Sneaky", "Munchies"], []),
+]
+
+@pytest.mark.parametrize("material", MATERIALS)
+@pytest.mark.parametrize("required, forbidden", TARGETS)
+@pytest.mark.parametrize("objective", ["cost", "length"])
+def test_find_target_recipe_matches_brute_force(material, required, forbidden, objective):
+    max_steps = 3
+
+    def rank(combination, cost):
+        return (cost, len(combination)) if objective == "cost" else (len(combination), cost)
+
+    hits = [rank(combination, cost) for combination, _, effects, cost in all_recipes(material)
+            if len(combination) <= max_steps
+            and set(required) <= set(effects) and not set(forbidden) & set(effects)]
+
+    result = optimizer.find_target_recipe(required, forbidden, get_raw_material_initial_effects(material),
+                                          objective=objective, max_steps=max_steps,
+                                          base_value=RAW_MATERIALS[material]["value"])
+    if not hits:
+        assert result is None
+        return
+    assert result is not None
+    combination, _, effects, cost, _ = result
+    assert set(required) <= set(effects) and not set(forbidden) & set(effects)
+    assert rank(combination, cost) == min(hits)
+
+def test_find_target_recipe_rejects_bad_targets():
+    with pytest.raises(ValueError):
+        optimizer.find_target_recipe(["Not An Effect"])
+    with pytest.raises(ValueError):
+        optimizer.find_target_recipe(["Sneaky"], objective="speed")
+    assert optimizer.find_target_recipe(["Sneaky"], ["Sneaky"]) is None
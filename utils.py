@@ -3,9 +3,14 @@ Módulo de utilidades para o sistema.
 Contém funções auxiliares e de conveniência.
 """
 
+import json
+import logging
 import os
 import sys
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, TextIO, Union
+
+LOGGER_NAME = "mixingcalculator"  # Logger raiz; cada módulo usa um filho (ver get_logger)
+LOG_LEVEL_ENV = "MIXINGCALCULATOR_LOG_LEVEL"  # Variável de ambiente com o nível padrão do log
 
 def resource_path(relative_path: str) -> str:
     """
@@ -77,36 +82,63 @@ def clamp(value: float, min_value: float, max_value: float) -> float:
     """
     return max(min_value, min(value, max_value))
 
-def redirect_stdout(enabled: bool = True):
+def get_logger(name: str) -> logging.Logger:
     """
-    Redireciona a saída padrão para um arquivo nulo se enabled for True.
+    Retorna o logger de um módulo, filho do logger raiz LOGGER_NAME.
     
     Args:
-        enabled: Se True, redireciona a saída; se False, restaura a saída padrão
+        name: Nome do módulo (ex.: "optimizer")
     
     Returns:
-        Retorna o descritor de arquivo original se a saída foi redirecionada
+        logging.Logger: Logger "mixingcalculator.<name>"
     """
-    if enabled:
-        original_stdout = sys.stdout
-        null_file = open(os.devnull, 'w')
-        sys.stdout = null_file
-        return original_stdout, null_file
-    return None, None
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+# Atributos padrão de um LogRecord; os demais vieram de extra
+_LOG_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonLogFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON, com os campos passados em extra (ex.: "event")."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
-def restore_stdout(original_stdout, null_file=None):
+def configure_logging(level: Union[int, str, None] = None, stream: Optional[TextIO] = None,
+                      json_lines: bool = False) -> logging.Handler:
     """
-    Restaura a saída padrão.
+    Envia o log do calculador para um destino, substituindo a configuração anterior.
+    Sem configuração, só avisos e erros aparecem (na saída de erro, pelo padrão do logging).
+    Mensagens de níveis desabilitados não chegam a ser formatadas.
     
     Args:
-        original_stdout: Descritor de arquivo original
-        null_file: Arquivo nulo aberto por redirect_stdout
+        level: Nível mínimo ("DEBUG", "INFO", logging.WARNING...); o padrão vem da variável
+               de ambiente LOG_LEVEL_ENV ou é INFO
+        stream: Destino das mensagens (padrão: sys.stderr)
+        json_lines: Se True, grava cada registro como uma linha JSON
+    
+    Returns:
+        logging.Handler: O handler instalado
     """
-    if original_stdout:
-        sys.stdout = original_stdout
-    
-    if null_file:
-        try:
-            null_file.close()
-        except:
-            pass
\ No newline at end of file
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV) or logging.INFO
+    if isinstance(level, str):
+        level = level.upper()
+    
+    root = logging.getLogger(LOGGER_NAME)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonLogFormatter() if json_lines else logging.Formatter("%(message)s"))
+    root.addHandler(handler)
+    root.setLevel(level)
+    root.propagate = False
+    return handler